@@ -1,11 +1,24 @@
 import os
+import sys
 import logging
 import argparse
+import tempfile
+from core.Metrics import Metrics
 from core.RpgCrawler import RpgCrawler
+from core.Tracer import Tracer
+from generator.RandomStream import RandomStream
 from interaction.AbstractIO import AbstractIO
 from interaction.ConsoleIO import ConsoleIO
+from interaction.CsvIO import CsvIO
+from interaction.JsonLinesIO import JsonLinesIO
+from interaction.TextStreamIO import TextStreamIO
 from sheet.AbstractSpreadAccess import AbstractSpreadAccess
-from sheet.GSpreadAccess import GSpreadAccess
+from sheet.LruCache import LruCache
+from sheet.RequestScheduler import RequestScheduler
+from sheet.SpreadAccessRegistry import SpreadAccessRegistry
+from sheet.Table import Table
+from sheet.TableOptimizer import TableOptimizer
+from sheet.TableDiskCache import TableDiskCache
 
 
 def create_argument_parser() -> argparse.ArgumentParser:
@@ -15,11 +28,82 @@ def create_argument_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser()
     parser.add_argument("--d", required=False, choices=[True, False], type=bool,
                         help="Ein optionaler Parameter um Debug-Informationen der Anwendung herauszuschreiben.")
-    parser.add_argument("--f", required=True,
-                        help="Ein erforderlicher Parameter der den Namen des Start Google Sheets angibt.")
+    parser.add_argument("--f", required=False,
+                        help="Der Name des Start Google Sheets. Erforderlich, sofern kein Story-Bundle verwendet wird.")
+    parser.add_argument("--export", required=False,
+                        help="Ein optionaler Parameter der die Story des Google Sheets mit allen referenzierten "
+                             "Tabellen in die angegebene Story-Bundle-Datei exportiert und die Anwendung beendet.")
+    parser.add_argument("--bundle", required=False,
+                        help="Ein optionaler Parameter der eine Story-Bundle-Datei angibt, aus der die Tabellen "
+                             "anstelle des Google Sheets gelesen werden.")
+    parser.add_argument("--directory", required=False,
+                        help="Ein optionales Verzeichnis mit lokalen Arbeitsmappen (xlsx, ods, csv), aus dem die "
+                             "Tabellen anstelle des Google Sheets gelesen werden. --f gibt die Kern-Arbeitsmappe an.")
+    parser.add_argument("--cache", required=False,
+                        help="Ein optionales Verzeichnis in dem die gelesenen Tabellen zwischengespeichert werden. "
+                             "Eine Tabelle wird erst wieder gelesen, wenn sich das Google Sheet geändert hat.")
+    parser.add_argument("--cache-ttl", required=False, type=float, dest="cache_ttl",
+                        help="Die optionale maximale Gültigkeit einer zwischengespeicherten Tabelle in Sekunden.")
+    parser.add_argument("--table-cache-mb", required=False, type=float, dest="table_cache_mb",
+                        help="Der optionale maximale Speicher der geladenen Tabellen in MB. Darüber hinaus werden die "
+                             "am längsten nicht verwendeten Tabellen verworfen (außer den Tabellen der Story).")
+    parser.add_argument("--quota", required=False, type=int, default=RequestScheduler.DEFAULT_QUOTA,
+                        help="Die maximale Anzahl an Anfragen an die Google API pro Minute (Standard: {}). "
+                             "Fehlgeschlagene Anfragen werden wiederholt.".format(RequestScheduler.DEFAULT_QUOTA))
+    parser.add_argument("--prefetch-threads", required=False, type=int,
+                        default=AbstractSpreadAccess.DEFAULT_PREFETCH_WORKERS, dest="prefetch_threads",
+                        help="Die maximale Anzahl an Tabellen, die beim Start gleichzeitig geladen werden.")
+    parser.add_argument("--iterations", required=False, type=int,
+                        help="Ein optionaler Parameter der die Anzahl der Iterationen angibt. Die Anwendung wird "
+                             "ohne Benutzereingabe ausgeführt und schreibt die Ergebnisse im angegebenen Format.")
+    parser.add_argument("--format", required=False, choices=["text", "jsonl", "csv"], default="text",
+                        help="Das Ausgabeformat der Iterationen ohne Benutzereingabe (Standard: text).")
+    parser.add_argument("--out", required=False,
+                        help="Die Datei in die die Iterationen ohne Benutzereingabe geschrieben werden "
+                             "(Standard: Konsole).")
+    parser.add_argument("--processes", required=False, type=int,
+                        help="Ein optionaler Parameter der die Iterationen ohne Benutzereingabe auf die angegebene "
+                             "Anzahl an Prozessen verteilt.")
+    parser.add_argument("--seed", required=False, type=int,
+                        help="Ein optionaler Startwert für die Zufallszahlen. Derselbe Startwert erzeugt dieselben "
+                             "Iterationen.")
+    parser.add_argument("--first-iteration", required=False, type=int, default=0, dest="first_iteration",
+                        help="Die Nummer der ersten Iteration (Standard: 0). Zusammen mit dem Startwert kann so eine "
+                             "einzelne Iteration erneut erzeugt werden.")
+    parser.add_argument("--serve", required=False, type=int,
+                        help="Ein optionaler Parameter der die Anwendung als HTTP-Server auf dem angegebenen Port "
+                             "startet. Die Iterationen einer Story werden über /stories/<sheet>/roll?n=100 als JSON "
+                             "abgerufen.")
+    parser.add_argument("--host", required=False, default="127.0.0.1",
+                        help="Die Adresse an die der HTTP-Server gebunden wird (Standard: 127.0.0.1).")
+    parser.add_argument("--stats", required=False, action="store_true",
+                        help="Ein optionaler Parameter der die Anfragen an die Google API, die Treffer der Caches und "
+                             "die Laufzeiten der Generierung misst und am Ende zusammengefasst ausgibt.")
+    parser.add_argument("--metrics-file", required=False, dest="metrics_file",
+                        help="Eine optionale Datei in die die Messwerte am Ende im Prometheus-Textformat geschrieben "
+                             "werden. Der HTTP-Server stellt sie zusätzlich unter /metrics bereit.")
+    parser.add_argument("--trace", required=False,
+                        help="Eine optionale Datei in die die Laufzeiten jeder Iteration (Story, Tabelle, Zeile, "
+                             "Generator, referenzierte Tabelle) am Ende als Collapsed Stacks für einen Flame Graph "
+                             "geschrieben werden (nicht zusammen mit --processes).")
     return parser
 
 
+def write_metrics(arguments: argparse.Namespace) -> None:
+    """ Writes the metrics as summary to the console and / or in the prometheus text format to the metrics file and
+    the traced iterations as collapsed stacks to the trace file
+    :param arguments the program arguments accessible by argparse
+    """
+    if arguments.stats:
+        print(Metrics.summary(), file=sys.stderr)
+    if arguments.metrics_file:
+        with open(arguments.metrics_file, "w", encoding="utf-8") as file:
+            file.write(Metrics.prometheus())
+    if arguments.trace:
+        with open(arguments.trace, "w", encoding="utf-8") as file:
+            file.write(Tracer.collapsed_stacks())
+
+
 def determine_excel_sheet_name(arguments: argparse.Namespace) -> str:
     """ Determines the name of the excel sheet to be crawled from the start parameter of the application
     :param arguments the program arguments accessible by argparse
@@ -27,22 +111,62 @@ def determine_excel_sheet_name(arguments: argparse.Namespace) -> str:
     return str(arguments.f).strip()
 
 
-def create_spread_access(spread_sheet_name: str) -> AbstractSpreadAccess:
+def create_spread_access(spread_sheet_name: str, cache_directory: str = None,
+                         cache_ttl: float = None, table_cache_mb: float = None,
+                         scheduler: RequestScheduler = None) -> AbstractSpreadAccess:
     """Creates the access to the spread sheet. Uses the permission file for the spread sheet access
+    :param spread_sheet_name the name of the core sheet
+    :param cache_directory optional directory of the persistent table cache
+    :param cache_ttl optional time to live of the cached tables in seconds
+    :param table_cache_mb optional maximum memory of the loaded tables in MB
+    :param scheduler optional scheduler of the requests to the google api
     :return the spread sheet access
     """
     root_path = os.path.dirname(os.path.realpath(__file__))
     permission_path = os.path.join(root_path, 'permissions/RpgCrawler-b8b181033387.json')
-    return GSpreadAccess(spread_sheet_name, permission_path)
+    disk_cache = TableDiskCache(cache_directory, cache_ttl) if cache_directory else None
+    table_cache = None
+    if table_cache_mb is not None:
+        table_cache = LruCache(max_bytes=int(table_cache_mb * 1024 * 1024), size_of=Table.estimate_size)
+    return SpreadAccessRegistry.create(SpreadAccessRegistry.GOOGLE, spread_sheet_name, permission_path,
+                                       disk_cache=disk_cache, table_cache=table_cache, scheduler=scheduler)
 
 
-def create_crawler(spread_access: AbstractSpreadAccess, io: AbstractIO) -> RpgCrawler:
+def create_scheduler(arguments: argparse.Namespace) -> RequestScheduler:
+    """Creates the scheduler of the requests to the google api. The quota is shared by all spread sheets
+    :param arguments the program arguments accessible by argparse
+    :return the scheduler
+    """
+    return RequestScheduler(arguments.quota)
+
+
+def create_file_access(directory: str, core_workbook_name: str) -> AbstractSpreadAccess:
+    """Creates the access to local workbooks. No access to the google spread sheets is required
+    :param directory the directory of the workbooks
+    :param core_workbook_name the name of the core workbook
+    :return the spread sheet access
+    """
+    return SpreadAccessRegistry.create(SpreadAccessRegistry.FILES, directory, core_workbook_name)
+
+
+def create_bundle_access(bundle_file: str) -> AbstractSpreadAccess:
+    """Creates the access to an exported story bundle. No access to the google spread sheets is required
+    :param bundle_file the path to the story bundle
+    :return the spread sheet access
+    """
+    return SpreadAccessRegistry.create(SpreadAccessRegistry.BUNDLE, bundle_file)
+
+
+def create_crawler(spread_access: AbstractSpreadAccess, io: AbstractIO, seed: int = None,
+                   first_iteration: int = 0) -> RpgCrawler:
     """Creates the crawler that iterates the excel sheets
     :param spread_access the spread sheet access
     :param io the io interaction interface for the user
+    :param seed the seed of the random streams of the iterations
+    :param first_iteration the number of the first iteration
     :return the excel sheet crawler
     """
-    return RpgCrawler(spread_access, io)
+    return RpgCrawler(spread_access, io, seed, first_iteration)
 
 
 def create_io():
@@ -52,6 +176,94 @@ def create_io():
     return ConsoleIO()
 
 
+def create_stream_io(output_format: str, stream, iterations: int, first_iteration: int = 0) -> AbstractIO:
+    """ the non interactive output of the iterations
+    :param output_format the format of the output (text, jsonl or csv)
+    :param stream the text stream to write to
+    :param iterations the number of iterations to execute
+    :param first_iteration the number of the first iteration
+    :return the io interface
+    """
+    if output_format == "jsonl":
+        return JsonLinesIO(stream, iterations, first_iteration=first_iteration)
+    if output_format == "csv":
+        return CsvIO(stream, iterations, first_iteration=first_iteration)
+    return TextStreamIO(stream, iterations, first_iteration=first_iteration)
+
+
+def run_parallel(spread_access: AbstractSpreadAccess, bundle_file: str, arguments: argparse.Namespace,
+                 io: AbstractIO) -> None:
+    """ Executes the iterations in multiple processes. Every process uses the given story bundle. In case no bundle
+    is given, the story will be exported into a temporary bundle first
+    :param spread_access the spread sheet access
+    :param bundle_file the optional story bundle
+    :param arguments the program arguments accessible by argparse
+    :param io the io interface that writes the results
+    """
+    # the processes are only imported, if they are used
+    from core.ParallelCrawler import ParallelCrawler
+    if bundle_file:
+        ParallelCrawler(bundle_file, arguments.processes, arguments.seed,
+                        first_iteration=arguments.first_iteration).crawl(arguments.iterations, io)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            bundle_file = os.path.join(directory, "story.rpgb")
+            SpreadAccessRegistry.load(SpreadAccessRegistry.BUNDLE).export(spread_access, bundle_file)
+            ParallelCrawler(bundle_file, arguments.processes, arguments.seed,
+                            first_iteration=arguments.first_iteration).crawl(arguments.iterations, io)
+    io.close()
+
+
+def run(crawler: RpgCrawler, io: AbstractIO) -> None:
+    """ Executes the crawler for the iterations determined by the io
+    :param crawler the excel sheet crawler
+    :param io the io interface that determines the iterations and writes the results
+    """
+    while True:
+        iteration = io.iterations()
+        if iteration == 0:
+            break
+        for i in range(1, iteration + 1):
+            crawler.crawl()
+    io.close()
+
+
+def serve(arguments: argparse.Namespace) -> None:
+    """ Starts the http server that serves the iterations of the stories until the application is stopped. The
+    stories are read from the google sheets or, if specified, from the story bundle or the local workbooks
+    :param arguments the program arguments accessible by argparse
+    """
+    # the http server is only imported, if it is used
+    from core.RollServer import RollServer
+    if arguments.bundle:
+        bundle_access = create_bundle_access(arguments.bundle)
+
+        def spread_access_factory(_sheet_name: str) -> AbstractSpreadAccess:
+            return bundle_access
+    elif arguments.directory:
+        def spread_access_factory(sheet_name: str) -> AbstractSpreadAccess:
+            return create_file_access(arguments.directory, sheet_name)
+    else:
+        scheduler = create_scheduler(arguments)
+
+        def spread_access_factory(sheet_name: str) -> AbstractSpreadAccess:
+            return create_spread_access(sheet_name, arguments.cache, arguments.cache_ttl, arguments.table_cache_mb,
+                                        scheduler)
+    server = RollServer((arguments.host, arguments.serve), spread_access_factory)
+    if arguments.f:
+        # the story of the start sheet is loaded before the first request
+        server.story(determine_excel_sheet_name(arguments))
+    print("Der Server wartet auf http://{}:{}/stories/<sheet>/roll?n=1".format(arguments.host, server.port),
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    write_metrics(arguments)
+
+
 def init_log(arguments: argparse.Namespace) -> None:
     """ Sets the root logger and the application logger to debug
     :param arguments the program arguments accessible by argparse
@@ -67,24 +279,69 @@ def init_log(arguments: argparse.Namespace) -> None:
         logging.getLogger('').addHandler(crawl_logic_stream)
 
 
+def run_headless(spread_access: AbstractSpreadAccess, arguments: argparse.Namespace, io: AbstractIO) -> None:
+    """ Executes the iterations without user interaction, either in this process or in multiple processes
+    :param spread_access the spread sheet access
+    :param arguments the program arguments accessible by argparse
+    :param io the io interface that writes the results
+    """
+    if arguments.processes:
+        run_parallel(spread_access, arguments.bundle, arguments, io)
+    else:
+        run(create_crawler(spread_access, io, arguments.seed, arguments.first_iteration), io)
+
+
 def main():
     """ The main method of the application. Creates the required objects and initiates the program execution """
-    print("#################################################")
-    print("######### RPG Crawler v0.50 (30.05.2018) ########")
-    print("#################################################")
     argument_parser = create_argument_parser()
     arguments = argument_parser.parse_args()
+    is_interactive = arguments.iterations is None and arguments.serve is None
+    if is_interactive:
+        print("#################################################")
+        print("######### RPG Crawler v0.50 (30.05.2018) ########")
+        print("#################################################")
     init_log(arguments)
-    excel_sheet_name = determine_excel_sheet_name(arguments)
-    spread = create_spread_access(excel_sheet_name)
-    io = create_io()
-    crawler = create_crawler(spread, io)
-    while True:
-        iteration = io.iterations()
-        if iteration == 0:
-            break
-        for i in range(1, iteration + 1):
-            crawler.crawl()
+    if arguments.stats or arguments.metrics_file:
+        Metrics.enable()
+    if arguments.trace:
+        Tracer.enable()
+    if arguments.serve is not None:
+        serve(arguments)
+        return
+    if arguments.bundle:
+        spread = create_bundle_access(arguments.bundle)
+    elif arguments.directory and arguments.f:
+        spread = create_file_access(arguments.directory, determine_excel_sheet_name(arguments))
+    elif arguments.f:
+        excel_sheet_name = determine_excel_sheet_name(arguments)
+        spread = create_spread_access(excel_sheet_name, arguments.cache, arguments.cache_ttl,
+                                      arguments.table_cache_mb, create_scheduler(arguments))
+    else:
+        argument_parser.error("Entweder der Name des Start Google Sheets (--f) oder ein Story-Bundle (--bundle) "
+                              "muss angegeben werden.")
+        return
+    if arguments.export:
+        table_count = SpreadAccessRegistry.load(SpreadAccessRegistry.BUNDLE).export(spread, arguments.export)
+        print("{} Tabellen wurden in das Story-Bundle '{}' exportiert.".format(table_count, arguments.export))
+        return
+    # loads all tables of the story before the generation starts
+    spread.prefetch(arguments.prefetch_threads)
+    TableOptimizer(spread).optimize()
+    if arguments.seed is None:
+        arguments.seed = RandomStream.create_seed()
+        if not is_interactive:
+            print("Startwert: {}".format(arguments.seed), file=sys.stderr)
+    if is_interactive:
+        io = create_io()
+        run(create_crawler(spread, io, arguments.seed, arguments.first_iteration), io)
+    elif arguments.out:
+        with open(arguments.out, "w", encoding="utf-8", newline="") as stream:
+            run_headless(spread, arguments, create_stream_io(arguments.format, stream, arguments.iterations,
+                                                             arguments.first_iteration))
+    else:
+        run_headless(spread, arguments, create_stream_io(arguments.format, sys.stdout, arguments.iterations,
+                                                         arguments.first_iteration))
+    write_metrics(arguments)
 
 
 if __name__ == '__main__':
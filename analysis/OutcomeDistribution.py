@@ -0,0 +1,171 @@
+import re
+
+from generator.DiceExpression import DiceExpression
+from generator.DiceThrow import DiceThrow
+from generator.TableReference import TableReference
+from sheet.AbstractSpreadAccess import AbstractSpreadAccess
+
+
+class OutcomeDistribution(object):
+    """ The exact probability distribution of the generated texts of a table. The distribution is computed in a
+    single pass over the table graph instead of sampling: the chances of the rows are weighted, the sums of dice
+    throws are convolved and referenced tables are mixed into the rows that reference them.
+    """
+    # the maximum number of different texts of a row or a table, before the analysis is aborted
+    DEFAULT_MAX_OUTCOMES = int(1000000)
+    NUMBER_PATTERN = re.compile(r"-?\d+")
+    NUMBER_PLACEHOLDER = "#"
+
+
+    def __init__(self, probabilities: dict) -> None:
+        """ Constructor
+
+        :param probabilities the generated text to its probability
+        """
+        self.__probabilities = probabilities
+
+
+    @staticmethod
+    def of_table(table, max_outcomes: int = DEFAULT_MAX_OUTCOMES):
+        """ Computes the distribution of the generated texts of the table
+
+        :param table the table (sheet.Table) to analyze
+        :param max_outcomes the maximum number of different texts of a row or a table
+        :return the distribution
+        """
+        return OutcomeDistribution(OutcomeDistribution.__table_outcomes(table, dict(), list(), max_outcomes))
+
+
+    @staticmethod
+    def of_story(spread_access: AbstractSpreadAccess, max_outcomes: int = DEFAULT_MAX_OUTCOMES) -> list:
+        """ Computes the distributions of all story tables. The story tables are determined independently, i.e. the
+        expected values of the whole story are the sums of the expected values of its tables
+
+        :param spread_access the access to the spreads of the story
+        :param max_outcomes the maximum number of different texts of a row or a table
+        :return a list with the (table name, distribution) of every story table
+        """
+        analyzed = dict()
+        distributions = list()
+        for table_name in spread_access.story_table_names():
+            table = spread_access.get_table(table_name)
+            distributions.append((table_name, OutcomeDistribution(
+                OutcomeDistribution.__table_outcomes(table, analyzed, list(), max_outcomes))))
+        return distributions
+
+
+    @staticmethod
+    def dice_distribution(quantity: int, dice: int) -> dict:
+        """ Computes the distribution of the sum of a dice throw (see DiceExpression.dice_distribution)
+
+        :param quantity how often the dice is thrown
+        :param dice the number of sides of the dice
+        :return the sum to its probability
+        """
+        return DiceExpression.dice_distribution(quantity, dice)
+
+
+    @staticmethod
+    def __table_outcomes(table, analyzed: dict, path: list, max_outcomes: int) -> dict:
+        """ Computes the generated texts of the table with their probabilities
+
+        :param table the table to analyze
+        :param analyzed the already computed tables (lower case table name -> outcomes)
+        :param path the names of the tables that are currently analyzed, i.e. that reference this table
+        :param max_outcomes the maximum number of different texts
+        :return the generated text to its probability
+        """
+        key = table.table_name.lower()
+        if key in analyzed:
+            return analyzed[key]
+        if key in [name.lower() for name in path]:
+            raise ValueError("Die Tabelle '{}' referenziert sich selbst: {}".format(
+                table.table_name, " -> ".join(path + [table.table_name])))
+        total_chance = sum(row.get_chance for row in table.table_rows)
+        if total_chance <= 0:
+            raise ValueError("Die Tabelle '{}' enthält keine Zeile mit einer Chance.".format(table.table_name))
+        path.append(table.table_name)
+        outcomes = dict()
+        for row in table.table_rows:
+            if row.get_chance <= 0:
+                continue
+            weight = row.get_chance / total_chance
+            for text, probability in OutcomeDistribution.__row_outcomes(row, analyzed, path, max_outcomes).items():
+                outcomes[text] = outcomes.get(text, 0.0) + weight * probability
+            OutcomeDistribution.__verify_size(table.table_name, outcomes, max_outcomes)
+        path.pop()
+        analyzed[key] = outcomes
+        return outcomes
+
+
+    @staticmethod
+    def __row_outcomes(row, analyzed: dict, path: list, max_outcomes: int) -> dict:
+        """ Computes the generated texts of the row with their probabilities. The generators of a row are
+        independent, i.e. their outcomes are combined as product
+
+        :return the generated text to its probability
+        """
+        outcomes = {"": 1.0}
+        for i, part in enumerate(row.compile_template()):
+            # static texts at the even and generators at the odd positions
+            if i % 2 == 0:
+                outcomes = {text + part: probability for text, probability in outcomes.items()}
+                continue
+            if isinstance(part, DiceThrow):
+                part_outcomes = {str(value): probability for value, probability in part.distribution().items()}
+            elif isinstance(part, TableReference):
+                part_outcomes = OutcomeDistribution.__table_outcomes(part.referenced_table(), analyzed, path,
+                                                                     max_outcomes)
+            else:
+                raise ValueError("Der Generator '{}' kann nicht analysiert werden.".format(part.get_text))
+            combined = dict()
+            for text, probability in outcomes.items():
+                for part_text, part_probability in part_outcomes.items():
+                    combined_text = text + part_text
+                    combined[combined_text] = combined.get(combined_text, 0.0) + probability * part_probability
+            outcomes = combined
+            OutcomeDistribution.__verify_size(row.get_text, outcomes, max_outcomes)
+        return outcomes
+
+
+    @staticmethod
+    def __verify_size(name: str, outcomes: dict, max_outcomes: int) -> None:
+        """ Aborts the analysis, if there are too many different texts """
+        if len(outcomes) > max_outcomes:
+            raise ValueError("'{}' erzeugt mehr als {} verschiedene Ergebnisse.".format(name, max_outcomes))
+
+
+    def probability(self, text: str) -> float:
+        """ :return the probability of the generated text """
+        return self.__probabilities.get(text, 0.0)
+
+
+    def most_likely(self, n: int = 10) -> list:
+        """ :return the n most likely generated texts as (text, probability) """
+        return sorted(self.__probabilities.items(), key=lambda item: (-item[1], item[0]))[:n]
+
+
+    def expected_values(self) -> dict:
+        """ Computes the expected values of the numeric results. Texts are grouped by their numbers replaced with #,
+        e.g. "7 Gold" and "12 Gold" are the numeric result "# Gold". The expected value of a result is the average of
+        its numbers over all generated texts (0, if the result was not generated), i.e. the expected gold of a roll.
+
+        :return the result (e.g. "# Gold") to a tuple with the expected value of every number of the result
+        """
+        expected_values = dict()
+        for text, probability in self.__probabilities.items():
+            numbers = OutcomeDistribution.NUMBER_PATTERN.findall(text)
+            if not numbers:
+                continue
+            result = OutcomeDistribution.NUMBER_PATTERN.sub(OutcomeDistribution.NUMBER_PLACEHOLDER, text)
+            values = expected_values.get(result, [0.0] * len(numbers))
+            for i, number in enumerate(numbers):
+                values[i] += probability * int(number)
+            expected_values[result] = values
+        return {result: tuple(values) for result, values in expected_values.items()}
+
+
+    @property
+    def probabilities(self) -> dict:
+        """ :return the generated texts to their probabilities """
+        return dict(self.__probabilities)
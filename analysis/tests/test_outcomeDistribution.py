@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+from analysis.OutcomeDistribution import OutcomeDistribution
+from sheet.tests.DictSpreadAccess import DictSpreadAccess
+
+
+class TestOutcomeDistribution(TestCase):
+    def setUp(self):
+        self.spread_access = DictSpreadAccess("Drachenhort", ["Münzen", "Beute"], {
+            "Münzen": [(1, "[2W6] Gold")],
+            "Beute": [(1, "[1W4] Gold"), (1, "[Tabelle: Edelsteine]"), (0, "nie")],
+            "Edelsteine": [(1, "Rubin"), (3, "[Tabelle: Fluch] Opal")],
+            "Fluch": [(1, "verfluchter"), (1, "heiliger")],
+            "Kreis": [(1, "[Tabelle: Schleife]")],
+            "Schleife": [(1, "[Tabelle: Kreis]")],
+        })
+
+    def test_dice_distribution(self):
+        distribution = OutcomeDistribution.dice_distribution(2, 6)
+        self.assertEqual(list(range(2, 13)), sorted(distribution))
+        self.assertAlmostEqual(6 / 36, distribution[7])
+        self.assertAlmostEqual(1.0, sum(distribution.values()))
+
+    def test_table_distribution_mixes_the_referenced_tables(self):
+        distribution = OutcomeDistribution.of_table(self.spread_access.get_table("Beute"))
+        self.assertAlmostEqual(1 / 8, distribution.probability("Rubin"))
+        self.assertAlmostEqual(3 / 16, distribution.probability("heiliger Opal"))
+        self.assertAlmostEqual(1 / 8, distribution.probability("3 Gold"))
+        self.assertEqual(0.0, distribution.probability("nie"))
+        self.assertAlmostEqual(1.0, sum(distribution.probabilities.values()))
+        self.assertEqual({"# Gold"}, set(distribution.expected_values()))
+        self.assertAlmostEqual(0.5 * 2.5, distribution.expected_values()["# Gold"][0])
+
+    def test_story_expected_values(self):
+        distributions = OutcomeDistribution.of_story(self.spread_access)
+        self.assertEqual(["Münzen", "Beute"], [table_name for table_name, _distribution in distributions])
+        self.assertAlmostEqual(7.0, distributions[0][1].expected_values()["# Gold"][0])
+
+    def test_cycle(self):
+        with self.assertRaises(ValueError) as context:
+            OutcomeDistribution.of_table(self.spread_access.get_table("Kreis"))
+        self.assertIn("Kreis -> Schleife -> Kreis", str(context.exception))
+
+    def test_too_many_outcomes(self):
+        with self.assertRaises(ValueError):
+            OutcomeDistribution.of_table(self.spread_access.get_table("Münzen"), max_outcomes=5)
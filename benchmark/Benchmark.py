@@ -0,0 +1,180 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from benchmark.SyntheticSpreadAccess import SyntheticSpreadAccess
+from core.RpgCrawler import RpgCrawler
+from generator.RandomStream import RandomStream
+from interaction.AbstractIO import AbstractIO
+
+# the metrics where a higher value is better. For all other metrics (seconds, bytes) a lower value is better
+RATE_METRICS = ("draws_per_second", "generates_per_second", "crawls_per_second")
+DEFAULT_ROW_COUNTS = (10, 1000, 100000, 1000000)
+
+
+class DiscardingIO(AbstractIO):
+    """ Generates the story lines like a real io but discards them """
+
+    def print_story_context(self, context: str) -> None:
+        """ Discards the context """
+        pass
+
+
+    def print_story_line(self, table, rng=None) -> None:
+        """ Determines a row by chance and generates its text """
+        table.generate(rng)
+
+
+    def iterations(self) -> int:
+        """ :return 0, the iterations are determined by the benchmark """
+        return 0
+
+
+def create_scenarios(max_rows: int) -> dict:
+    """ Creates the synthetic stories of the benchmark
+
+    :param max_rows the maximum number of rows of a table
+    :return the name of every scenario to a function that creates its spread access
+    """
+    scenarios = dict()
+    for row_count in DEFAULT_ROW_COUNTS:
+        if row_count <= max_rows:
+            scenarios["rows_{}".format(row_count)] = \
+                lambda row_count=row_count: SyntheticSpreadAccess(row_count)
+    scenarios["dice_heavy"] = lambda: SyntheticSpreadAccess(1000, dice_per_row=4, dice_expression="10W10+3W6")
+    scenarios["large_dice_pool"] = lambda: SyntheticSpreadAccess(1000, dice_per_row=1, dice_expression="100W100")
+    scenarios["reference_chain"] = lambda: SyntheticSpreadAccess(100, story_table_count=3, chain_depth=50)
+    return scenarios
+
+
+def measure_rate(operation, operations: int) -> float:
+    """ :return the number of executions of the operation per second """
+    start = time.perf_counter()
+    for _i in range(operations):
+        operation()
+    return operations / max(time.perf_counter() - start, 1e-9)
+
+
+def run_scenario(create_spread_access, operations: int, seed: int) -> dict:
+    """ Measures a scenario
+
+    :param create_spread_access the function that creates the spread access of the scenario
+    :param operations the number of draws, generations and crawls that are measured
+    :param seed the seed of the random streams
+    :return the metrics of the scenario
+    """
+    spread_access = create_spread_access()
+    start = time.perf_counter()
+    spread_access.prefetch()
+    build_seconds = time.perf_counter() - start
+
+    # the memory is measured separately, since tracemalloc slows down the build
+    tracemalloc.start()
+    create_spread_access().prefetch()
+    _current, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    table = spread_access.get_table(spread_access.story_table_names()[0])
+    rng = RandomStream(seed)
+    draws_per_second = measure_rate(lambda: table.get_row_by_chance(rng), operations)
+    rows = [table.get_row_by_chance(rng) for _i in range(operations)]
+    rows_iterator = iter(rows)
+    generates_per_second = measure_rate(lambda: next(rows_iterator).generate(rng), operations)
+    crawler = RpgCrawler(spread_access, DiscardingIO(), seed)
+    crawls_per_second = measure_rate(crawler.crawl, max(1, operations // 10))
+    return {
+        "build_seconds": round(build_seconds, 6),
+        "peak_memory_bytes": peak_memory,
+        "draws_per_second": round(draws_per_second, 1),
+        "generates_per_second": round(generates_per_second, 1),
+        "crawls_per_second": round(crawls_per_second, 1),
+    }
+
+
+def current_commit() -> str:
+    """ :return the current git commit or None, if it can not be determined """
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL,
+                                       universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(max_rows: int, operations: int, seed: int, scenario_names: list = None) -> dict:
+    """ Runs the benchmark
+
+    :param max_rows the maximum number of rows of a table
+    :param operations the number of measured operations per metric
+    :param seed the seed of the random streams
+    :param scenario_names optional names of the scenarios to run. All scenarios if not specified
+    :return the results as json object
+    """
+    results = dict()
+    for name, create_spread_access in create_scenarios(max_rows).items():
+        if not scenario_names or name in scenario_names:
+            results[name] = run_scenario(create_spread_access, operations, seed)
+    return {"commit": current_commit(), "python": platform.python_version(), "operations": operations,
+            "results": results}
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list:
+    """ Compares the results with the results of a baseline (e.g. of the previous commit)
+
+    :param baseline the results of the baseline
+    :param current the current results
+    :param tolerance the relative deviation that is not a regression (e.g. 0.1 for 10%)
+    :return a list with a (scenario, metric, baseline value, current value) of every regression
+    """
+    regressions = list()
+    for name, metrics in current["results"].items():
+        baseline_metrics = baseline["results"].get(name, dict())
+        for metric, value in metrics.items():
+            baseline_value = baseline_metrics.get(metric)
+            if not baseline_value:
+                continue
+            if metric in RATE_METRICS:
+                regressed = value < baseline_value * (1 - tolerance)
+            else:
+                regressed = value > baseline_value * (1 + tolerance)
+            if regressed:
+                regressions.append((name, metric, baseline_value, value))
+    return regressions
+
+
+def main():
+    """ Runs the benchmark and writes the results as json. Exits with 1, if a regression to the baseline was found """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-rows", type=int, default=100000, dest="max_rows",
+                        help="Die maximale Anzahl an Zeilen einer Tabelle (bis 1000000).")
+    parser.add_argument("--operations", type=int, default=20000,
+                        help="Die Anzahl der gemessenen Operationen je Messung.")
+    parser.add_argument("--seed", type=int, default=42, help="Der Startwert der Zufallszahlen.")
+    parser.add_argument("--scenario", action="append", help="Führt nur die angegebenen Szenarien aus.")
+    parser.add_argument("--out", help="Die Datei in die die Ergebnisse geschrieben werden (Standard: Konsole).")
+    parser.add_argument("--compare", help="Die Ergebnisse eines vorherigen Laufs, mit denen verglichen wird.")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Die erlaubte relative Abweichung zum vorherigen Lauf (Standard: 0.1).")
+    arguments = parser.parse_args()
+    results = run(arguments.max_rows, arguments.operations, arguments.seed, arguments.scenario)
+    if arguments.out:
+        with open(arguments.out, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    if arguments.compare:
+        with open(arguments.compare, encoding="utf-8") as file:
+            regressions = compare(json.load(file), results, arguments.tolerance)
+        for name, metric, baseline_value, value in regressions:
+            print("Verschlechterung in {} / {}: {} -> {}".format(name, metric, baseline_value, value),
+                  file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# the modules that must not be imported on start, since they are only required by some backends or modes
+HEAVY_MODULES = ("gspread", "oauth2client", "requests", "numpy", "http.server", "multiprocessing")
+# the maximum time to import the application in seconds (without the start of the interpreter)
+DEFAULT_BUDGET = 0.2
+# imports the module in a fresh interpreter and prints the import time and the loaded heavy modules as json
+MEASURE_SCRIPT = """
+import importlib, json, sys, time
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "heavy_modules": [name for name in sys.argv[2:] if name in sys.modules]}))
+"""
+
+
+def measure(module_name: str, repeat: int = 5) -> dict:
+    """ Measures the cold start import of a module. Every import runs in a new interpreter
+
+    :param module_name the module to import (e.g. AppStart)
+    :param repeat the number of measurements. The fastest one is reported
+    :return the import time in seconds and the heavy modules that were imported
+    """
+    root_path = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+    results = list()
+    for _i in range(repeat):
+        output = subprocess.check_output([sys.executable, "-c", MEASURE_SCRIPT, module_name] + list(HEAVY_MODULES),
+                                         cwd=root_path, universal_newlines=True)
+        results.append(json.loads(output))
+    return {"module": module_name, "seconds": round(min(result["seconds"] for result in results), 6),
+            "heavy_modules": sorted(set(name for result in results for name in result["heavy_modules"]))}
+
+
+def main():
+    """ Measures the import of the application and prints the result as json. Exits with 1, if the import exceeds the
+    budget or imports a heavy module """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", action="append",
+                        help="Die Module, deren Import gemessen wird (Standard: AppStart).")
+    parser.add_argument("--repeat", type=int, default=5, help="Die Anzahl der Messungen je Modul.")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET,
+                        help="Die maximale Dauer des Imports in Sekunden (Standard: {}).".format(DEFAULT_BUDGET))
+    arguments = parser.parse_args()
+    results = [measure(module_name, arguments.repeat) for module_name in arguments.module or ["AppStart"]]
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    exceeded = False
+    for result in results:
+        if result["seconds"] > arguments.budget:
+            print("Der Import von {} dauert {} Sekunden (Budget: {})".format(
+                result["module"], result["seconds"], arguments.budget), file=sys.stderr)
+            exceeded = True
+        if result["heavy_modules"]:
+            print("Der Import von {} lädt {}".format(result["module"], ", ".join(result["heavy_modules"])),
+                  file=sys.stderr)
+            exceeded = True
+    if exceeded:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
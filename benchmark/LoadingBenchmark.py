@@ -0,0 +1,81 @@
+import argparse
+import json
+import sys
+import time
+
+from gspread.exceptions import APIError
+
+from sheet.GSpreadAccess import GSpreadAccess
+from sheet.RequestScheduler import RequestScheduler
+from sheet.SimulatedClient import SimulatedClient
+
+
+def create_spread_sheets(table_count: int, row_count: int) -> dict:
+    """ Creates a recorded core sheet with a story of the given number of tables
+
+    :param table_count the number of story tables
+    :param row_count the number of rows of every table
+    :return the spread sheets (spread sheet name -> worksheet title -> rows)
+    """
+    table_names = ["Tabelle{}".format(i) for i in range(table_count)]
+    worksheets = {"Story": [["Synthetische Story"], [], [], ["Tabelle"]] + [[name] for name in table_names]}
+    for name in table_names:
+        worksheets[name] = [[str(i % 7 + 1), "Eintrag {} [2W6]".format(i)] for i in range(row_count)]
+    return {"Kern": worksheets}
+
+
+def measure(table_count: int, row_count: int, workers: int, arguments: argparse.Namespace) -> dict:
+    """ Measures the prefetch of a story with the simulated google api
+
+    :param table_count the number of story tables
+    :param row_count the number of rows of every table
+    :param workers the number of tables that are loaded at the same time
+    :param arguments the simulated behaviour of the api
+    :return the measured duration and requests
+    """
+    client = SimulatedClient(create_spread_sheets(table_count, row_count), arguments.latency, arguments.jitter,
+                             arguments.quota, arguments.quota_window, arguments.error_rate, arguments.seed)
+    scheduler = None
+    if arguments.scheduled and arguments.quota:
+        scheduler = RequestScheduler(arguments.quota, arguments.quota_window, seed=arguments.seed)
+    elif arguments.scheduled:
+        scheduler = RequestScheduler(seed=arguments.seed)
+    start = time.perf_counter()
+    error = None
+    try:
+        GSpreadAccess("Kern", None, client=client, scheduler=scheduler).prefetch(workers)
+    except APIError as api_error:
+        error = str(api_error)
+    return {"tables": table_count, "workers": workers, "seconds": round(time.perf_counter() - start, 4),
+            "requests": client.request_count, "rejected": client.rejected_count, "failed": client.failed_count,
+            "retries": scheduler.retry_count if scheduler else 0, "error": error}
+
+
+def main():
+    """ Measures how the prefetch of the tables scales with the number of tables and workers and prints the results
+    as json """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tables", type=int, nargs="+", default=[10, 50, 200], help="Die Anzahl der Tabellen.")
+    parser.add_argument("--rows", type=int, default=100, help="Die Anzahl der Zeilen einer Tabelle.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16],
+                        help="Die Anzahl der gleichzeitig geladenen Tabellen.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Die Latenz einer Anfrage in Sekunden.")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Die maximale Abweichung der Latenz in Sekunden.")
+    parser.add_argument("--quota", type=int, help="Die maximale Anzahl an Anfragen im Quota-Zeitfenster.")
+    parser.add_argument("--quota-window", type=float, default=SimulatedClient.DEFAULT_QUOTA_WINDOW,
+                        dest="quota_window", help="Das Quota-Zeitfenster in Sekunden.")
+    parser.add_argument("--error-rate", type=float, default=0.0, dest="error_rate",
+                        help="Die Wahrscheinlichkeit eines Fehlers (429 / 5xx) je Anfrage.")
+    parser.add_argument("--seed", type=int, default=42, help="Der Startwert der Latenzen und Fehler.")
+    parser.add_argument("--scheduled", action="store_true",
+                        help="Sendet die Anfragen über den RequestScheduler (Quota, Wiederholungen und "
+                             "zusammengefasste Bereiche).")
+    arguments = parser.parse_args()
+    results = [measure(table_count, arguments.rows, workers, arguments)
+               for table_count in arguments.tables for workers in arguments.workers]
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
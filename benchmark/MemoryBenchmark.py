@@ -0,0 +1,64 @@
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+
+from sheet.Table import Table
+from sheet.TableRow import TableRowEntry
+
+
+def create_rows(row_count: int) -> list:
+    """ Creates the (chance, text) of synthetic table rows. Like in real tables, most texts are repeated and a part
+    of them contains generators
+
+    :param row_count the number of rows
+    :return a list with the (chance, text) of every row
+    """
+    texts = ["Rubin", "[2W6] Gold", "[1W4] Silber und [Tabelle: Edelsteine]", "ein rostiger Dolch",
+             "[3W20] Perlen", "Opal [Tabelle: Fluch#Alt]"]
+    return [(str(i % 7 + 1), "{} ({})".format(texts[i % len(texts)], i % 1000)) for i in range(row_count)]
+
+
+def measure(row_count: int, table_count: int) -> dict:
+    """ Measures the memory of tables that are loaded like Table.from_sheet and generated once (i.e. the generators
+    of the rows are analyzed)
+
+    :param row_count the number of rows of a table
+    :param table_count the number of tables
+    :return the measured memory as json object
+    """
+    rows = create_rows(row_count)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tables = list()
+    for i in range(table_count):
+        table = Table("Tabelle {}".format(i))
+        for chance, text in rows:
+            table.add_table_row(TableRowEntry(None, int(chance), "".join(list(text))))
+        table.freeze()
+        for row in table.table_rows:
+            row.generators
+        tables.append(table)
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return {"tables": table_count, "rows_per_table": row_count, "bytes": allocated,
+            "bytes_per_row": round(allocated / (row_count * table_count), 1),
+            "estimated_bytes": sum(table.estimate_size() for table in tables)}
+
+
+def main():
+    """ Prints the memory of the loaded tables as json """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000, help="Die Anzahl der Zeilen einer Tabelle.")
+    parser.add_argument("--tables", type=int, default=3, help="Die Anzahl der Tabellen.")
+    arguments = parser.parse_args()
+    json.dump(measure(arguments.rows, arguments.tables), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
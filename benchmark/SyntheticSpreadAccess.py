@@ -0,0 +1,124 @@
+from sheet.AbstractSpreadAccess import AbstractSpreadAccess
+from sheet.Table import Table
+
+
+class SyntheticSpreadAccess(AbstractSpreadAccess):
+    """ An in-memory spread access that generates the tables of a synthetic story, e.g. for benchmarks. The story
+    consists of story tables with a configurable number of rows. Optionally, rows contain dice throws and the first
+    row of every story table starts a chain of table references (Kette1 -> Kette2 -> ...).
+    """
+    CHAIN_TABLE_PATTERN = "Kette{}"
+    CHAIN_TABLE_ROWS = int(10)
+    TEXTS = ["Rubin", "ein rostiger Dolch", "Opal", "ein Beutel mit Kräutern", "eine Karte", "ein Ring"]
+
+
+    def __init__(self, row_count: int = 1000, story_table_count: int = 1, dice_per_row: int = 0,
+                 dice_expression: str = "3W6", chain_depth: int = 0) -> None:
+        """ Constructor
+
+        :param row_count the number of rows of every story table
+        :param story_table_count the number of story tables
+        :param dice_per_row the number of dice throws of every row (e.g. 2 -> "[3W6] Gold und [3W6] Silber")
+        :param dice_expression the dice expression of the dice throws
+        :param chain_depth the number of tables in the chain of table references. 0 for no references
+        """
+        self.__row_count = row_count
+        self.__story_tables = ["Story{}".format(i) for i in range(story_table_count)]
+        self.__dice_per_row = dice_per_row
+        self.__dice_expression = dice_expression
+        self.__chain_depth = chain_depth
+        # the lower case table name to the table
+        self.__table_cache = dict()
+
+
+    def table_rows(self, table_name: str) -> list:
+        """ Generates the rows of a table
+
+        :param table_name the name of the table
+        :return a list with the (chance, text) of every row
+        """
+        if table_name.lower().startswith(SyntheticSpreadAccess.CHAIN_TABLE_PATTERN.format("").lower()):
+            depth = int(table_name[len(SyntheticSpreadAccess.CHAIN_TABLE_PATTERN.format("")):])
+            row_count = SyntheticSpreadAccess.CHAIN_TABLE_ROWS
+        elif table_name in self.__story_tables:
+            depth = 0
+            row_count = self.__row_count
+        else:
+            raise ValueError("Die Tabelle '{}' existiert nicht.".format(table_name))
+        rows = list()
+        for i in range(row_count):
+            text = SyntheticSpreadAccess.TEXTS[i % len(SyntheticSpreadAccess.TEXTS)]
+            if self.__dice_per_row:
+                text = " und ".join("[{}] {}".format(self.__dice_expression, text)
+                                    for _j in range(self.__dice_per_row))
+            if i == 0 and depth < self.__chain_depth:
+                text = "{} [Tabelle: {}]".format(text, SyntheticSpreadAccess.CHAIN_TABLE_PATTERN.format(depth + 1))
+            rows.append((str(i % 7 + 1), text))
+        return rows
+
+
+    def crawl_main_sheet(self) -> list:
+        """ :return a list with all table names of the story """
+        for table_name in self.__story_tables:
+            self.get_table(table_name)
+        return list(self.__story_tables)
+
+
+    def story_table_names(self) -> list:
+        """ :return a list with all table names of the story. The tables will not be created """
+        return list(self.__story_tables)
+
+
+    def crawl_sheet_column_in_range(self, table_name: str, sheet_name: str, column_pattern: str, row_pos: int) -> list:
+        """ :return the values of the chance or text column in the read range from the given row position """
+        rows = self.table_rows(table_name)
+        column = 0 if column_pattern == self.chance_range_column_pattern else 1
+        return [rows[i][column] if i < len(rows) else ""
+                for i in range(row_pos - 1, row_pos + self.read_range)]
+
+
+    def crawl_table_rows(self, table_name: str, sheet_name: str) -> list:
+        """ :return a list with the (chance, text) of every row of the table """
+        return self.table_rows(table_name)
+
+
+    def get_table(self, table_name: str, sheet_name: str = AbstractSpreadAccess.DEFAULT_SHEET_NAME):
+        """ Creates the table on the first access
+
+        :param table_name the name of the table
+        :param sheet_name not used
+        :return the table
+        """
+        table = self.__table_cache.get(table_name.lower())
+        if table is None:
+            table = Table.from_sheet(self, table_name, sheet_name)
+            self.__table_cache[table_name.lower()] = table
+        return table
+
+
+    def clear(self) -> None:
+        """ Forgets all created tables """
+        self.__table_cache.clear()
+
+
+    def story_context(self) -> str:
+        """ :return the context / name of the story """
+        return "Synthetische Story"
+
+
+    @property
+    def read_range(self) -> int:
+        """ :return the range of rows to be read """
+        return 10
+
+
+    @property
+    def chance_range_column_pattern(self) -> str:
+        """:return the range pattern for the chance column in data tables """
+        return "A{}:A{}"
+
+
+    @property
+    def text_range_column_pattern(self) -> str:
+        """:return the range pattern for the text column in data tables """
+        return "B{}:B{}"
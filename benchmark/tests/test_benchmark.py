@@ -0,0 +1,25 @@
+from unittest import TestCase
+
+from benchmark import Benchmark
+from benchmark.SyntheticSpreadAccess import SyntheticSpreadAccess
+
+
+class TestBenchmark(TestCase):
+    def test_synthetic_story(self):
+        spread_access = SyntheticSpreadAccess(20, story_table_count=2, dice_per_row=2, chain_depth=3)
+        tables = spread_access.prefetch()
+        self.assertEqual(["Story0", "Story1", "Kette1", "Kette2", "Kette3"],
+                         [table.table_name for table, _sheet_name in tables])
+        self.assertEqual(20, len(tables[0][0].table_rows))
+        self.assertEqual("[3W6] Rubin und [3W6] Rubin [Tabelle: Kette1]", tables[0][0].table_rows[0].get_text)
+        self.assertEqual(["Story0", "Story1"], spread_access.crawl_main_sheet())
+
+    def test_run_and_compare(self):
+        results = Benchmark.run(10, 20, 1, ["rows_10", "reference_chain"])
+        self.assertEqual({"rows_10", "reference_chain"}, set(results["results"]))
+        self.assertEqual({"build_seconds", "peak_memory_bytes", "draws_per_second", "generates_per_second",
+                          "crawls_per_second"}, set(results["results"]["rows_10"]))
+        baseline = {"results": {"rows_10": {"draws_per_second": 10.0, "peak_memory_bytes": 10}}}
+        current = {"results": {"rows_10": {"draws_per_second": 5.0, "peak_memory_bytes": 10}}}
+        self.assertEqual([("rows_10", "draws_per_second", 10.0, 5.0)], Benchmark.compare(baseline, current, 0.1))
+        self.assertEqual([], Benchmark.compare(current, baseline, 0.1))
@@ -0,0 +1,23 @@
+import os
+import unittest
+from unittest import TestCase
+
+from benchmark import ImportBenchmark
+
+# the wall clock of the import depends on the machine, i.e. the budget (in seconds) is only verified on demand, e.g.
+# RPGCRAWLER_IMPORT_BUDGET=0.2. The command line of the benchmark verifies the budget, too
+IMPORT_BUDGET = os.environ.get("RPGCRAWLER_IMPORT_BUDGET")
+
+
+class TestImportBenchmark(TestCase):
+    def test_application_start_without_heavy_modules(self):
+        self.assertEqual([], ImportBenchmark.measure("AppStart", repeat=1)["heavy_modules"])
+
+    @unittest.skipUnless(IMPORT_BUDGET, "RPGCRAWLER_IMPORT_BUDGET ist nicht gesetzt")
+    def test_application_start_within_budget(self):
+        self.assertLess(ImportBenchmark.measure("AppStart", repeat=3)["seconds"], float(IMPORT_BUDGET))
+
+    def test_core_without_dependencies(self):
+        for module_name in ("core.RpgCrawler", "sheet.Table", "sheet.AbstractSpreadAccess", "sheet.BundleSpreadAccess",
+                            "sheet.FileSpreadAccess", "sheet.RequestScheduler"):
+            self.assertEqual([], ImportBenchmark.measure(module_name, repeat=1)["heavy_modules"], module_name)
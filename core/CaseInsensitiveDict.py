@@ -0,0 +1,61 @@
+import collections.abc
+
+
+class CaseInsensitiveDict(collections.abc.MutableMapping):
+    """ A dictionary with case insensitive string keys, e.g. for the names of the tables. The keys keep the case of
+    the last assignment, i.e. iterating the dictionary returns the keys as they were set
+    """
+
+    def __init__(self, data=None, **kwargs) -> None:
+        """ Constructor
+
+        :param data optional mapping or iterable of (key, value) pairs
+        :param kwargs optional further keys and values
+        """
+        # the lower case key to the (key, value)
+        self.__store = dict()
+        self.update(data or dict(), **kwargs)
+
+
+    def __setitem__(self, key: str, value) -> None:
+        self.__store[key.lower()] = (key, value)
+
+
+    def __getitem__(self, key: str):
+        return self.__store[key.lower()][1]
+
+
+    def __delitem__(self, key: str) -> None:
+        del self.__store[key.lower()]
+
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and key.lower() in self.__store
+
+
+    def __iter__(self):
+        return (key for key, _value in self.__store.values())
+
+
+    def __len__(self) -> int:
+        return len(self.__store)
+
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, collections.abc.Mapping):
+            return NotImplemented
+        return dict(self.lower_items()) == dict(CaseInsensitiveDict(other).lower_items())
+
+
+    def __repr__(self) -> str:
+        return str(dict(self.items()))
+
+
+    def lower_items(self):
+        """ :return the (lower case key, value) of every entry """
+        return ((lower_key, entry[1]) for lower_key, entry in self.__store.items())
+
+
+    def copy(self):
+        """ :return a shallow copy of the dictionary """
+        return CaseInsensitiveDict(self.__store.values())
@@ -0,0 +1,3 @@
+# the name of the logger of the application. Kept in its own module, so that every module can log without importing
+# the crawler (and its dependencies)
+LOGGER_ID = "rpgcrawler.logic"
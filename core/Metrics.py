@@ -0,0 +1,214 @@
+import bisect
+import threading
+
+
+class Histogram(object):
+    """ The distribution of observed values (e.g. durations in seconds) in cumulative buckets """
+    __slots__ = ("__buckets", "__counts", "__count", "__sum", "__max")
+
+
+    def __init__(self, buckets: tuple) -> None:
+        """ Constructor
+
+        :param buckets the ascending upper bounds of the buckets
+        """
+        self.__buckets = buckets
+        # the last count contains the values above the last bucket (+Inf)
+        self.__counts = [0] * (len(buckets) + 1)
+        self.__count = 0
+        self.__sum = 0.0
+        self.__max = 0.0
+
+
+    def observe(self, value: float) -> None:
+        """ Adds the value to the histogram """
+        self.__counts[bisect.bisect_left(self.__buckets, value)] += 1
+        self.__count += 1
+        self.__sum += value
+        if value > self.__max:
+            self.__max = value
+
+
+    def cumulative_counts(self) -> list:
+        """ :return the (upper bound, number of values <= upper bound) of every bucket, including +Inf """
+        counts = list()
+        total = 0
+        for upper_bound, count in zip(self.__buckets + (float("inf"),), self.__counts):
+            total += count
+            counts.append((upper_bound, total))
+        return counts
+
+
+    @property
+    def count(self) -> int:
+        """ :return the number of observed values """
+        return self.__count
+
+
+    @property
+    def sum(self) -> float:
+        """ :return the sum of the observed values """
+        return self.__sum
+
+
+    @property
+    def max(self) -> float:
+        """ :return the largest observed value """
+        return self.__max
+
+
+class Metrics(object):
+    """ The counters and latency histograms of the application (e.g. the requests to the google api or the time to
+    generate a table). Metrics are disabled by default. The instrumented code checks Metrics.enabled before it measures
+    anything, i.e. disabled metrics cost a single attribute lookup.
+
+    Every metric is identified by its name and optional labels (e.g. worksheet="Edelsteine"). Collectors add values
+    that are already counted elsewhere (e.g. the hits of a cache) at the time the metrics are written.
+    """
+    enabled = False
+    PREFIX = "rpgcrawler_"
+    # the upper bounds of the latency buckets in seconds
+    DEFAULT_BUCKETS = (0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+    __counters = dict()
+    __histograms = dict()
+    __collectors = list()
+    __lock = threading.Lock()
+
+
+    @staticmethod
+    def enable(enabled: bool = True) -> None:
+        """ Enables (or disables) the metrics """
+        Metrics.enabled = enabled
+
+
+    @staticmethod
+    def reset() -> None:
+        """ Forgets all values and collectors """
+        with Metrics.__lock:
+            Metrics.__counters.clear()
+            Metrics.__histograms.clear()
+            del Metrics.__collectors[:]
+
+
+    @staticmethod
+    def increment(name: str, amount: int = 1, **labels) -> None:
+        """ Increments a counter
+
+        :param name the name of the counter without the prefix (e.g. api_requests_total)
+        :param amount the amount to add
+        :param labels the labels of the counter (e.g. worksheet="Edelsteine")
+        """
+        if not Metrics.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with Metrics.__lock:
+            Metrics.__counters[key] = Metrics.__counters.get(key, 0) + amount
+
+
+    @staticmethod
+    def observe(name: str, value: float, **labels) -> None:
+        """ Adds a value (e.g. a duration in seconds) to a histogram
+
+        :param name the name of the histogram without the prefix (e.g. crawl_seconds)
+        :param value the observed value
+        :param labels the labels of the histogram (e.g. table="Edelsteine")
+        """
+        if not Metrics.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with Metrics.__lock:
+            histogram = Metrics.__histograms.get(key)
+            if histogram is None:
+                histogram = Histogram(Metrics.DEFAULT_BUCKETS)
+                Metrics.__histograms[key] = histogram
+            histogram.observe(value)
+
+
+    @staticmethod
+    def register_collector(collector) -> None:
+        """ Registers a function that is called whenever the metrics are written
+
+        :param collector a function that returns a list of (name, labels, value) gauges
+        """
+        with Metrics.__lock:
+            Metrics.__collectors.append(collector)
+
+
+    @staticmethod
+    def counter(name: str, **labels) -> int:
+        """ :return the current value of the counter with the given name and labels """
+        with Metrics.__lock:
+            return Metrics.__counters.get((name, tuple(sorted(labels.items()))), 0)
+
+
+    @staticmethod
+    def histogram(name: str, **labels) -> Histogram:
+        """ :return the histogram with the given name and labels or None, if nothing was observed """
+        with Metrics.__lock:
+            return Metrics.__histograms.get((name, tuple(sorted(labels.items()))))
+
+
+    @staticmethod
+    def __collect() -> tuple:
+        """ :return sorted copies of the counters, the histograms and the gauges of the collectors """
+        with Metrics.__lock:
+            counters = sorted(Metrics.__counters.items())
+            histograms = sorted(Metrics.__histograms.items(), key=lambda item: item[0])
+            collectors = list(Metrics.__collectors)
+        gauges = list()
+        for collector in collectors:
+            for name, labels, value in collector():
+                gauges.append(((name, tuple(sorted(labels.items()))), value))
+        return counters, histograms, sorted(gauges)
+
+
+    @staticmethod
+    def __format_labels(labels: tuple, extra_label: tuple = None) -> str:
+        """ :return the labels in the prometheus notation (e.g. {worksheet="Edelsteine"}) """
+        if extra_label is not None:
+            labels = labels + (extra_label,)
+        if not labels:
+            return ""
+        values = ["{}=\"{}\"".format(key, str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n"))
+                  for key, value in labels]
+        return "{" + ",".join(values) + "}"
+
+
+    @staticmethod
+    def prometheus() -> str:
+        """ :return all metrics in the prometheus text format """
+        counters, histograms, gauges = Metrics.__collect()
+        lines = list()
+        types = set()
+        for metric_type, metrics in (("counter", counters), ("gauge", gauges)):
+            for (name, labels), value in metrics:
+                name = Metrics.PREFIX + name
+                if name not in types:
+                    types.add(name)
+                    lines.append("# TYPE {} {}".format(name, metric_type))
+                lines.append("{}{} {}".format(name, Metrics.__format_labels(labels), value))
+        for (name, labels), histogram in histograms:
+            name = Metrics.PREFIX + name
+            if name not in types:
+                types.add(name)
+                lines.append("# TYPE {} histogram".format(name))
+            for upper_bound, count in histogram.cumulative_counts():
+                bound = "+Inf" if upper_bound == float("inf") else repr(upper_bound)
+                lines.append("{}_bucket{} {}".format(name, Metrics.__format_labels(labels, ("le", bound)), count))
+            lines.append("{}_sum{} {!r}".format(name, Metrics.__format_labels(labels), histogram.sum))
+            lines.append("{}_count{} {}".format(name, Metrics.__format_labels(labels), histogram.count))
+        return "\n".join(lines) + "\n"
+
+
+    @staticmethod
+    def summary() -> str:
+        """ :return a readable summary of all metrics (e.g. for the console) """
+        counters, histograms, gauges = Metrics.__collect()
+        lines = list()
+        for (name, labels), value in counters + gauges:
+            lines.append("{}{}: {}".format(name, Metrics.__format_labels(labels), value))
+        for (name, labels), histogram in histograms:
+            lines.append("{}{}: {} mal, gesamt {:.6f}, durchschnittlich {:.6f}, maximal {:.6f}".format(
+                name, Metrics.__format_labels(labels), histogram.count, histogram.sum,
+                histogram.sum / histogram.count, histogram.max))
+        return "\n".join(lines)
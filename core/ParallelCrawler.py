@@ -0,0 +1,90 @@
+import multiprocessing
+import os
+
+from core.RpgCrawler import RpgCrawler
+from generator.RandomStream import RandomStream
+from interaction.RecordIO import RecordIO
+from interaction.StreamIO import StreamIO
+from sheet.BundleSpreadAccess import BundleSpreadAccess
+from sheet.TableOptimizer import TableOptimizer
+
+# the crawler of a worker process. Created once per process by ParallelCrawler.init_worker
+_worker_crawler = None
+_worker_io = None
+
+
+class ParallelCrawler:
+    """ Executes the iterations of a story in multiple processes. The iterations are split into shards of a fixed
+    size. Every worker process memory maps the same story bundle (i.e. the tables are neither downloaded nor copied per
+    process). Every iteration uses the random stream of its number within the run (see RandomStream) and the results
+    of the shards are written in the order of the shards, i.e. the output is identical to a serial run with the same
+    seed.
+    """
+    DEFAULT_SHARD_SIZE = int(1000)
+
+
+    def __init__(self, bundle_file: str, processes: int = None, seed: int = None,
+                 shard_size: int = DEFAULT_SHARD_SIZE, first_iteration: int = 0) -> None:
+        """ Constructor
+
+        :param bundle_file the path to the story bundle that will be used by every process
+        :param processes the number of worker processes (default: the number of cpus)
+        :param seed the seed of the run. If not specified, a random seed will be used
+        :param shard_size the number of iterations that are executed by a worker at once
+        :param first_iteration the number of the first iteration that will be crawled
+        """
+        self.__bundle_file = bundle_file
+        self.__processes = processes or os.cpu_count() or 1
+        self.__seed = seed if seed is not None else RandomStream.create_seed()
+        self.__shard_size = shard_size
+        self.__first_iteration = first_iteration
+
+
+    def crawl(self, iterations: int, io: StreamIO) -> None:
+        """ Executes the iterations in the worker processes and writes the records in the order of the iterations
+
+        :param iterations the number of iterations to execute
+        :param io the output for the records
+        """
+        end = self.__first_iteration + iterations
+        shards = [(start, min(self.__shard_size, end - start))
+                  for start in range(self.__first_iteration, end, self.__shard_size)]
+        with multiprocessing.Pool(self.__processes, initializer=ParallelCrawler.init_worker,
+                                  initargs=(self.__bundle_file, self.__seed)) as pool:
+            for records in pool.imap(ParallelCrawler.crawl_shard, shards):
+                for context, lines in records:
+                    io.write_record(context, lines)
+
+
+    @property
+    def seed(self) -> int:
+        """ :return the seed of the run """
+        return self.__seed
+
+
+    @staticmethod
+    def init_worker(bundle_file: str, seed: int) -> None:
+        """ Creates the crawler of a worker process and loads the story tables
+
+        :param bundle_file the path to the story bundle
+        :param seed the seed of the run
+        """
+        global _worker_crawler, _worker_io
+        spread_access = BundleSpreadAccess(bundle_file)
+        # loads and optimizes all tables of the story, like a serial run of the application
+        TableOptimizer(spread_access).optimize()
+        _worker_io = RecordIO()
+        _worker_crawler = RpgCrawler(spread_access, _worker_io, seed)
+
+
+    @staticmethod
+    def crawl_shard(shard: tuple) -> list:
+        """ Executes the iterations of a shard in a worker process
+
+        :param shard the number of the first iteration of the shard and the number of iterations
+        :return the records of the iterations
+        """
+        first_iteration, iterations = shard
+        for iteration in range(first_iteration, first_iteration + iterations):
+            _worker_crawler.crawl(iteration)
+        return _worker_io.take_records()
@@ -0,0 +1,152 @@
+import http.server
+import json
+import logging
+import re
+import socketserver
+import threading
+import urllib.parse
+
+from core.CaseInsensitiveDict import CaseInsensitiveDict
+from core.Metrics import Metrics
+from core.RpgCrawler import RpgCrawler
+from generator.RandomStream import RandomStream
+from interaction.JsonIO import JsonIO
+from sheet.TableOptimizer import TableOptimizer
+
+
+class RollServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """ A http server that keeps the stories and their loaded tables in memory and serves the iterations (rolls) of
+    a story as json, e.g. GET /stories/<sheet>/roll?n=100&seed=42&first=0
+    Every request is handled in its own thread. A story is loaded (and all its tables prefetched) on the first
+    request and shared by all following requests.
+    """
+    MAX_ROLLS = int(10000)
+    ROLL_PATH_PATTERN = re.compile(r"^/stories/([^/]+)/roll/?$")
+    METRICS_PATH = "/metrics"
+    daemon_threads = True
+
+
+    def __init__(self, address: tuple, spread_access_factory, max_rolls: int = MAX_ROLLS) -> None:
+        """ Constructor
+
+        :param address the (host, port) of the server. Port 0 selects a free port
+        :param spread_access_factory a function that creates the spread access (AbstractSpreadAccess) to the name
+            of a story sheet
+        :param max_rolls the maximum number of rolls of a single request
+        """
+        super().__init__(address, RollRequestHandler)
+        self.__spread_access_factory = spread_access_factory
+        self.__max_rolls = max_rolls
+        self.__stories = CaseInsensitiveDict()
+        self.__lock = threading.Lock()
+        self.__logger = logging.getLogger(RpgCrawler.ID)
+
+
+    def story(self, sheet_name: str):
+        """ Determines the spread access of the story. The story is loaded with all its tables on the first access
+
+        :param sheet_name the name of the story sheet
+        :return the spread access of the story
+        """
+        with self.__lock:
+            if sheet_name not in self.__stories:
+                spread_access = self.__spread_access_factory(sheet_name)
+                spread_access.prefetch()
+                TableOptimizer(spread_access).optimize()
+                self.__logger.debug("Die Story '{}' wurde geladen".format(sheet_name))
+                self.__stories[sheet_name] = spread_access
+            return self.__stories[sheet_name]
+
+
+    def roll(self, sheet_name: str, n: int = 1, seed: int = None, first_iteration: int = 0) -> dict:
+        """ Crawls iterations of the story
+
+        :param sheet_name the name of the story sheet
+        :param n the number of iterations
+        :param seed the optional seed of the iterations. If not specified, a random seed will be used
+        :param first_iteration the number of the first iteration
+        :return the json object of the iterations (see JsonIO.take_document)
+        """
+        if n < 1 or n > self.__max_rolls:
+            raise ValueError("Die Anzahl muss zwischen 1 und {} liegen.".format(self.__max_rolls))
+        io = JsonIO(first_iteration)
+        crawler = RpgCrawler(self.story(sheet_name), io, seed, first_iteration)
+        for _i in range(n):
+            crawler.crawl()
+        return io.take_document(sheet_name, crawler.seed)
+
+
+    @property
+    def port(self) -> int:
+        """ :return the port of the server """
+        return self.server_address[1]
+
+
+class RollRequestHandler(http.server.BaseHTTPRequestHandler):
+    """ Handles the http requests of the RollServer """
+    # keeps the connection open for multiple requests of a client
+    protocol_version = "HTTP/1.1"
+
+
+    def do_GET(self) -> None:
+        """ Serves GET /stories/<sheet>/roll with the optional query parameters n, seed and first and, if the metrics
+        are enabled, GET /metrics in the prometheus text format """
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == RollServer.METRICS_PATH and Metrics.enabled:
+            self.__send_metrics()
+            return
+        match = RollServer.ROLL_PATH_PATTERN.match(url.path)
+        if not match:
+            self.__send_json(404, {"error": "Unbekannter Pfad '{}'.".format(url.path)})
+            return
+        sheet_name = urllib.parse.unquote(match.group(1))
+        query = urllib.parse.parse_qs(url.query)
+        try:
+            n = int(query.get("n", ["1"])[0])
+            seed = int(query["seed"][0]) if "seed" in query else RandomStream.create_seed()
+            first_iteration = int(query.get("first", ["0"])[0])
+        except ValueError:
+            self.__send_json(400, {"error": "Die Parameter n, seed und first müssen ganze Zahlen sein."})
+            return
+        try:
+            self.server.story(sheet_name)
+        except Exception as error:
+            message = "Die Story '{}' konnte nicht geladen werden: {}".format(sheet_name, error)
+            logging.getLogger(RpgCrawler.ID).exception(message)
+            self.__send_json(404, {"error": message})
+            return
+        try:
+            self.__send_json(200, self.server.roll(sheet_name, n, seed, first_iteration))
+        except ValueError as error:
+            self.__send_json(400, {"error": str(error)})
+
+
+    def __send_metrics(self) -> None:
+        """ Sends all metrics in the prometheus text format """
+        body = Metrics.prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+    def __send_json(self, status: int, document: dict) -> None:
+        """ Sends the json document as response
+
+        :param status the http status of the response
+        :param document the json object to send
+        """
+        body = json.dumps(document, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+    def log_message(self, format: str, *args) -> None:
+        """ Logs the requests with the logger of the application instead of stderr """
+        logger = logging.getLogger(RpgCrawler.ID)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("{} - {}".format(self.address_string(), format % args))
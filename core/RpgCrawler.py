@@ -1,25 +1,87 @@
+import time
+
+from core.LoggerId import LOGGER_ID
+from core.Metrics import Metrics
+from core.Tracer import Tracer
+from generator.RandomStream import RandomStream
 from interaction.AbstractIO import AbstractIO
 from sheet.AbstractSpreadAccess import AbstractSpreadAccess
 
 
 class RpgCrawler:
-    ID = "rpgcrawler.logic"
+    # the name of the logger of the application (see LOGGER_ID)
+    ID = LOGGER_ID
 
 
-    def __init__(self, spread_access: AbstractSpreadAccess, formatter: AbstractIO) -> None:
+    def __init__(self, spread_access: AbstractSpreadAccess, formatter: AbstractIO, seed: int = None,
+                 first_iteration: int = 0) -> None:
         """ Constructor
         :param spread_access the access to the spread sheet that contains all table to crawl
         :param formatter the formatter for the output
+        :param seed the seed of the run. Every iteration uses its own random stream derived from the seed, i.e. the
+            same seed generates the same iterations. If not specified, a random seed will be used
+        :param first_iteration the number of the first iteration that will be crawled
         """
         self.__spread_access = spread_access
         self.__formatter = formatter
+        self.__seed = seed if seed is not None else RandomStream.create_seed()
+        self.__iteration = first_iteration
 
 
-    def crawl(self):
+    def crawl(self, iteration: int = None):
+        """ Crawls an iteration of the story
+        :param iteration optional number of the iteration to crawl. If not specified, the iteration after the
+            previously crawled iteration will be crawled
+        """
+        if iteration is None:
+            iteration = self.__iteration
+        self.__iteration = iteration + 1
+        rng = RandomStream(self.__seed, iteration)
         # all the tables of the story that needs to be iterated (e.g. gems, coins, armor of a treasure)
         story_tables = self.__spread_access.crawl_main_sheet()
+        if Tracer.enabled:
+            with Tracer.span(self.__spread_access.story_context() or "Story"):
+                self.__crawl_tables(story_tables, rng)
+            return
+        self.__crawl_tables(story_tables, rng)
+
+
+    def __crawl_tables(self, story_tables: list, rng) -> None:
+        """ Prints the story context and generates a story line of every story table
+
+        :param story_tables the names of the story tables
+        :param rng the random stream of the iteration
+        """
         self.__formatter.print_story_context(self.__spread_access.story_context())
+        # the generation is only measured, if the metrics are enabled
+        start = time.perf_counter() if Metrics.enabled else None
         for table_name in story_tables:
             # determines the current table (e.g. gems)
             table = self.__spread_access.get_table(table_name)
-            self.__formatter.print_story_line(table)
+            if start is None:
+                self.__print_story_line(table, rng)
+            else:
+                table_start = time.perf_counter()
+                self.__print_story_line(table, rng)
+                Metrics.observe("generation_seconds", time.perf_counter() - table_start, table=table.table_name)
+        if start is not None:
+            Metrics.observe("crawl_seconds", time.perf_counter() - start)
+
+
+    def __print_story_line(self, table, rng) -> None:
+        """ Prints the story line of the table. The table is traced as span, if the tracer is enabled
+
+        :param table the story table
+        :param rng the random stream of the iteration
+        """
+        if Tracer.enabled:
+            with Tracer.span(table.table_name):
+                self.__formatter.print_story_line(table, rng)
+        else:
+            self.__formatter.print_story_line(table, rng)
+
+
+    @property
+    def seed(self) -> int:
+        """ :return the seed of the run """
+        return self.__seed
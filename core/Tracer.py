@@ -0,0 +1,159 @@
+import collections
+import contextlib
+import threading
+import time
+
+
+class Span(object):
+    """ A timed step of the generation (e.g. a table, a row or a generator) with the steps it consists of """
+    __slots__ = ("name", "start", "duration", "children")
+
+
+    def __init__(self, name: str) -> None:
+        """ Constructor
+
+        :param name the name of the step (e.g. the table name)
+        """
+        self.name = name
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.children = list()
+
+
+    @property
+    def self_duration(self) -> float:
+        """ :return the duration of the step without the duration of its children in seconds """
+        return max(0.0, self.duration - sum(child.duration for child in self.children))
+
+
+    def format(self, indent: int = 0) -> str:
+        """ :return the step and its children as readable tree with the durations in milliseconds """
+        lines = ["{}{} ({:.3f} ms)".format("  " * indent, self.name, self.duration * 1000)]
+        for child in self.children:
+            lines.append(child.format(indent + 1))
+        return "\n".join(lines)
+
+
+class Tracer(object):
+    """ Records a timed tree of every crawled iteration: story -> table -> row -> generator -> referenced table -> ...
+    The tracer is disabled by default. The traced code checks Tracer.enabled before it creates a span, i.e. a disabled
+    tracer costs a single attribute lookup.
+
+    Every finished iteration is aggregated into collapsed stacks, the input format of flame graph tools (e.g.
+    flamegraph.pl or speedscope). Every line is the stack of span names and the summed up self duration of its last
+    span in microseconds, e.g. "Drachenhort;Münzen;[2W6] Gold;[2W6] 42" for 42 microseconds of the dice throw. The
+    generated values are not recorded. The last iterations are kept as trees.
+    """
+    enabled = False
+    DEFAULT_MAX_TRACES = int(100)
+    # the maximum length of a span name, e.g. of a long row text
+    MAX_NAME_LENGTH = int(60)
+    __local = threading.local()
+    __traces = collections.deque(maxlen=DEFAULT_MAX_TRACES)
+    # the collapsed stack to its summed up duration (without the children) in seconds
+    __collapsed = dict()
+    __lock = threading.Lock()
+
+
+    @staticmethod
+    def enable(enabled: bool = True, max_traces: int = DEFAULT_MAX_TRACES) -> None:
+        """ Enables (or disables) the tracer
+
+        :param enabled true, to record the iterations
+        :param max_traces the number of the last iterations that are kept as trees
+        """
+        with Tracer.__lock:
+            Tracer.__traces = collections.deque(Tracer.__traces, maxlen=max_traces)
+        Tracer.enabled = enabled
+
+
+    @staticmethod
+    def reset() -> None:
+        """ Forgets all recorded iterations """
+        with Tracer.__lock:
+            Tracer.__traces.clear()
+            Tracer.__collapsed.clear()
+
+
+    @staticmethod
+    def span_name(text: str) -> str:
+        """ :return the text as span name, i.e. shortened and without the separator of the collapsed stacks """
+        name = " ".join(str(text).replace(";", ",").split())
+        if len(name) > Tracer.MAX_NAME_LENGTH:
+            name = name[:Tracer.MAX_NAME_LENGTH - 3] + "..."
+        return name
+
+
+    @staticmethod
+    def start(name: str) -> Span:
+        """ Starts a span as child of the current span of this thread
+
+        :param name the name of the span (see span_name)
+        :return the started span
+        """
+        stack = getattr(Tracer.__local, "stack", None)
+        if stack is None:
+            stack = Tracer.__local.stack = list()
+        span = Span(name)
+        if stack:
+            stack[-1].children.append(span)
+        stack.append(span)
+        return span
+
+
+    @staticmethod
+    def finish(span: Span) -> None:
+        """ Finishes the span. A finished root span (e.g. an iteration) is recorded
+
+        :param span the current span of this thread
+        """
+        span.duration = time.perf_counter() - span.start
+        stack = Tracer.__local.stack
+        stack.pop()
+        if not stack:
+            Tracer.__record(span)
+
+
+    @staticmethod
+    @contextlib.contextmanager
+    def span(text: str):
+        """ Traces the enclosed code as a span, e.g. with Tracer.span("Münzen"): ...
+
+        :param text the name of the span. Shortened by span_name
+        """
+        span = Tracer.start(Tracer.span_name(text))
+        try:
+            yield span
+        finally:
+            Tracer.finish(span)
+
+
+    @staticmethod
+    def __record(root: Span) -> None:
+        """ Keeps the trace and adds its durations to the collapsed stacks """
+        durations = list()
+        pending = [(root, root.name)]
+        while pending:
+            span, stack = pending.pop()
+            durations.append((stack, span.self_duration))
+            pending.extend((child, stack + ";" + child.name) for child in span.children)
+        with Tracer.__lock:
+            Tracer.__traces.append(root)
+            for stack, duration in durations:
+                Tracer.__collapsed[stack] = Tracer.__collapsed.get(stack, 0.0) + duration
+
+
+    @staticmethod
+    def traces() -> list:
+        """ :return the root spans of the last recorded iterations """
+        with Tracer.__lock:
+            return list(Tracer.__traces)
+
+
+    @staticmethod
+    def collapsed_stacks() -> str:
+        """ :return the aggregated iterations as collapsed stacks, one "frame;frame;frame microseconds" per line and
+            sorted by the stack """
+        with Tracer.__lock:
+            collapsed = sorted(Tracer.__collapsed.items())
+        return "".join("{} {}\n".format(stack, int(round(duration * 1000000))) for stack, duration in collapsed)
@@ -0,0 +1,18 @@
+from unittest import TestCase
+
+from core.CaseInsensitiveDict import CaseInsensitiveDict
+
+
+class TestCaseInsensitiveDict(TestCase):
+    def test_case_insensitive_keys(self):
+        tables = CaseInsensitiveDict([("Münzen", 1)], Edelsteine=2)
+        self.assertIn("MÜNZEN", tables)
+        self.assertEqual(2, tables["edelsteine"])
+        self.assertIsNone(tables.get("Flüche"))
+        tables["münzen"] = 3
+        self.assertEqual(["münzen", "Edelsteine"], list(tables))
+        self.assertEqual(CaseInsensitiveDict({"MÜNZEN": 3, "edelsteine": 2}), tables)
+        del tables["EDELSTEINE"]
+        self.assertEqual(1, len(tables.copy()))
+        with self.assertRaises(KeyError):
+            tables["Edelsteine"]
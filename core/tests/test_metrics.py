@@ -0,0 +1,75 @@
+from unittest import TestCase
+
+from core.Metrics import Metrics
+from core.RpgCrawler import RpgCrawler
+from interaction.RecordIO import RecordIO
+from sheet.GSpreadAccess import GSpreadAccess
+from sheet.RequestScheduler import RequestScheduler
+from sheet.SimulatedClient import SimulatedClient
+from sheet.tests.test_gSpreadAccess import create_client
+
+
+class TestMetrics(TestCase):
+    def setUp(self):
+        Metrics.reset()
+        Metrics.enable()
+
+    def tearDown(self):
+        Metrics.enable(False)
+        Metrics.reset()
+
+    def test_disabled_metrics_are_not_recorded(self):
+        Metrics.enable(False)
+        Metrics.increment("api_requests_total", worksheet="Münzen")
+        Metrics.observe("crawl_seconds", 0.5)
+        self.assertEqual(0, Metrics.counter("api_requests_total", worksheet="Münzen"))
+        self.assertIsNone(Metrics.histogram("crawl_seconds"))
+        self.assertEqual("\n", Metrics.prometheus())
+
+    def test_prometheus_text_format(self):
+        Metrics.increment("api_requests_total", worksheet="Münzen")
+        Metrics.increment("api_requests_total", 2, worksheet="Münzen")
+        Metrics.increment("api_requests_total", worksheet="Der \"Hort\"")
+        Metrics.observe("crawl_seconds", 0.002)
+        Metrics.observe("crawl_seconds", 20.0)
+        Metrics.register_collector(lambda: [("cache_hits", {"cache": "tables"}, 7)])
+        lines = Metrics.prometheus().splitlines()
+        self.assertIn("# TYPE rpgcrawler_api_requests_total counter", lines)
+        self.assertIn("rpgcrawler_api_requests_total{worksheet=\"Münzen\"} 3", lines)
+        self.assertIn("rpgcrawler_api_requests_total{worksheet=\"Der \\\"Hort\\\"\"} 1", lines)
+        self.assertIn("rpgcrawler_cache_hits{cache=\"tables\"} 7", lines)
+        self.assertIn("# TYPE rpgcrawler_crawl_seconds histogram", lines)
+        self.assertIn("rpgcrawler_crawl_seconds_bucket{le=\"0.001\"} 0", lines)
+        self.assertIn("rpgcrawler_crawl_seconds_bucket{le=\"0.005\"} 1", lines)
+        self.assertIn("rpgcrawler_crawl_seconds_bucket{le=\"10.0\"} 1", lines)
+        self.assertIn("rpgcrawler_crawl_seconds_bucket{le=\"+Inf\"} 2", lines)
+        self.assertIn("rpgcrawler_crawl_seconds_count 2", lines)
+        self.assertEqual(1, len([line for line in lines if line.startswith("# TYPE rpgcrawler_api_requests_total")]))
+
+    def test_instrumented_crawl(self):
+        access = GSpreadAccess("Kern", None, client=create_client(coin_rows=10))
+        crawler = RpgCrawler(access, RecordIO(), seed=3)
+        for _i in range(4):
+            crawler.crawl()
+        # opens the worksheet and reads its rows
+        self.assertEqual(2, Metrics.counter("api_requests_total", worksheet="Münzen"))
+        self.assertEqual(10, Metrics.counter("fetched_rows_total", worksheet="Münzen"))
+        self.assertGreater(Metrics.counter("fetched_bytes_total", worksheet="Münzen"), 10 * len("[1W6] Gold"))
+        self.assertEqual(1, Metrics.histogram("table_load_seconds", table="Münzen").count)
+        self.assertEqual(4, Metrics.histogram("generation_seconds", table="Münzen").count)
+        self.assertEqual(4, Metrics.histogram("crawl_seconds").count)
+        text = Metrics.prometheus()
+        self.assertIn("rpgcrawler_cache_misses{cache=\"tables\",spread_sheet=\"Kern\"}", text)
+        self.assertIn("crawl_seconds: 4 mal", Metrics.summary())
+
+    def test_scheduled_requests_are_counted_when_sent(self):
+        client = SimulatedClient({"Kern": {"Story": [["Hort"], [], [], ["Tabelle"], ["T0"]], "T0": [["1", "Eintrag"]]}},
+                                 error_rate=0.5, seed=3)
+        scheduler = RequestScheduler(1000, 1.0, max_retries=20, seed=1, sleep=lambda seconds: None)
+        access = GSpreadAccess("Kern", None, client=client, scheduler=scheduler)
+        access.prefetch()
+        self.assertGreater(client.failed_count, 0)
+        # every sent request and every retry, but no request that was not sent
+        self.assertEqual(client.request_count, sum(Metrics.counter("api_requests_total", worksheet=worksheet)
+                                                   for worksheet in ("Kern", "Story", "T0")))
+        self.assertEqual(client.request_count, scheduler.request_count)
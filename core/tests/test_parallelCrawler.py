@@ -0,0 +1,67 @@
+import io
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from core.ParallelCrawler import ParallelCrawler
+from core.RpgCrawler import RpgCrawler
+from interaction.JsonLinesIO import JsonLinesIO
+from sheet.BundleSpreadAccess import BundleSpreadAccess
+from sheet.TableOptimizer import TableOptimizer
+from sheet.tests.DictSpreadAccess import DictSpreadAccess
+
+
+class TestParallelCrawler(TestCase):
+    def setUp(self):
+        source = DictSpreadAccess("Drachenhort", ["Münzen", "Edelsteine"], {
+            "Münzen": [(3, "[2W6] Gold"), (1, "[1W4] Silber und [Tabelle: Edelsteine]"), (2, "[Tabelle: Waffen]")],
+            "Edelsteine": [(1, "Rubin"), (2, "Opal"), (5, "[3W20] Perlen")],
+            "Waffen": [(1, "Dolch"), (3, "Schwert")],
+        })
+        handle, self.bundle_file = tempfile.mkstemp(suffix=".rpgb")
+        os.close(handle)
+        BundleSpreadAccess.export(source, self.bundle_file)
+
+    def tearDown(self):
+        os.remove(self.bundle_file)
+
+    def crawl(self, processes: int, seed: int) -> list:
+        """ :return the records of 10 parallel iterations """
+        stream = io.StringIO()
+        stream_io = JsonLinesIO(stream, 10)
+        ParallelCrawler(self.bundle_file, processes, seed, shard_size=3).crawl(10, stream_io)
+        stream_io.close()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    def test_records_are_written_in_order(self):
+        records = self.crawl(2, 42)
+        self.assertEqual(list(range(10)), [record["iteration"] for record in records])
+        self.assertTrue(all(record["context"] == "Drachenhort" for record in records))
+        self.assertTrue(all(len(record["lines"]) == 2 for record in records))
+
+    def test_output_does_not_depend_on_the_processes(self):
+        self.assertEqual(self.crawl(1, 42), self.crawl(3, 42))
+
+    def test_output_is_identical_to_a_serial_run(self):
+        stream = io.StringIO()
+        stream_io = JsonLinesIO(stream, 10)
+        spread_access = BundleSpreadAccess(self.bundle_file)
+        try:
+            # the same preparation like the application (and every worker) does
+            spread_access.prefetch()
+            self.assertEqual(1, TableOptimizer(spread_access).optimize()["flattened_references"])
+            crawler = RpgCrawler(spread_access, stream_io, 42)
+            for _i in range(10):
+                crawler.crawl()
+            stream_io.close()
+        finally:
+            spread_access.close()
+        self.assertEqual([json.loads(line) for line in stream.getvalue().splitlines()], self.crawl(2, 42))
+
+    def test_single_iteration_can_be_regenerated(self):
+        stream = io.StringIO()
+        stream_io = JsonLinesIO(stream, 1, first_iteration=7)
+        ParallelCrawler(self.bundle_file, 1, 42, first_iteration=7).crawl(1, stream_io)
+        stream_io.close()
+        self.assertEqual(self.crawl(2, 42)[7], json.loads(stream.getvalue()))
@@ -0,0 +1,85 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from unittest import TestCase
+
+from core.Metrics import Metrics
+from core.RollServer import RollServer
+from sheet.tests.DictSpreadAccess import DictSpreadAccess
+
+
+class TestRollServer(TestCase):
+    def setUp(self):
+        self.created = list()
+
+        def spread_access_factory(sheet_name: str):
+            if sheet_name != "Hort":
+                raise ValueError("Unbekannt")
+            self.created.append(sheet_name)
+            return DictSpreadAccess("Drachenhort", ["Münzen", "Edelsteine"], {
+                "Münzen": [(3, "[2W6] Gold"), (1, "[1W4] Silber und [Tabelle: Edelsteine]")],
+                "Edelsteine": [(1, "Rubin"), (2, "Opal")],
+            })
+
+        self.server = RollServer(("127.0.0.1", 0), spread_access_factory)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def get(self, path: str) -> tuple:
+        """ :return the status and the json document of the response """
+        try:
+            with urllib.request.urlopen("http://127.0.0.1:{}{}".format(self.server.port, path)) as response:
+                return response.status, json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as error:
+            return error.code, json.loads(error.read().decode("utf-8"))
+
+    def test_roll(self):
+        status, document = self.get("/stories/Hort/roll?n=5&seed=42")
+        self.assertEqual(200, status)
+        self.assertEqual(("Hort", 42), (document["story"], document["seed"]))
+        self.assertEqual(list(range(5)), [roll["iteration"] for roll in document["rolls"]])
+        self.assertEqual(["Münzen", "Edelsteine"], [line["table"] for line in document["rolls"][0]["lines"]])
+        # the same seed and iteration creates the same roll, the story is loaded once
+        _status, single = self.get("/stories/hort/roll?seed=42&first=3")
+        self.assertEqual(document["rolls"][3]["lines"], single["rolls"][0]["lines"])
+        self.assertEqual(["Hort"], self.created)
+
+    def test_concurrent_clients(self):
+        results = list()
+
+        def roll():
+            results.append(self.get("/stories/Hort/roll?n=20&seed=7"))
+
+        threads = [threading.Thread(target=roll) for _i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([200] * 8, [status for status, _document in results])
+        self.assertEqual(1, len({json.dumps(document) for _status, document in results}))
+
+    def test_errors(self):
+        self.assertEqual(404, self.get("/stories/Unbekannt/roll")[0])
+        self.assertEqual(404, self.get("/unbekannt")[0])
+        self.assertEqual(400, self.get("/stories/Hort/roll?n=abc")[0])
+        self.assertEqual(400, self.get("/stories/Hort/roll?n=0")[0])
+
+    def test_metrics(self):
+        self.assertEqual(404, self.get("/metrics")[0])
+        Metrics.reset()
+        Metrics.enable()
+        try:
+            self.assertEqual(200, self.get("/stories/Hort/roll?n=3&seed=1")[0])
+            url = "http://127.0.0.1:{}/metrics".format(self.server.port)
+            with urllib.request.urlopen(url) as response:
+                self.assertTrue(response.headers["Content-Type"].startswith("text/plain"))
+                self.assertIn("rpgcrawler_crawl_seconds_count 3", response.read().decode("utf-8").splitlines())
+        finally:
+            Metrics.enable(False)
+            Metrics.reset()
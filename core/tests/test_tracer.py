@@ -0,0 +1,58 @@
+from unittest import TestCase
+
+from core.RpgCrawler import RpgCrawler
+from core.Tracer import Tracer
+from interaction.RecordIO import RecordIO
+from sheet.tests.DictSpreadAccess import DictSpreadAccess
+
+
+def create_spread_access() -> DictSpreadAccess:
+    """ :return a story with a chain of references (Münzen -> Edelsteine -> Fluch) """
+    return DictSpreadAccess("Drachenhort", ["Münzen"], {
+        "Münzen": [(1, "[2W6] Gold und [Tabelle: Edelsteine]")],
+        "Edelsteine": [(1, "ein Opal [Tabelle: Fluch]")],
+        "Fluch": [(1, "verflucht")],
+    })
+
+
+class TestTracer(TestCase):
+    def setUp(self):
+        Tracer.reset()
+
+    def tearDown(self):
+        Tracer.enable(False)
+        Tracer.reset()
+
+    def test_disabled_tracer_records_nothing(self):
+        RpgCrawler(create_spread_access(), RecordIO(), seed=1).crawl()
+        self.assertEqual([], Tracer.traces())
+        self.assertEqual("", Tracer.collapsed_stacks())
+
+    def test_trace_of_nested_references(self):
+        Tracer.enable()
+        crawler = RpgCrawler(create_spread_access(), RecordIO(), seed=1)
+        for _i in range(3):
+            crawler.crawl()
+        traces = Tracer.traces()
+        self.assertEqual(3, len(traces))
+        story = traces[0]
+        self.assertEqual("Drachenhort", story.name)
+        table = story.children[0]
+        self.assertEqual("Münzen", table.name)
+        row = table.children[0]
+        self.assertEqual("[2W6] Gold und [Tabelle: Edelsteine]", row.name)
+        self.assertEqual(["[2W6]", "[Tabelle: Edelsteine]"], [generator.name for generator in row.children])
+        referenced_table = row.children[1].children[0]
+        self.assertEqual("Edelsteine", referenced_table.name)
+        self.assertEqual("Fluch", referenced_table.children[0].children[0].children[0].name)
+        self.assertGreaterEqual(story.duration, table.duration)
+        self.assertIn("Münzen", story.format())
+
+        stacks = [line.rsplit(" ", 1)[0] for line in Tracer.collapsed_stacks().splitlines()]
+        self.assertEqual(len(set(stacks)), len(stacks))
+        self.assertIn("Drachenhort;Münzen;[2W6] Gold und [Tabelle: Edelsteine];[Tabelle: Edelsteine];Edelsteine;"
+                      "ein Opal [Tabelle: Fluch];[Tabelle: Fluch];Fluch;verflucht", stacks)
+
+    def test_span_name(self):
+        self.assertEqual("a, b c", Tracer.span_name("a; b\n c"))
+        self.assertEqual(Tracer.MAX_NAME_LENGTH, len(Tracer.span_name("x" * 100)))
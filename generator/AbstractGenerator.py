@@ -1,7 +1,12 @@
 import abc
+import sys
 
 
 class AbstractGenerator(metaclass=abc.ABCMeta):
+    # generators are created for every row of a table, i.e. they are kept without an instance dictionary
+    __slots__ = ("__start_index", "__end_index", "__text")
+
+
     def __init__(self, start_index: int, end_index: int, text: str) -> None:
         """
         Constructor
@@ -12,13 +17,15 @@ class AbstractGenerator(metaclass=abc.ABCMeta):
         """
         self.__start_index = start_index
         self.__end_index = end_index
-        self.__text = text
+        self.__text = sys.intern(text)
 
 
     @abc.abstractmethod
-    def process(self) -> str:
+    def process(self, rng=None) -> str:
         """ Generates the value
 
+        :param rng optional random stream (RandomStream) of the iteration. If not specified, the global random
+            generator will be used
         :return the generated result"""
         pass
 
@@ -0,0 +1,365 @@
+import bisect
+import itertools
+import math
+import re
+import threading
+
+# the cumulative sum tables of the dice throws, shared by all expressions: (quantity, sides) -> (cumulative counts,
+# number of combinations)
+_sum_tables = dict()
+_sum_tables_lock = threading.Lock()
+
+
+class DiceExpression(object):
+    """ A dice expression of a dice throw, e.g. 3W6+2, 2W20kh1, 4W6!, (1W4+1)*10 or 2W6+1W8-1. The grammar is:
+
+    expression := term (("+" | "-") term)*
+    term := factor (("*" | "x") factor)*
+    factor := dice | number | "(" expression ")"
+    dice := [quantity] ("W" | "D") sides [("kh" | "kl") count] ["!"]
+
+    kh / kl keep the highest / lowest dice of the throw, ! explodes the dice (a dice that shows its maximum is thrown
+    again and added). The expression is parsed once and compiled into closures, i.e. the evaluation only calls the
+    random generator and adds the values.
+    """
+    TOKEN_PATTERN = re.compile(
+        r"\s*(?:(\d*)\s*[wd]\s*(\d+)\s*(?:(k[hl])\s*(\d+))?\s*(!)?|(\d+)|([-+*x()]))", re.IGNORECASE)
+    # the maximum number of times a single exploding dice will be thrown again
+    MAX_EXPLOSIONS = int(100)
+    # the maximum number of combinations of dice that are enumerated for the distribution of kept dice
+    MAX_KEEP_COMBINATIONS = int(1000000)
+    # dice throws with at least this quantity are determined by a single draw from their cumulative sum table
+    SUM_TABLE_MIN_QUANTITY = int(2)
+    # the maximum quantity multiplied with the number of different sums, i.e. the effort to compute a cumulative sum
+    # table. Larger dice throws are thrown dice by dice
+    SUM_TABLE_MAX_WORK = int(20000000)
+    __slots__ = ("__text", "__evaluate", "__distribution", "__simple_dice")
+
+
+    def __init__(self, text: str) -> None:
+        """ Constructor
+        Parses and compiles the expression
+
+        :param text the dice expression, e.g. 3W6+2
+        """
+        self.__text = text
+        tokens = DiceExpression.tokenize(text)
+        position = [0]
+
+        def peek():
+            return tokens[position[0]] if position[0] < len(tokens) else None
+
+        def take():
+            token = peek()
+            position[0] += 1
+            return token
+
+        def expression():
+            evaluate, distribution = term()
+            while peek() in (("op", "+"), ("op", "-")):
+                operator = take()[1]
+                evaluate, distribution = DiceExpression.__combine(
+                    operator, (evaluate, distribution), term())
+            return evaluate, distribution
+
+        def term():
+            evaluate, distribution = factor()
+            while peek() in (("op", "*"), ("op", "x")):
+                take()
+                evaluate, distribution = DiceExpression.__combine("*", (evaluate, distribution), factor())
+            return evaluate, distribution
+
+        def factor():
+            token = take()
+            if token is None:
+                raise ValueError("Der Würfelausdruck '{}' ist unvollständig.".format(text))
+            if token[0] == "dice":
+                return DiceExpression.__compile_dice(*token[1:])
+            if token[0] == "number":
+                number = token[1]
+                return (lambda randint: number), (lambda: {number: 1.0})
+            if token == ("op", "("):
+                compiled = expression()
+                if take() != ("op", ")"):
+                    raise ValueError("Im Würfelausdruck '{}' fehlt eine schließende Klammer.".format(text))
+                return compiled
+            raise ValueError("Der Würfelausdruck '{}' enthält ein unerwartetes '{}'.".format(text, token[1]))
+
+        self.__evaluate, self.__distribution = expression()
+        if position[0] != len(tokens):
+            raise ValueError("Der Würfelausdruck '{}' enthält ein unerwartetes '{}'.".format(text, peek()[1]))
+        # a single dice throw without modifiers (e.g. 3W6) as (quantity, sides)
+        self.__simple_dice = None
+        if len(tokens) == 1 and tokens[0][0] == "dice" and tokens[0][3] is None and not tokens[0][5]:
+            self.__simple_dice = (tokens[0][1], tokens[0][2])
+
+
+    @staticmethod
+    def tokenize(text: str) -> list:
+        """ Splits the expression into its tokens
+
+        :param text the dice expression
+        :return a list with the tokens. A token is ("dice", quantity, sides, keep (kh / kl / None), keep count,
+            exploding), ("number", value) or ("op", character)
+        """
+        tokens = list()
+        position = 0
+        text = text.rstrip()
+        while position < len(text):
+            match = DiceExpression.TOKEN_PATTERN.match(text, position)
+            if not match or match.end() == position:
+                raise ValueError("Der Würfelausdruck '{}' ist ungültig (Position {}).".format(text, position + 1))
+            quantity, sides, keep, keep_count, explode, number, operator = match.groups()
+            if sides is not None:
+                quantity = int(quantity) if quantity else 1
+                keep_count = int(keep_count) if keep_count else 0
+                if int(sides) < 1 or (keep is not None and not 0 < keep_count <= quantity):
+                    raise ValueError("Der Würfelausdruck '{}' ist ungültig.".format(text))
+                tokens.append(("dice", quantity, int(sides), keep.lower() if keep else None, keep_count,
+                               explode is not None))
+            elif number is not None:
+                tokens.append(("number", int(number)))
+            else:
+                tokens.append(("op", operator.lower()))
+            position = match.end()
+        return tokens
+
+
+    @staticmethod
+    def __combine(operator: str, left: tuple, right: tuple) -> tuple:
+        """ Combines the compiled evaluation and distribution of two operands
+
+        :param operator the operator (+, - or *)
+        :param left the (evaluate, distribution) of the left operand
+        :param right the (evaluate, distribution) of the right operand
+        :return the (evaluate, distribution) of the combination
+        """
+        left_evaluate, left_distribution = left
+        right_evaluate, right_distribution = right
+        if operator == "+":
+            def evaluate(randint):
+                return left_evaluate(randint) + right_evaluate(randint)
+        elif operator == "-":
+            def evaluate(randint):
+                return left_evaluate(randint) - right_evaluate(randint)
+        else:
+            def evaluate(randint):
+                return left_evaluate(randint) * right_evaluate(randint)
+
+        def distribution():
+            combined = dict()
+            right_values = right_distribution()
+            for left_value, left_probability in left_distribution().items():
+                for right_value, right_probability in right_values.items():
+                    if operator == "+":
+                        value = left_value + right_value
+                    elif operator == "-":
+                        value = left_value - right_value
+                    else:
+                        value = left_value * right_value
+                    combined[value] = combined.get(value, 0.0) + left_probability * right_probability
+            return combined
+        return evaluate, distribution
+
+
+    @staticmethod
+    def __compile_dice(quantity: int, sides: int, keep: str, keep_count: int, explode: bool) -> tuple:
+        """ Compiles a dice throw
+
+        :param quantity how often the dice is thrown
+        :param sides the number of sides of the dice
+        :param keep kh (keep the highest), kl (keep the lowest) or None (keep all)
+        :param keep_count the number of kept dice
+        :param explode true, if a dice that shows its maximum is thrown again and added
+        :return the (evaluate, distribution) of the dice throw
+        """
+        if explode:
+            def throw(randint):
+                value = roll = randint(1, sides)
+                explosions = 0
+                while roll == sides and sides > 1 and explosions < DiceExpression.MAX_EXPLOSIONS:
+                    roll = randint(1, sides)
+                    value += roll
+                    explosions += 1
+                return value
+        else:
+            def throw(randint):
+                return randint(1, sides)
+
+        if keep is None:
+            if explode:
+                def evaluate(randint):
+                    value = 0
+                    for _i in range(quantity):
+                        value += throw(randint)
+                    return value
+            elif quantity >= DiceExpression.SUM_TABLE_MIN_QUANTITY and sides > 1 and \
+                    quantity * (quantity * (sides - 1) + 1) <= DiceExpression.SUM_TABLE_MAX_WORK:
+                # one draw over all combinations of the dice instead of a draw per dice. The table is built on the
+                # first throw and shared (immutable) by all threads
+                def evaluate(randint):
+                    cumulative_counts, combinations = DiceExpression.sum_table(quantity, sides)
+                    return quantity + bisect.bisect_right(cumulative_counts, randint(0, combinations - 1))
+            else:
+                def evaluate(randint):
+                    value = 0
+                    for _i in range(quantity):
+                        value += randint(1, sides)
+                    return value
+        else:
+            highest = keep == "kh"
+
+            def evaluate(randint):
+                rolls = sorted(throw(randint) for _i in range(quantity))
+                return sum(rolls[-keep_count:] if highest else rolls[:keep_count])
+
+        def distribution():
+            single = DiceExpression.__single_dice_distribution(sides, explode)
+            if keep is None:
+                if not explode:
+                    return DiceExpression.dice_distribution(quantity, sides)
+                values = {0: 1.0}
+                for _i in range(quantity):
+                    values = DiceExpression.__convolve(values, single)
+                return values
+            return DiceExpression.__kept_distribution(single, quantity, keep == "kh", keep_count)
+        return evaluate, distribution
+
+
+    @staticmethod
+    def sum_table(quantity: int, sides: int) -> tuple:
+        """ Determines the exact cumulative sum table of a dice throw. The table is computed once for every quantity
+        and sides and shared by all expressions. The i-th entry is the number of combinations of the dice with a sum
+        up to quantity + i, i.e. a sum is determined by a binary search for a random number below the number of all
+        combinations
+
+        :param quantity how often the dice is thrown
+        :param sides the number of sides of the dice
+        :return the cumulative counts (tuple of int) and the number of all combinations (sides ^ quantity)
+        """
+        key = (quantity, sides)
+        table = _sum_tables.get(key)
+        if table is not None:
+            return table
+        # the number of combinations of every sum (starting with the sum quantity), one dice after the other. Every
+        # count is the sum of the previous counts within a window of the size of the sides
+        counts = [1] * sides
+        for _i in range(1, quantity):
+            next_counts = list()
+            window = 0
+            for i in range(len(counts) + sides - 1):
+                if i < len(counts):
+                    window += counts[i]
+                if i >= sides:
+                    window -= counts[i - sides]
+                next_counts.append(window)
+            counts = next_counts
+        table = (tuple(itertools.accumulate(counts)), sides ** quantity)
+        with _sum_tables_lock:
+            return _sum_tables.setdefault(key, table)
+
+
+    @staticmethod
+    def dice_distribution(quantity: int, sides: int) -> dict:
+        """ Computes the distribution of the sum of a dice throw by convolving the distribution of a single dice
+
+        :param quantity how often the dice is thrown
+        :param sides the number of sides of the dice
+        :return the sum to its probability
+        """
+        import numpy
+        single = numpy.full(sides, 1.0 / sides)
+        # the probabilities of the sums from quantity (all ones) to quantity * sides
+        sums = numpy.ones(1)
+        for _i in range(quantity):
+            sums = numpy.convolve(sums, single)
+        return {quantity + i: float(probability) for i, probability in enumerate(sums) if probability > 0}
+
+
+    @staticmethod
+    def __single_dice_distribution(sides: int, explode: bool) -> dict:
+        """ :return the value of a single (exploding) dice to its probability """
+        if not explode or sides == 1:
+            return {value: 1.0 / sides for value in range(1, sides + 1)}
+        values = dict()
+        # the dice explodes up to MAX_EXPLOSIONS times, every explosion adds the maximum of the dice
+        probability = 1.0
+        for explosions in range(DiceExpression.MAX_EXPLOSIONS + 1):
+            base = explosions * sides
+            last = sides if explosions == DiceExpression.MAX_EXPLOSIONS else sides - 1
+            for value in range(1, last + 1):
+                values[base + value] = probability / sides
+            probability /= sides
+            if probability == 0.0:
+                break
+        return values
+
+
+    @staticmethod
+    def __convolve(left: dict, right: dict) -> dict:
+        """ :return the distribution of the sum of two independent values """
+        values = dict()
+        for left_value, left_probability in left.items():
+            for right_value, right_probability in right.items():
+                value = left_value + right_value
+                values[value] = values.get(value, 0.0) + left_probability * right_probability
+        return values
+
+
+    @staticmethod
+    def __kept_distribution(single: dict, quantity: int, highest: bool, keep_count: int) -> dict:
+        """ Computes the distribution of the sum of the kept dice by enumerating the combinations of the dice values
+        (every combination once, weighted by the number of its orders)
+
+        :param single the distribution of a single dice
+        :param quantity how often the dice is thrown
+        :param highest true, if the highest dice are kept, false for the lowest dice
+        :param keep_count the number of kept dice
+        :return the sum to its probability
+        """
+        faces = sorted(single)
+        if math.factorial(len(faces) + quantity - 1) // (math.factorial(quantity) * math.factorial(len(faces) - 1)) \
+                > DiceExpression.MAX_KEEP_COMBINATIONS:
+            raise ValueError("Die Verteilung von {} Würfeln mit {} Werten ist zu groß.".format(quantity, len(faces)))
+        values = dict()
+        for combination in itertools.combinations_with_replacement(faces, quantity):
+            orders = math.factorial(quantity)
+            probability = 1.0
+            for value, group in itertools.groupby(combination):
+                count = len(list(group))
+                orders //= math.factorial(count)
+                probability *= single[value] ** count
+            kept = combination[-keep_count:] if highest else combination[:keep_count]
+            value = sum(kept)
+            values[value] = values.get(value, 0.0) + orders * probability
+        return values
+
+
+    def evaluate(self, randint) -> int:
+        """ Throws the dice of the expression
+
+        :param randint the random function that throws a dice (randint(1, sides), both bounds included)
+        :return the value of the expression
+        """
+        return self.__evaluate(randint)
+
+
+    def distribution(self) -> dict:
+        """ Computes the exact distribution of the expression. Exploding dice are limited to MAX_EXPLOSIONS
+
+        :return the value to its probability
+        """
+        return {value: probability for value, probability in self.__distribution().items() if probability > 0}
+
+
+    @property
+    def simple_dice(self) -> tuple:
+        """ :return the (quantity, sides) if the expression is a single dice throw without modifiers (e.g. 3W6),
+            None otherwise """
+        return self.__simple_dice
+
+
+    @property
+    def text(self) -> str:
+        """ :return the text of the expression """
+        return self.__text
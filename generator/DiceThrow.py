@@ -1,11 +1,15 @@
 import random
-import re
 
 from generator.AbstractGenerator import AbstractGenerator
+from generator.DiceExpression import DiceExpression
 
 
 class DiceThrow(AbstractGenerator):
-    PATTERN = "^\d{1,3}\s*[w]\s*\d{1,3}$"
+    # a dice expression (see DiceExpression), e.g. 3W6+2, 2W20kh1 or 4W6!
+    PATTERN = r"^(?=.*[wd]\s*\d)[\dwdkhlx!+\-*()\s]+$"
+    # the maximum number of dice that will be thrown at once by a batch roll (limits the memory of a batch)
+    BATCH_DICE = int(1 << 22)
+    __slots__ = ("__expression",)
 
 
     def __init__(self, start_index: int, end_index: int, text: str) -> None:
@@ -15,22 +19,71 @@ class DiceThrow(AbstractGenerator):
 
         :param start_index the start position in the original text string
         :param end_index the end position in the original text string
-        :param text if quantity and dice are not specified, the information will be extracted from the text. 
-        The text has the format of quantity w dice. The quantity defines, how often a dice will be thrown,
-        e.g. [3W6] -> throws a d6 3 times. The dice define the dice to be thrown
+        :param text the dice expression (see DiceExpression). In the simplest form quantity w dice. The quantity
+        defines, how often a dice will be thrown, e.g. [3W6] -> throws a d6 3 times. The dice define the dice to be
+        thrown. The expression is compiled once
         """
-        details = re.split("W", text, flags=re.IGNORECASE)
-        self.__quantity = int(details[0])
-        self.__dice = int(details[1])
+        self.__expression = DiceExpression(text)
 
 
-    def process(self) -> str:
-        """ Throws a specified dice x times
+    def process(self, rng=None) -> str:
+        """ Throws the dice of the dice expression
 
+        :param rng optional random stream (RandomStream) of the iteration. If not specified, the global random
+            generator will be used
         :return the dice result"""
-        value = 0
-        # calculates the dice value
-        for _i in range(self.__quantity):
-            # +1 because random expects a value that is higher
-            value += random.randint(1, self.__dice + 1)
-        return str(value)
+        # randint includes both bounds
+        return str(self.__expression.evaluate(rng.randint if rng is not None else random.randint))
+
+
+    def roll_batch(self, n: int, rng=None):
+        """ Throws the dice for n independent rolls. A single dice throw without modifiers (e.g. 3W6) is thrown in
+        one vectorized operation, other expressions are evaluated roll by roll
+
+        :param n the number of rolls
+        :param rng optional numpy random generator (numpy.random.Generator) that is used for the rolls
+        :return a numpy array with the n dice results
+        """
+        import numpy
+        if rng is None:
+            rng = numpy.random.default_rng()
+        results = numpy.empty(n, dtype=numpy.int64)
+        if self.__expression.simple_dice is None:
+            # a python random generator seeded by the numpy generator, since the cumulative sum tables of large dice
+            # throws require random numbers beyond 64 bits
+            randint = random.Random(int(rng.integers(0, 1 << 63))).randint
+            for i in range(n):
+                results[i] = self.__expression.evaluate(randint)
+            return results
+        quantity, dice = self.__expression.simple_dice
+        # the rolls are thrown in chunks, to keep the matrix of all the thrown dice small
+        chunk = max(1, DiceThrow.BATCH_DICE // max(quantity, 1))
+        for start in range(0, n, chunk):
+            end = min(n, start + chunk)
+            results[start:end] = rng.integers(1, dice + 1, size=(end - start, quantity)).sum(axis=1)
+        return results
+
+
+    def distribution(self) -> dict:
+        """ :return the exact distribution of the dice result (value to probability) """
+        return self.__expression.distribution()
+
+
+    @property
+    def expression(self) -> DiceExpression:
+        """ :return the compiled dice expression """
+        return self.__expression
+
+
+    @property
+    def quantity(self) -> int:
+        """ :return how often the dice will be thrown or None, if the dice expression is not a single dice throw """
+        simple_dice = self.__expression.simple_dice
+        return simple_dice[0] if simple_dice is not None else None
+
+
+    @property
+    def dice(self) -> int:
+        """ :return the number of sides of the dice or None, if the dice expression is not a single dice throw """
+        simple_dice = self.__expression.simple_dice
+        return simple_dice[1] if simple_dice is not None else None
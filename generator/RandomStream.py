@@ -0,0 +1,100 @@
+import hashlib
+import os
+import random
+
+
+class RandomStream(random.Random):
+    """ A counter based random stream. Every random value is derived from the key of the stream and the number of the
+    value (counter) with a keyed hash, i.e. the stream has no other state than its counter. The key of a stream is
+    derived from the seed of a run, the number of the iteration and the name of a table. Due to this, any iteration
+    of a run can be regenerated without generating the previous iterations, and the output does not depend on the
+    process that generates an iteration.
+    """
+    DIGEST_SIZE = int(64)
+    RECIPROCAL_53_BITS = 2.0 ** -53
+
+
+    def __init__(self, seed: int, iteration: int = 0, table_name: str = "", streams: dict = None) -> None:
+        """ Constructor
+
+        :param seed the seed of the run
+        :param iteration the number of the iteration within the run
+        :param table_name the name of the table that uses the stream (empty for the stream of the iteration)
+        :param streams the streams of the tables within the iteration (shared by all streams of the iteration)
+        """
+        self.__seed = seed
+        self.__iteration = iteration
+        self.__streams = streams if streams is not None else dict()
+        random.Random.__init__(self, "{}:{}:{}".format(seed, iteration, table_name.lower()))
+
+
+    def seed(self, a=None, version: int = 2) -> None:
+        """ Derives the key of the stream from the given value and resets the counter
+
+        :param a the value to derive the key from. If not specified, a random key will be used
+        :param version unused, only for the compatibility with random.Random
+        """
+        if a is None:
+            a = os.urandom(32)
+        elif not isinstance(a, (bytes, bytearray)):
+            a = str(a).encode("utf-8")
+        self.__key = hashlib.blake2b(a, digest_size=32).digest()
+        self.__counter = 0
+        self.gauss_next = None
+
+
+    def getrandbits(self, k: int) -> int:
+        """ :return a non negative integer with k random bits. Every block of 512 bits consumes one counter value """
+        if k < 0:
+            raise ValueError("Die Anzahl der Bits darf nicht negativ sein.")
+        byte_count = (k + 7) // 8
+        data = b""
+        while len(data) < byte_count:
+            data += hashlib.blake2b(self.__counter.to_bytes(8, "little"), key=self.__key,
+                                    digest_size=RandomStream.DIGEST_SIZE).digest()
+            self.__counter += 1
+        return int.from_bytes(data[:byte_count], "little") >> (byte_count * 8 - k)
+
+
+    def random(self) -> float:
+        """ :return a random float in the interval [0, 1) """
+        return self.getrandbits(53) * RandomStream.RECIPROCAL_53_BITS
+
+
+    def getstate(self) -> tuple:
+        """ :return the key and the counter of the stream """
+        return self.__key, self.__counter
+
+
+    def setstate(self, state: tuple) -> None:
+        """ :param state the key and the counter of the stream """
+        self.__key, self.__counter = state
+
+
+    def for_table(self, table_name: str, sheet_name: str = ""):
+        """ Determines the stream of the given table within the iteration. The stream will be created on the first
+        access and continued by every further access within the iteration.
+
+        :param table_name the name of the table (case insensitive)
+        :param sheet_name optional, the sheet of the table in a different excel file (case insensitive), e.g. Alt of
+            [Tabelle: Flüche#Alt]. Tables with the same name in different sheets use different streams
+        :return the stream of the table
+        """
+        key = table_name.lower() if not sheet_name else "{}#{}".format(table_name.lower(), sheet_name.lower())
+        stream = self.__streams.get(key)
+        if stream is None:
+            stream = RandomStream(self.__seed, self.__iteration, key, self.__streams)
+            self.__streams[key] = stream
+        return stream
+
+
+    @property
+    def iteration(self) -> int:
+        """ :return the number of the iteration within the run """
+        return self.__iteration
+
+
+    @staticmethod
+    def create_seed() -> int:
+        """ :return a new random seed for a run """
+        return random.SystemRandom().getrandbits(63)
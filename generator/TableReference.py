@@ -1,11 +1,14 @@
 import re
+import sys
 
+from core.Tracer import Tracer
 from generator.AbstractGenerator import AbstractGenerator
 from sheet.AbstractSpreadAccess import AbstractSpreadAccess
 
 
 class TableReference(AbstractGenerator):
     PATTERN = "\s*Tabelle:.+"
+    __slots__ = ("__spread_access", "__table_name", "__sheet_name")
 
     def __init__(self, spread_access: AbstractSpreadAccess, start_index: int, end_index: int, text: str) -> None:
         AbstractGenerator.__init__(self, start_index, end_index, text)
@@ -23,17 +26,38 @@ class TableReference(AbstractGenerator):
 
         if "#" in details[1]:
             reference_data = re.split("#", details[1])
-            self.__table_name = reference_data[0].strip()
-            self.__sheet_name = reference_data[1].strip()
+            self.__table_name = sys.intern(reference_data[0].strip())
+            self.__sheet_name = sys.intern(reference_data[1].strip())
         else:
-            self.__table_name = details[1].strip()
+            self.__table_name = sys.intern(details[1].strip())
             self.__sheet_name = "Sheet1"
         self.__spread_access = spread_access
 
 
-    def process(self) -> str:
+    def process(self, rng=None) -> str:
         """ Determines a table row by chance from the referenced table and generates the table result
+        :param rng optional random stream (RandomStream) of the iteration. If not specified, the global random
+            generator will be used
         :return the generated table result"""
-        referenced_table = self.__spread_access.get_table(self.__table_name, self.__sheet_name)
-        row = referenced_table.get_row_by_chance()
-        return row.generate()
+        table = self.referenced_table()
+        if Tracer.enabled:
+            with Tracer.span(table.table_name):
+                return table.generate(rng)
+        return table.generate(rng)
+
+
+    def referenced_table(self):
+        """ :return the referenced table. The table will be crawled, if it is not loaded yet """
+        return self.__spread_access.get_table(self.__table_name, self.__sheet_name)
+
+
+    @property
+    def table_name(self) -> str:
+        """ :return the name of the referenced table """
+        return self.__table_name
+
+
+    @property
+    def sheet_name(self) -> str:
+        """ :return the name of the sheet within the referenced excel file """
+        return self.__sheet_name
@@ -0,0 +1,105 @@
+import itertools
+import random
+import threading
+from collections import Counter
+from unittest import TestCase
+
+from generator.DiceExpression import DiceExpression
+from sheet.TableRow import TableRowEntry
+
+
+def maximum(_low: int, high: int) -> int:
+    """ :return the highest value of every dice """
+    return high
+
+
+class TestDiceExpression(TestCase):
+    def test_arithmetic(self):
+        self.assertEqual(20, DiceExpression("3W6+2").evaluate(maximum))
+        self.assertEqual(50, DiceExpression("(1W4 + 1) x 10").evaluate(maximum))
+        self.assertEqual(17, DiceExpression("2W6+1W8-1*3").evaluate(maximum))
+        self.assertEqual(501, len(DiceExpression("100W6").distribution()))
+
+    def test_keep(self):
+        rolls = iter([3, 17, 9])
+        self.assertEqual(17, DiceExpression("3W20kh1").evaluate(lambda low, high: next(rolls)))
+        rolls = iter([3, 17, 9])
+        self.assertEqual(12, DiceExpression("3w20kl2").evaluate(lambda low, high: next(rolls)))
+        distribution = DiceExpression("2W20kh1").distribution()
+        self.assertAlmostEqual(39 / 400, distribution[20])
+        self.assertAlmostEqual(1 / 400, distribution[1])
+
+    def test_exploding_dice(self):
+        rolls = iter([6, 6, 2, 4])
+        self.assertEqual(18, DiceExpression("2W6!").evaluate(lambda low, high: next(rolls)))
+        distribution = DiceExpression("1W6!").distribution()
+        self.assertAlmostEqual(1 / 36, distribution[8])
+        self.assertNotIn(6, distribution)
+        self.assertAlmostEqual(4.2, sum(value * probability for value, probability in distribution.items()))
+
+    def test_distribution_matches_the_evaluation(self):
+        expression = DiceExpression("2W4kh1+1W3*2")
+        distribution = expression.distribution()
+        self.assertAlmostEqual(1.0, sum(distribution.values()))
+        rng = random.Random(5)
+        self.assertTrue(all(expression.evaluate(rng.randint) in distribution for _i in range(500)))
+
+    def test_simple_dice(self):
+        self.assertEqual((3, 6), DiceExpression("3 w 6").simple_dice)
+        self.assertEqual((1, 20), DiceExpression("W20").simple_dice)
+        self.assertIsNone(DiceExpression("3W6+2").simple_dice)
+
+    def test_invalid_expressions(self):
+        for text in ("3W6+", "(2W6", "2W6)", "3W0", "2W20kh3", "3W6 Gold"):
+            with self.assertRaises(ValueError, msg=text):
+                DiceExpression(text)
+
+    def test_rows_recognize_dice_expressions(self):
+        generators = TableRowEntry.analyze_generators(None, "[3W6+2] Gold und [2w20kh1] [Tabelle: Edelsteine]")
+        self.assertEqual(["3W6+2", "2w20kh1", "Tabelle: Edelsteine"], [generator.get_text for generator in generators])
+        self.assertEqual("DiceThrow", type(generators[1]).__name__)
+
+    def test_sum_table_is_exact(self):
+        cumulative_counts, combinations = DiceExpression.sum_table(3, 6)
+        self.assertEqual(216, combinations)
+        counts = Counter(sum(dice) for dice in itertools.product(range(1, 7), repeat=3))
+        self.assertEqual(tuple(itertools.accumulate(counts[value] for value in range(3, 19))), cumulative_counts)
+        self.assertIs(DiceExpression.sum_table(3, 6), DiceExpression.sum_table(3, 6))
+
+    def test_large_dice_throw_is_one_draw(self):
+        draws = list()
+
+        def randint(low: int, high: int) -> int:
+            draws.append((low, high))
+            return (high - low) // 2
+
+        self.assertEqual(5050, DiceExpression("100W100").evaluate(randint))
+        self.assertEqual([(0, 100 ** 100 - 1)], draws)
+        # every draw of a 3W6 matches a combination of the dice
+        draws = iter(range(216))
+        throws = Counter(DiceExpression("3W6").evaluate(lambda low, high: next(draws)) for _i in range(216))
+        self.assertEqual(Counter(sum(dice) for dice in itertools.product(range(1, 7), repeat=3)), throws)
+
+    def test_concurrent_first_throws(self):
+        # the sum table of a dice throw is built by the first throw, i.e. concurrent first throws must not see a
+        # partially built table
+        expression = DiceExpression("37W11")
+        barrier = threading.Barrier(8)
+        results = list()
+        errors = list()
+
+        def throw():
+            barrier.wait()
+            try:
+                results.extend(expression.evaluate(random.Random().randint) for _i in range(50))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=throw) for _i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], errors)
+        self.assertEqual(400, len(results))
+        self.assertTrue(all(37 <= value <= 407 for value in results))
@@ -1,6 +1,26 @@
 from unittest import TestCase
-from generator import DiceThrow
+
+import numpy
+
+from generator.DiceThrow import DiceThrow
+
 
 class TestDiceThrow(TestCase):
     def test_process(self):
-        self.fail()
+        dice_throw = DiceThrow(0, 5, "2W6")
+        results = {int(dice_throw.process()) for _i in range(2000)}
+        self.assertEqual(set(range(2, 13)), results)
+
+    def test_roll_batch(self):
+        dice_throw = DiceThrow(0, 6, "3w20")
+        results = dice_throw.roll_batch(100000, numpy.random.default_rng(7))
+        self.assertEqual((100000,), results.shape)
+        self.assertEqual(3, results.min())
+        self.assertEqual(60, results.max())
+        self.assertAlmostEqual(31.5, results.mean(), delta=0.2)
+
+    def test_roll_batch_in_chunks(self):
+        dice_throw = DiceThrow(0, 9, "100W100")
+        results = dice_throw.roll_batch(DiceThrow.BATCH_DICE // 100 + 3, numpy.random.default_rng(3))
+        self.assertTrue(((results >= 100) & (results <= 10000)).all())
+        self.assertTrue((results[-3:] > 0).all())
@@ -0,0 +1,68 @@
+from unittest import TestCase
+
+from core.RpgCrawler import RpgCrawler
+from generator.RandomStream import RandomStream
+from interaction.RecordIO import RecordIO
+from sheet.tests.DictSpreadAccess import DictSpreadAccess
+
+
+class TestRandomStream(TestCase):
+    def test_same_seed_and_iteration_generate_the_same_values(self):
+        values = [RandomStream(7, 3).randrange(1000) for _i in range(3)]
+        self.assertEqual(1, len(set(values)))
+        first = RandomStream(7, 3)
+        second = RandomStream(7, 3)
+        self.assertEqual([first.randint(1, 20) for _i in range(50)], [second.randint(1, 20) for _i in range(50)])
+
+    def test_iterations_and_tables_use_different_streams(self):
+        stream = RandomStream(7, 3)
+        values = [stream.getrandbits(64), RandomStream(7, 4).getrandbits(64), RandomStream(8, 3).getrandbits(64),
+                  stream.for_table("Münzen").getrandbits(64)]
+        self.assertEqual(len(values), len(set(values)))
+
+    def test_table_stream_is_continued_within_the_iteration(self):
+        stream = RandomStream(7, 3)
+        coins = stream.for_table("Münzen")
+        self.assertIs(coins, stream.for_table("münzen"))
+        self.assertIs(coins, stream.for_table("Edelsteine").for_table("MÜNZEN"))
+        self.assertEqual(RandomStream(7, 3, "Münzen").getrandbits(64), coins.getrandbits(64))
+
+    def test_tables_of_different_sheets_use_different_streams(self):
+        stream = RandomStream(7, 3)
+        old = stream.for_table("Flüche", "Alt")
+        self.assertIs(old, stream.for_table("flüche", "ALT"))
+        self.assertIsNot(old, stream.for_table("Flüche", "Neu"))
+        self.assertIsNot(old, stream.for_table("Flüche"))
+        self.assertIs(stream.for_table("Flüche"), stream.for_table("Flüche", ""))
+        self.assertNotEqual(stream.for_table("Flüche", "Neu").getrandbits(64), old.getrandbits(64))
+
+    def test_state_is_the_counter(self):
+        stream = RandomStream(7, 3)
+        state = stream.getstate()
+        values = [stream.random() for _i in range(5)]
+        stream.setstate(state)
+        self.assertEqual(values, [stream.random() for _i in range(5)])
+        self.assertTrue(all(0.0 <= value < 1.0 for value in values))
+
+    def test_randrange_is_uniform(self):
+        stream = RandomStream(1)
+        counts = [0] * 6
+        for _i in range(60000):
+            counts[stream.randrange(6)] += 1
+        self.assertTrue(all(abs(count - 10000) < 500 for count in counts))
+
+    def test_dice_of_a_table_do_not_depend_on_other_tables(self):
+        def generate(coins: str) -> list:
+            """ :return the generated gems of the first iterations, if the coins are thrown with the given dice """
+            spread_access = DictSpreadAccess("Drachenhort", ["Münzen", "Edelsteine"], {
+                "Münzen": [(1, "[{}] Gold".format(coins))],
+                "Edelsteine": [(1, "[1W100] Rubine"), (1, "[2W20] Opale und [Tabelle: Fluch]")],
+                "Fluch": [(1, "[1W1000] Flüche")],
+            })
+            io = RecordIO()
+            crawler = RpgCrawler(spread_access, io, seed=7)
+            for _i in range(20):
+                crawler.crawl()
+            return [lines[1] for _context, lines in io.take_records()]
+
+        self.assertEqual(generate("1W6"), generate("12W6+2W8"))
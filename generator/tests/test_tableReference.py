@@ -1,6 +1,20 @@
 from unittest import TestCase
 
+from generator.TableReference import TableReference
+from sheet.tests.DictSpreadAccess import DictSpreadAccess
+
 
 class TestTableReference(TestCase):
     def test_process(self):
-        self.fail()
+        spread_access = DictSpreadAccess("Drachenhort", [], {
+            "Edelsteine": [(1, "[Tabelle: Fluch] Rubin")],
+            "Fluch": [(1, "verfluchter")],
+        })
+        reference = TableReference(spread_access, 0, 20, "Tabelle: Edelsteine")
+        self.assertEqual("verfluchter Rubin", reference.process())
+
+    def test_table_and_sheet_name(self):
+        reference = TableReference(None, 0, 20, " Tabelle:  Flüche # Alt ")
+        self.assertEqual(("Flüche", "Alt"), (reference.table_name, reference.sheet_name))
+        reference = TableReference(None, 0, 20, "tabelle: Flüche")
+        self.assertEqual(("Flüche", "Sheet1"), (reference.table_name, reference.sheet_name))
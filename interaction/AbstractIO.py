@@ -13,10 +13,12 @@ class AbstractIO(metaclass=abc.ABCMeta):
 
 
     @abc.abstractmethod
-    def print_story_line(self, story_line: str) -> None:
-        """ This method prints the story line
+    def print_story_line(self, table, rng=None) -> None:
+        """ This method determines a row of the table by chance and prints the generated story line
+        (e.g. you found 2 gold and 20 silver in the chest)
 
-        :param story_line the story line to be printed (e.g. you found 2 gold and 20 silver in the chest)
+        :param table the table to process
+        :param rng optional random stream (RandomStream) of the iteration
         """
         pass
 
@@ -29,6 +31,11 @@ class AbstractIO(metaclass=abc.ABCMeta):
         pass
 
 
+    def close(self) -> None:
+        """ This method writes all pending output. It will be called after the last iteration """
+        pass
+
+
     @abc.abstractmethod
     def iterations(self) -> int:
         """ This method determines the iterations of the application (e.g. execute 5 times)
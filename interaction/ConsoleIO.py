@@ -12,49 +12,48 @@ class ConsoleIO(AbstractIO):
         print(context)
 
 
-    def print_story_line(self, table: Table) -> None:
+    def print_story_line(self, table: Table, rng=None) -> None:
         """ This method prints the story line with a small indent
 
         :param table the table to process
+        :param rng optional random stream (RandomStream) of the iteration
         """
-        text = self.create_table_text(table)
+        text = self.create_table_text(table, rng)
         print(text)
 
 
-    def create_table_text(self, table: Table) -> str:
+    def create_table_text(self, table: Table, rng=None) -> str:
         """ Creates the current text line. Depending on the configuration, the text line contains the table name,
         an optional static pre text, the generated row and an optional static follow up text.
         -> e.g. "Freitext vor Tabelle Aktion Freitext nach Tabelle Aktion"
 
         :param table the table data
+        :param rng optional random stream (RandomStream) of the iteration
         :return the text to write
         """
-        # determines the current row by chance
-        table_row = table.get_row_by_chance()
-        row_text = "\t{}:\n".format(table.table_name)
-        if table.pre_text:
-            row_text += "\t{}\n".format(table.pre_text)
-        row_text += "\t{}\n".format(table_row.generate())
-        if table.follow_up_text:
-            row_text += "\t{}\n".format(table.follow_up_text)
-        return row_text
-
-    # def create_table_text(self, table: Table) -> str:
-    #     """ Creates the current text line. Depending on the configuration, the text line contains the table name,
-    #     an optional static pre text, the generated row and an optional static follow up text.
-    #     -> e.g. "Freitext vor Tabelle Aktion Freitext nach Tabelle Aktion"
-    #
-    #     :param table the table data
-    #     :return the text to write
-    #     """
-    #     # determines the current row by chance
-    #     table_row = table.get_row_by_chance()
-    #     row_text = table.table_name + ": "
-    #     if table.pre_text:
-    #         row_text += "{} ".format(table.pre_text)
-    #     row_text += table_row.generate()
-    #     if table.follow_up_text:
-    #         row_text += " {}".format(table.follow_up_text)
+        # determines the current row by chance and generates it
+        return ConsoleIO.format_table_text(table.table_name, table.pre_text, table.generate(rng),
+                                           table.follow_up_text)
+
+
+    @staticmethod
+    def format_table_text(table_name: str, pre_text: str, text: str, follow_up_text: str) -> str:
+        """ Formats the text line of a table with a small indent. The pre text and the follow up text are optional
+
+        :param table_name the name of the table
+        :param pre_text the static pre text of the table
+        :param text the generated row text
+        :param follow_up_text the static follow up text of the table
+        :return the text to write
+        """
+        if pre_text and follow_up_text:
+            return "\t{}:\n\t{}\n\t{}\n\t{}\n".format(table_name, pre_text, text, follow_up_text)
+        if pre_text:
+            return "\t{}:\n\t{}\n\t{}\n".format(table_name, pre_text, text)
+        if follow_up_text:
+            return "\t{}:\n\t{}\n\t{}\n".format(table_name, text, follow_up_text)
+        return "\t{}:\n\t{}\n".format(table_name, text)
+
 
     def iterations(self) -> int:
         """ This method determines the iterations of the application (e.g. execute 5 times)
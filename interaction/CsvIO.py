@@ -0,0 +1,45 @@
+import csv
+import io
+
+from interaction.StreamIO import StreamIO
+
+
+class CsvIO(StreamIO):
+    """ Writes every generated line of a story table as csv row """
+    HEADER = ("iteration", "context", "table", "pre_text", "text", "follow_up_text")
+
+
+    def __init__(self, stream, iterations: int, buffer_size: int = StreamIO.DEFAULT_BUFFER_SIZE,
+                 first_iteration: int = 0) -> None:
+        """ Constructor. Writes the csv header
+
+        :param stream the text stream to write to
+        :param iterations the number of iterations that will be executed
+        :param buffer_size the number of characters that will be buffered before they are written to the stream
+        :param first_iteration the number of the first iteration that will be written
+        """
+        StreamIO.__init__(self, stream, iterations, buffer_size, first_iteration)
+        self.__text = io.StringIO()
+        self.__writer = csv.writer(self.__text)
+        self.__writer.writerow(CsvIO.HEADER)
+        stream.write(self.__take_text())
+
+
+    def __take_text(self) -> str:
+        """ :return the text written by the csv writer since the last call """
+        text = self.__text.getvalue()
+        self.__text.seek(0)
+        self.__text.truncate()
+        return text
+
+
+    def format_record(self, iteration: int, context: str, lines: list) -> str:
+        """ Formats the record as csv rows (one row per story table)
+
+        :param iteration the number of the iteration of the record
+        :param context the context of the story
+        :param lines the (table name, pre text, generated text, follow up text) of every story table
+        :return the formatted record
+        """
+        self.__writer.writerows((iteration, context) + tuple(line) for line in lines)
+        return self.__take_text()
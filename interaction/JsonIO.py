@@ -0,0 +1,55 @@
+import json
+
+from interaction.RecordIO import RecordIO
+
+
+class JsonIO(RecordIO):
+    """ Collects the iterations as records and creates one json document of them (e.g. as response of the
+    RollServer) instead of writing them
+    """
+
+    def __init__(self, first_iteration: int = 0) -> None:
+        """ Constructor
+
+        :param first_iteration the number of the first collected iteration
+        """
+        super().__init__()
+        self.__first_iteration = first_iteration
+
+
+    @staticmethod
+    def record_object(iteration: int, context: str, lines: list) -> dict:
+        """ Creates the json object of a record, e.g.
+        {"iteration": 0, "context": "...", "lines": [{"table": "...", "pre_text": "...", "text": "...",
+        "follow_up_text": "..."}]}
+
+        :param iteration the number of the iteration of the record
+        :param context the context of the story
+        :param lines the (table name, pre text, generated text, follow up text) of every story table
+        :return the json object of the record
+        """
+        return {
+            "iteration": iteration,
+            "context": context,
+            "lines": [{"table": table_name, "pre_text": pre_text, "text": text, "follow_up_text": follow_up_text}
+                      for table_name, pre_text, text, follow_up_text in lines]
+        }
+
+
+    def take_document(self, story: str, seed: int) -> dict:
+        """ Creates the json object of all collected records and forgets them
+
+        :param story the name of the story
+        :param seed the seed of the iterations
+        :return the json object, e.g. {"story": "...", "seed": 42, "rolls": [<record>, ...]}
+        """
+        records = self.take_records()
+        rolls = [JsonIO.record_object(self.__first_iteration + i, context, lines)
+                 for i, (context, lines) in enumerate(records)]
+        self.__first_iteration += len(records)
+        return {"story": story, "seed": seed, "rolls": rolls}
+
+
+    def take_json(self, story: str, seed: int) -> str:
+        """ :return the json document of all collected records (see take_document) """
+        return json.dumps(self.take_document(story, seed), ensure_ascii=False)
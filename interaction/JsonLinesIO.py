@@ -0,0 +1,20 @@
+import json
+
+from interaction.JsonIO import JsonIO
+from interaction.StreamIO import StreamIO
+
+
+class JsonLinesIO(StreamIO):
+    """ Writes every iteration as one json object per line """
+
+    def format_record(self, iteration: int, context: str, lines: list) -> str:
+        """ Formats the record as json line, e.g.
+        {"iteration": 0, "context": "...", "lines": [{"table": "...", "pre_text": "...", "text": "...",
+        "follow_up_text": "..."}]}
+
+        :param iteration the number of the iteration of the record
+        :param context the context of the story
+        :param lines the (table name, pre text, generated text, follow up text) of every story table
+        :return the formatted record
+        """
+        return json.dumps(JsonIO.record_object(iteration, context, lines), ensure_ascii=False) + "\n"
@@ -0,0 +1,42 @@
+from interaction.AbstractIO import AbstractIO
+
+
+class RecordIO(AbstractIO):
+    """ Collects every iteration as record (story context and the generated lines of the story tables) instead of
+    writing it. The records can be written afterwards, e.g. by StreamIO.write_record in a different process.
+    """
+
+    def __init__(self) -> None:
+        """ Constructor """
+        self.__records = list()
+
+
+    def print_story_context(self, context: str) -> None:
+        """ Starts a new record with the story context
+
+        :param context the context of the story
+        """
+        self.__records.append((context, list()))
+
+
+    def print_story_line(self, table, rng=None) -> None:
+        """ Determines a row of the table by chance and adds the generated text to the current record
+
+        :param table the table to process
+        :param rng optional random stream (RandomStream) of the iteration
+        """
+        text = table.generate(rng)
+        self.__records[-1][1].append((table.table_name, table.pre_text, text, table.follow_up_text))
+
+
+    def take_records(self) -> list:
+        """ :return all collected records as (context, lines) and forgets them. Every line is a
+            (table name, pre text, generated text, follow up text) """
+        records = self.__records
+        self.__records = list()
+        return records
+
+
+    def iterations(self) -> int:
+        """ :return 0, the iterations are determined by the user of the records """
+        return 0
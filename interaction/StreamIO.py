@@ -0,0 +1,116 @@
+import abc
+
+from interaction.AbstractIO import AbstractIO
+
+
+class StreamIO(AbstractIO, metaclass=abc.ABCMeta):
+    """ A non interactive io that writes the generated stories into a text stream (e.g. a file or stdout).
+    Every iteration (story context and the generated lines of the story tables) is formatted as one record. The
+    records are buffered and written in large blocks.
+    """
+    DEFAULT_BUFFER_SIZE = int(1 << 20)
+
+
+    def __init__(self, stream, iterations: int, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 first_iteration: int = 0) -> None:
+        """ Constructor
+
+        :param stream the text stream to write to
+        :param iterations the number of iterations that will be executed
+        :param buffer_size the number of characters that will be buffered before they are written to the stream
+        :param first_iteration the number of the first iteration that will be written
+        """
+        self.__stream = stream
+        self.__iterations = iterations
+        self.__buffer_size = buffer_size
+        self.__buffer = list()
+        self.__buffered_size = 0
+        self.__record_count = first_iteration
+        # the story context and the lines (table name, pre text, generated text, follow up text) of the current record
+        self.__context = None
+        self.__lines = list()
+
+
+    def print_story_context(self, context: str) -> None:
+        """ Starts a new record with the story context. The previous record is complete and will be written
+
+        :param context the context of the story
+        """
+        self.__finish_record()
+        self.__context = context
+
+
+    def print_story_line(self, table, rng=None) -> None:
+        """ Determines a row of the table by chance and adds the generated text to the current record
+
+        :param table the table to process
+        :param rng optional random stream (RandomStream) of the iteration
+        """
+        text = table.generate(rng)
+        self.__lines.append((table.table_name, table.pre_text, text, table.follow_up_text))
+
+
+    def write_record(self, context: str, lines: list) -> None:
+        """ Writes a complete record, e.g. a record that was generated by a different process
+
+        :param context the context of the story
+        :param lines the (table name, pre text, generated text, follow up text) of every story table
+        """
+        self.__write(self.format_record(self.__record_count, context, lines))
+        self.__record_count += 1
+
+
+    @abc.abstractmethod
+    def format_record(self, iteration: int, context: str, lines: list) -> str:
+        """ Formats a record
+
+        :param iteration the number of the iteration of the record
+        :param context the context of the story
+        :param lines the (table name, pre text, generated text, follow up text) of every story table
+        :return the formatted record
+        """
+        pass
+
+
+    def __finish_record(self) -> None:
+        """ Writes the current record, if there is one """
+        if self.__context is not None:
+            self.write_record(self.__context, self.__lines)
+            self.__context = None
+            self.__lines = list()
+
+
+    def __write(self, text: str) -> None:
+        """ Buffers the text and writes the buffer if it is full
+
+        :param text the text to write
+        """
+        self.__buffer.append(text)
+        self.__buffered_size += len(text)
+        if self.__buffered_size >= self.__buffer_size:
+            self.flush()
+
+
+    def flush(self) -> None:
+        """ Writes the buffer into the stream """
+        if self.__buffer:
+            self.__stream.write("".join(self.__buffer))
+            self.__buffer = list()
+            self.__buffered_size = 0
+        self.__stream.flush()
+
+
+    def close(self) -> None:
+        """ Writes the current record and the buffer into the stream """
+        self.__finish_record()
+        self.flush()
+
+
+    def iterations(self) -> int:
+        """ The iterations are executed once
+
+        :return the configured iterations on the first call, 0 afterwards
+        """
+        iterations = self.__iterations
+        self.__iterations = 0
+        return iterations
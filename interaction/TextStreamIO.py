@@ -0,0 +1,16 @@
+from interaction.ConsoleIO import ConsoleIO
+from interaction.StreamIO import StreamIO
+
+
+class TextStreamIO(StreamIO):
+    """ Writes every iteration in the same text format as the console """
+
+    def format_record(self, iteration: int, context: str, lines: list) -> str:
+        """ Formats the record like the console output
+
+        :param iteration the number of the iteration of the record
+        :param context the context of the story
+        :param lines the (table name, pre text, generated text, follow up text) of every story table
+        :return the formatted record
+        """
+        return "{}\n{}\n".format(context, "\n".join(ConsoleIO.format_table_text(*line) for line in lines))
@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+from unittest import TestCase
+
+from interaction.ConsoleIO import ConsoleIO
+from interaction.CsvIO import CsvIO
+from interaction.JsonLinesIO import JsonLinesIO
+from interaction.TextStreamIO import TextStreamIO
+from sheet.Table import Table
+from sheet.TableRow import TableRowEntry
+
+
+def create_table(table_name: str, text: str, pre_text: str = "", follow_up_text: str = "") -> Table:
+    """ :return a table with a single row """
+    table = Table(table_name, pre_text, follow_up_text)
+    table.add_table_row(TableRowEntry(None, 1, text))
+    return table
+
+
+def write_iterations(stream_io, iterations: int) -> None:
+    """ Writes the iterations of a story with two tables like the crawler """
+    coins = create_table("Münzen", "[2W1] Gold", "Im Beutel:")
+    gems = create_table("Edelsteine", "Rubin, \"geschliffen\"", follow_up_text="Ende")
+    for _i in range(iterations):
+        stream_io.print_story_context("Drachenhort")
+        stream_io.print_story_line(coins)
+        stream_io.print_story_line(gems)
+    stream_io.close()
+
+
+class TestStreamIO(TestCase):
+    def test_iterations_are_executed_once(self):
+        stream_io = TextStreamIO(io.StringIO(), 5)
+        self.assertEqual(5, stream_io.iterations())
+        self.assertEqual(0, stream_io.iterations())
+
+    def test_json_lines(self):
+        stream = io.StringIO()
+        write_iterations(JsonLinesIO(stream, 2), 2)
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual([0, 1], [record["iteration"] for record in records])
+        self.assertEqual({"table": "Münzen", "pre_text": "Im Beutel:", "text": "2 Gold", "follow_up_text": ""},
+                         records[1]["lines"][0])
+
+    def test_csv(self):
+        stream = io.StringIO()
+        write_iterations(CsvIO(stream, 1), 1)
+        rows = list(csv.reader(io.StringIO(stream.getvalue())))
+        self.assertEqual(list(CsvIO.HEADER), rows[0])
+        self.assertEqual(["0", "Drachenhort", "Edelsteine", "", "Rubin, \"geschliffen\"", "Ende"], rows[2])
+
+    def test_text_matches_the_console(self):
+        stream = io.StringIO()
+        write_iterations(TextStreamIO(stream, 1), 1)
+        console = ConsoleIO()
+        expected = "Drachenhort\n" + console.create_table_text(create_table("Münzen", "[2W1] Gold", "Im Beutel:")) + \
+                   "\n" + console.create_table_text(create_table("Edelsteine", "Rubin, \"geschliffen\"",
+                                                                 follow_up_text="Ende")) + "\n"
+        self.assertEqual(expected, stream.getvalue())
+
+    def test_output_is_buffered(self):
+        stream = io.StringIO()
+        stream_io = JsonLinesIO(stream, 100, buffer_size=1000)
+        stream_io.print_story_context("Drachenhort")
+        stream_io.print_story_line(create_table("Münzen", "Gold"))
+        stream_io.print_story_context("Drachenhort")
+        self.assertEqual("", stream.getvalue())
+        stream_io.close()
+        self.assertEqual(2, len(stream.getvalue().splitlines()))
@@ -1,9 +1,12 @@
 import abc
+import concurrent.futures
 
-from requests.structures import CaseInsensitiveDict
+from core.CaseInsensitiveDict import CaseInsensitiveDict
 
 
 class AbstractSpreadAccess(metaclass=abc.ABCMeta):
+    DEFAULT_SHEET_NAME = "Sheet1"
+    DEFAULT_PREFETCH_WORKERS = int(8)
 
     @abc.abstractmethod
     def crawl_main_sheet(self) -> list:
@@ -30,6 +33,81 @@ class AbstractSpreadAccess(metaclass=abc.ABCMeta):
         pass
 
 
+    def story_table_names(self) -> list:
+        """ Determines the names of the story tables. Implementations that are able to determine the names without
+        crawling the tables should override this method.
+
+        :return a list with all table names of the story
+        """
+        return self.crawl_main_sheet()
+
+
+    def prefetch(self, max_workers: int = DEFAULT_PREFETCH_WORKERS) -> list:
+        """ This method loads all tables of the story and all tables that are referenced by them (transitively).
+        The references of every loaded table are determined statically and the missing tables are loaded concurrently
+        by a bounded pool of threads. After the prefetch, the generation does not need to load any table.
+
+        :param max_workers the maximum number of tables that are loaded at the same time
+        :return a list with the (table, sheet name) of every reachable table in the order they were found
+        """
+        tables = CaseInsensitiveDict()
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+            pending = dict()
+
+            def submit(table_name: str, sheet_name: str) -> None:
+                """ loads the table, if it is not loaded or loading yet """
+                if table_name not in tables:
+                    # reserves the position of the table in the order of the found tables
+                    tables[table_name] = None
+                    pending[executor.submit(self.get_table, table_name, sheet_name)] = (table_name, sheet_name)
+
+            for table_name in self.story_table_names():
+                submit(table_name, AbstractSpreadAccess.DEFAULT_SHEET_NAME)
+            while pending:
+                done, _not_done = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    table_name, sheet_name = pending.pop(future)
+                    table = future.result()
+                    tables[table_name] = (table, sheet_name)
+                    for referenced_table_name, referenced_sheet_name in table.referenced_tables():
+                        submit(referenced_table_name, referenced_sheet_name)
+        return list(tables.values())
+
+
+    def table_changed(self, table_name: str) -> None:
+        """ Is called after the rows of a loaded table were changed or compiled (e.g. by the TableOptimizer). The
+        default implementation does nothing. Implementations with a bounded cache of tables should update the size
+        of the table
+
+        :param table_name the name of the changed table
+        """
+        pass
+
+
+    def crawl_table_rows(self, table_name: str, sheet_name: str) -> list:
+        """ This method crawls all rows of a table (chance and text column) until the first empty row. The default
+        implementation reads the columns in chunks of the read range. Implementations that are able to read both
+        columns of a table at once should override this method.
+
+        :param table_name the name of the table to crawl
+        :param sheet_name optional possibility to access the sheet by name in a different excel file
+        :return a list with a (chance, text) tuple for every row of the table
+        """
+        rows = list()
+        row_pos = 1
+        while True:
+            # it is quicker to access the sheet in a range (compared to the cells) -> but it is still slow...
+            chances = self.crawl_sheet_column_in_range(table_name, sheet_name, self.chance_range_column_pattern,
+                                                       row_pos)
+            texts = self.crawl_sheet_column_in_range(table_name, sheet_name, self.text_range_column_pattern, row_pos)
+            for chance, text in zip(chances, texts):
+                # found the end in the sheet
+                if not chance and not text:
+                    return rows
+                rows.append((chance, text))
+            row_pos += self.read_range + 1
+
+
     @abc.abstractmethod
     def get_table(self, table_name: str, sheet_name: str = ""):
         """ this method verifies if a table exists. If yes, the table will be returned. If not, the table will be
@@ -0,0 +1,256 @@
+import logging
+import mmap
+import struct
+
+from core.CaseInsensitiveDict import CaseInsensitiveDict
+from core.LoggerId import LOGGER_ID
+from generator.DiceThrow import DiceThrow
+from generator.TableReference import TableReference
+from sheet.AbstractSpreadAccess import AbstractSpreadAccess
+from sheet.Table import Table
+from sheet.TableRow import TableRowEntry
+
+
+class BundleSpreadAccess(AbstractSpreadAccess):
+    """ Serves the tables of a story from a compiled story bundle. The bundle is created once by the export of an
+    existing spread access (e.g. GSpreadAccess) and memory mapped afterwards, i.e. no network access is required and
+    all processes that open the same bundle share the page cache of the file.
+
+    The bundle is a little endian binary file with the following layout:
+    <header> <story table references> <table index> <rows> <generators> <string pool>
+    Strings are referenced by their absolute offset and length (utf-8) within the string pool.
+    """
+    MAGIC = b"RPGBNDL1"
+    VERSION = int(2)
+    DEFAULT_SHEET_NAME = "Sheet1"
+
+    # magic, version, context (offset, length), story table references (offset, count), table index (offset, count)
+    HEADER = struct.Struct("<8sIIIIIII")
+    # offset and length of a string in the string pool
+    STRING_REF = struct.Struct("<II")
+    # name, sheet name, pre text, follow up text (each offset, length), rows (offset, count)
+    TABLE_ENTRY = struct.Struct("<IIIIIIIIII")
+    # chance, text (offset, length), generators (offset, count)
+    ROW_ENTRY = struct.Struct("<QIIII")
+    # kind of the generator, start index, end index in the row text
+    GENERATOR_ENTRY = struct.Struct("<BII")
+
+    GENERATOR_DICE_THROW = int(0)
+    GENERATOR_TABLE_REFERENCE = int(1)
+
+
+    def __init__(self, bundle_file: str) -> None:
+        """ Constructor
+        Memory maps the given bundle and reads the index of the tables. The tables itself will be created when they
+        are accessed the first time.
+
+        :param bundle_file the path to the story bundle created by BundleSpreadAccess.export
+        """
+        with open(bundle_file, "rb") as file:
+            self.__buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, context_offset, context_length, story_offset, story_count, index_offset, table_count = \
+            BundleSpreadAccess.HEADER.unpack_from(self.__buffer, 0)
+        if magic != BundleSpreadAccess.MAGIC or version != BundleSpreadAccess.VERSION:
+            raise ValueError("Die Datei '{}' ist kein gültiges Story-Bundle (Version {}).".format(
+                bundle_file, BundleSpreadAccess.VERSION))
+        self.__context_name = self.__read_string(context_offset, context_length)
+        self.__story_tables = list()
+        for i in range(story_count):
+            offset, length = BundleSpreadAccess.STRING_REF.unpack_from(
+                self.__buffer, story_offset + i * BundleSpreadAccess.STRING_REF.size)
+            self.__story_tables.append(self.__read_string(offset, length))
+        # the table name to the position of the table within the table index
+        self.__table_index = CaseInsensitiveDict()
+        for i in range(table_count):
+            entry_offset = index_offset + i * BundleSpreadAccess.TABLE_ENTRY.size
+            name_offset, name_length = BundleSpreadAccess.STRING_REF.unpack_from(self.__buffer, entry_offset)
+            self.__table_index[self.__read_string(name_offset, name_length)] = entry_offset
+        self.__table_cache = CaseInsensitiveDict()
+        self.__logger = logging.getLogger(LOGGER_ID)
+
+
+    def __read_string(self, offset: int, length: int) -> str:
+        """ Reads a string from the string pool of the bundle
+
+        :param offset the absolute offset of the string in the bundle
+        :param length the length of the utf-8 encoded string
+        :return the string
+        """
+        return self.__buffer[offset:offset + length].decode("utf-8")
+
+
+    def __load_table(self, table_name: str) -> Table:
+        """ Creates the table to the given table name from the bundle. The generators of the rows are already
+        analyzed in the bundle and will not be parsed again.
+
+        :param table_name the name of the table
+        :return the created table
+        """
+        if table_name not in self.__table_index:
+            raise ValueError(
+                "Die Tabelle '{}' ist nicht im Story-Bundle enthalten. Das Bundle muss neu exportiert werden!".format(
+                    table_name))
+        name_offset, name_length, sheet_offset, sheet_length, pre_offset, pre_length, \
+            follow_up_offset, follow_up_length, rows_offset, row_count = \
+            BundleSpreadAccess.TABLE_ENTRY.unpack_from(self.__buffer, self.__table_index[table_name])
+        sheet_name = self.__read_string(sheet_offset, sheet_length)
+        table = Table(self.__read_string(name_offset, name_length),
+                      self.__read_string(pre_offset, pre_length),
+                      self.__read_string(follow_up_offset, follow_up_length),
+                      sheet_name if sheet_name != BundleSpreadAccess.DEFAULT_SHEET_NAME else "")
+        for i in range(row_count):
+            chance, text_offset, text_length, generators_offset, generator_count = \
+                BundleSpreadAccess.ROW_ENTRY.unpack_from(self.__buffer,
+                                                         rows_offset + i * BundleSpreadAccess.ROW_ENTRY.size)
+            text = self.__read_string(text_offset, text_length)
+            generators = list()
+            for j in range(generator_count):
+                kind, start_index, end_index = BundleSpreadAccess.GENERATOR_ENTRY.unpack_from(
+                    self.__buffer, generators_offset + j * BundleSpreadAccess.GENERATOR_ENTRY.size)
+                generator_text = text[start_index + 1:end_index]
+                if kind == BundleSpreadAccess.GENERATOR_DICE_THROW:
+                    generators.append(DiceThrow(start_index, end_index, generator_text))
+                else:
+                    generators.append(TableReference(self, start_index, end_index, generator_text))
+            table.add_table_row(TableRowEntry(self, chance, text, generators))
+        table.freeze()
+        self.__logger.debug("Lade die Tabelle mit dem Namen {} aus dem Story-Bundle".format(table_name))
+        return table
+
+
+    def crawl_main_sheet(self) -> list:
+        """ :return a list with all table names of the story """
+        return list(self.__story_tables)
+
+
+    def crawl_sheet_column_in_range(self, table_name: str, sheet_name: str, column_pattern: str, row_pos: int) -> list:
+        """ This method reads in a specified read range from the given row position and returns the values of the
+        bundled table. Rows after the end of the table will be returned as empty values.
+
+        :param table_name the name of the table to crawl
+        :param sheet_name optional possibility to access the sheet by name in a different excel file
+        :param column_pattern the range pattern that is used to access multiple cells in a columns. (e.g. A{}:A{})
+        :param row_pos the position of the row where we start to crawl
+        :return a list with values.
+        """
+        rows = self.get_table(table_name, sheet_name).table_rows
+        column_data = list()
+        for row_index in range(row_pos - 1, row_pos + self.read_range):
+            if row_index >= len(rows):
+                column_data.append("")
+            elif column_pattern == self.chance_range_column_pattern:
+                column_data.append(str(rows[row_index].get_chance))
+            else:
+                column_data.append(rows[row_index].get_text)
+        return column_data
+
+
+    def get_table(self, table_name: str, sheet_name: str = DEFAULT_SHEET_NAME):
+        """ This method verifies if a table was already created from the bundle. If not, the table will be created
+        from the bundle, cached and returned afterwards
+
+        :param table_name the name of the table
+        :param sheet_name optional possibility to access the sheet by name in a different excel file
+        :return the table
+        """
+        if table_name not in self.__table_cache:
+            self.__table_cache[table_name] = self.__load_table(table_name)
+        return self.__table_cache[table_name]
+
+
+    def story_context(self) -> str:
+        """ :return the context / name of the story """
+        return self.__context_name
+
+
+    def close(self) -> None:
+        """ Releases the memory mapped bundle """
+        self.__buffer.close()
+
+
+    @property
+    def read_range(self) -> int:
+        """ :return the range of rows to be read """
+        return 10
+
+
+    @property
+    def chance_range_column_pattern(self) -> str:
+        """:return the range pattern for the chance column in data tables """
+        return "A{}:A{}"
+
+
+    @property
+    def text_range_column_pattern(self) -> str:
+        """:return the range pattern for the text column in data tables """
+        return "B{}:B{}"
+
+
+    @staticmethod
+    def export(spread_access: AbstractSpreadAccess, bundle_file: str) -> int:
+        """ Walks the story of the given spread access and writes every reachable table (the tables of the story and
+        all tables that are referenced by them) into a story bundle.
+
+        :param spread_access the access to the spreads that will be exported (e.g. GSpreadAccess)
+        :param bundle_file the path of the bundle to write
+        :return the number of exported tables
+        """
+        story_tables = spread_access.story_table_names()
+        context_name = spread_access.story_context()
+        # all reachable tables in the order they are found
+        tables = spread_access.prefetch()
+
+        strings = dict()
+        string_pool = bytearray()
+
+        def string_ref(text: str) -> tuple:
+            """ :return the relative offset and length of the text in the string pool """
+            text = text or ""
+            if text not in strings:
+                data = text.encode("utf-8")
+                strings[text] = (len(string_pool), len(data))
+                string_pool.extend(data)
+            return strings[text]
+
+        story_offset = BundleSpreadAccess.HEADER.size
+        index_offset = story_offset + len(story_tables) * BundleSpreadAccess.STRING_REF.size
+        rows_offset = index_offset + len(tables) * BundleSpreadAccess.TABLE_ENTRY.size
+        row_count = sum(len(table.table_rows) for table, _sheet_name in tables)
+        generators_offset = rows_offset + row_count * BundleSpreadAccess.ROW_ENTRY.size
+        generator_count = sum(len(row.generators) for table, _sheet_name in tables for row in table.table_rows)
+        pool_offset = generators_offset + generator_count * BundleSpreadAccess.GENERATOR_ENTRY.size
+
+        def absolute_ref(text: str) -> tuple:
+            """ :return the absolute offset and length of the text in the bundle """
+            offset, length = string_ref(text)
+            return pool_offset + offset, length
+
+        story_section = bytearray()
+        for table_name in story_tables:
+            story_section.extend(BundleSpreadAccess.STRING_REF.pack(*absolute_ref(table_name)))
+
+        index_section = bytearray()
+        rows_section = bytearray()
+        generators_section = bytearray()
+        for table, sheet_name in tables:
+            index_section.extend(BundleSpreadAccess.TABLE_ENTRY.pack(
+                *absolute_ref(table.table_name), *absolute_ref(sheet_name), *absolute_ref(table.pre_text),
+                *absolute_ref(table.follow_up_text), rows_offset + len(rows_section), len(table.table_rows)))
+            for row in table.table_rows:
+                rows_section.extend(BundleSpreadAccess.ROW_ENTRY.pack(
+                    row.get_chance, *absolute_ref(row.get_text), generators_offset + len(generators_section),
+                    len(row.generators)))
+                for generator in row.generators:
+                    kind = BundleSpreadAccess.GENERATOR_TABLE_REFERENCE if isinstance(generator, TableReference) \
+                        else BundleSpreadAccess.GENERATOR_DICE_THROW
+                    generators_section.extend(BundleSpreadAccess.GENERATOR_ENTRY.pack(
+                        kind, generator.get_start_index, generator.get_end_index))
+
+        context_offset, context_length = absolute_ref(context_name)
+        header = BundleSpreadAccess.HEADER.pack(BundleSpreadAccess.MAGIC, BundleSpreadAccess.VERSION,
+                                                context_offset, context_length, story_offset, len(story_tables),
+                                                index_offset, len(tables))
+        with open(bundle_file, "wb") as file:
+            for section in (header, story_section, index_section, rows_section, generators_section, string_pool):
+                file.write(section)
+        return len(tables)
@@ -0,0 +1,456 @@
+import collections
+import csv
+import logging
+import os
+import re
+import threading
+import xml.etree.ElementTree as ElementTree
+import zipfile
+
+from core.CaseInsensitiveDict import CaseInsensitiveDict
+from core.LoggerId import LOGGER_ID
+from sheet.AbstractSpreadAccess import AbstractSpreadAccess
+from sheet.Table import Table
+
+
+class FileSpreadAccess(AbstractSpreadAccess):
+    """ Serves the tables of a story from local workbooks in a directory, e.g. to edit the tables offline or to run
+    without google credentials. The lookup is the same as of GSpreadAccess: a table is a tab (sheet) of the core
+    workbook or, if there is no such tab, a separate workbook with the table name (and an optional sheet name,
+    e.g. [Tabelle: Flüche#Alt]).
+
+    A workbook within the directory is either
+    - an Excel workbook <name>.xlsx
+    - an OpenDocument spreadsheet <name>.ods
+    - a single csv file <name>.csv, i.e. a workbook with the only sheet Sheet1
+    - a directory <name> with a csv file <sheet>.csv for every sheet. The first sheet is Sheet1.csv if it exists,
+      otherwise the first file in alphabetical order
+
+    Every workbook is read once in a single streaming pass (xlsx and ods are parsed with zipfile and iterparse) and
+    kept as rows of cell values. The first sheet of the core workbook defines the story (see GSpreadAccess).
+    """
+    COLUMN_STORY_TABLES = int(1)
+    COLUMN_STATIC_PRE_TEXT = int(2)
+    COLUMN_STATIC_FOLLOW_UP_TEXT = int(3)
+    START_ROW = int(5)
+    DEFAULT_SHEET_NAME = "Sheet1"
+    WORKBOOK_EXTENSIONS = (".xlsx", ".ods", ".csv")
+    CELL_REFERENCE_PATTERN = re.compile(r"^([A-Z]+)(\d*)$")
+
+    XLSX_NAMESPACE = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+    XLSX_RELATIONSHIP_NAMESPACE = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+    XLSX_PACKAGE_NAMESPACE = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+    ODS_TABLE_NAMESPACE = "{urn:oasis:names:tc:opendocument:xmlns:table:1.0}"
+    ODS_TEXT_NAMESPACE = "{urn:oasis:names:tc:opendocument:xmlns:text:1.0}"
+    ODS_OFFICE_NAMESPACE = "{urn:oasis:names:tc:opendocument:xmlns:office:1.0}"
+
+
+    def __init__(self, directory: str, core_workbook_name: str) -> None:
+        """ Constructor
+
+        :param directory the directory that contains the workbooks
+        :param core_workbook_name the name of the core workbook (without the extension) that contains the story
+        """
+        self.__directory = directory
+        self.__core_workbook_name = core_workbook_name
+        # the workbook name to its sheets (sheet name -> rows of cell values). None, if there is no such workbook
+        self.__workbooks = CaseInsensitiveDict()
+        self.__workbook_lock = threading.Lock()
+        self.__table_cache = CaseInsensitiveDict()
+        self.__context_name = ""
+        # the (table name, pre text, follow up text) of every story table. Read once with the context name
+        self.__story_definition = None
+        # the story table name to its (pre text, follow up text)
+        self.__story_texts = CaseInsensitiveDict()
+        self.__logger = logging.getLogger(LOGGER_ID)
+        if self.__workbook(core_workbook_name) is None:
+            raise ValueError("Die Arbeitsmappe '{}' wurde im Verzeichnis '{}' nicht gefunden.".format(
+                core_workbook_name, directory))
+
+
+    def __workbook(self, workbook_name: str):
+        """ Reads the workbook with the given name, if it is not read yet
+
+        :param workbook_name the name of the workbook without the extension
+        :return the sheets of the workbook (sheet name -> rows) or None, if there is no such workbook
+        """
+        with self.__workbook_lock:
+            if workbook_name not in self.__workbooks:
+                path = self.__workbook_path(workbook_name)
+                self.__workbooks[workbook_name] = FileSpreadAccess.read_workbook(path) if path else None
+                if path:
+                    self.__logger.debug("Die Arbeitsmappe '{}' wurde gelesen".format(path))
+            return self.__workbooks[workbook_name]
+
+
+    def __workbook_path(self, workbook_name: str) -> str:
+        """ :return the path of the workbook with the given name or None, if there is no such workbook """
+        path = os.path.join(self.__directory, workbook_name)
+        for extension in FileSpreadAccess.WORKBOOK_EXTENSIONS:
+            if os.path.isfile(path + extension):
+                return path + extension
+        if os.path.isdir(path):
+            return path
+        return None
+
+
+    @staticmethod
+    def read_workbook(path: str) -> collections.OrderedDict:
+        """ Reads all sheets of a workbook
+
+        :param path the path to the workbook (xlsx, ods, csv or a directory of csv files)
+        :return the sheet name to the rows (lists of cell values) of every sheet, in the order of the sheets
+        """
+        if os.path.isdir(path):
+            names = sorted(name for name in os.listdir(path) if name.lower().endswith(".csv"))
+            default_name = FileSpreadAccess.DEFAULT_SHEET_NAME + ".csv"
+            if default_name in names:
+                names.remove(default_name)
+                names.insert(0, default_name)
+            return collections.OrderedDict(
+                (name[:-len(".csv")], FileSpreadAccess.__read_csv(os.path.join(path, name))) for name in names)
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".xlsx":
+            return FileSpreadAccess.__read_xlsx(path)
+        if extension == ".ods":
+            return FileSpreadAccess.__read_ods(path)
+        if extension == ".csv":
+            return collections.OrderedDict([(FileSpreadAccess.DEFAULT_SHEET_NAME, FileSpreadAccess.__read_csv(path))])
+        raise ValueError("Das Format der Arbeitsmappe '{}' wird nicht unterstützt.".format(path))
+
+
+    @staticmethod
+    def __read_csv(path: str) -> list:
+        """ :return the rows of the csv file (utf-8, with or without byte order mark) """
+        with open(path, encoding="utf-8-sig", newline="") as file:
+            return [[value.strip() for value in row] for row in csv.reader(file)]
+
+
+    @staticmethod
+    def __number_text(value: str) -> str:
+        """ :return the number as text like it is displayed by the google api, e.g. 3 instead of 3.0 """
+        try:
+            number = float(value)
+        except ValueError:
+            return value
+        return str(int(number)) if number.is_integer() else value
+
+
+    @staticmethod
+    def __column_index(cell_reference: str, default: int) -> int:
+        """ :return the zero based column of the cell reference (e.g. 1 for B3) or the default, if there is none """
+        match = FileSpreadAccess.CELL_REFERENCE_PATTERN.match(cell_reference or "")
+        if not match:
+            return default
+        index = 0
+        for letter in match.group(1):
+            index = index * 26 + ord(letter) - ord("A") + 1
+        return index - 1
+
+
+    @staticmethod
+    def __set_cell(row: list, column: int, value: str) -> None:
+        """ Sets the value of the cell. The row is filled up with empty cells up to the column """
+        if value:
+            row.extend([""] * (column + 1 - len(row)))
+            row[column] = value
+
+
+    @staticmethod
+    def __read_xlsx(path: str) -> collections.OrderedDict:
+        """ Reads an Excel workbook (office open xml) with the sheets in the order of the workbook
+
+        :param path the path to the workbook
+        :return the sheet name to the rows of every sheet
+        """
+        main = FileSpreadAccess.XLSX_NAMESPACE
+        with zipfile.ZipFile(path) as archive:
+            names = set(archive.namelist())
+            targets = dict()
+            with archive.open("xl/_rels/workbook.xml.rels") as file:
+                for _event, element in ElementTree.iterparse(file):
+                    if element.tag == FileSpreadAccess.XLSX_PACKAGE_NAMESPACE + "Relationship":
+                        target = element.get("Target")
+                        targets[element.get("Id")] = target.lstrip("/") if target.startswith("/") else "xl/" + target
+            sheets = list()
+            with archive.open("xl/workbook.xml") as file:
+                for _event, element in ElementTree.iterparse(file):
+                    if element.tag == main + "sheet":
+                        relationship = element.get(FileSpreadAccess.XLSX_RELATIONSHIP_NAMESPACE + "id")
+                        sheets.append((element.get("name"), targets[relationship]))
+            shared_strings = list()
+            if "xl/sharedStrings.xml" in names:
+                with archive.open("xl/sharedStrings.xml") as file:
+                    for _event, element in ElementTree.iterparse(file):
+                        if element.tag == main + "si":
+                            # the text of a rich text consists of multiple runs, phonetic hints are skipped
+                            shared_strings.append("".join(
+                                text.text or "" for child in element if child.tag != main + "rPh"
+                                for text in child.iter(main + "t")))
+                            element.clear()
+            workbook = collections.OrderedDict()
+            for sheet_name, target in sheets:
+                with archive.open(target) as file:
+                    workbook[sheet_name] = FileSpreadAccess.__read_xlsx_sheet(file, shared_strings)
+            return workbook
+
+
+    @staticmethod
+    def __read_xlsx_sheet(file, shared_strings: list) -> list:
+        """ Reads the rows of a worksheet of an Excel workbook
+
+        :param file the worksheet xml
+        :param shared_strings the shared strings of the workbook
+        :return the rows of the sheet. Missing rows and cells are empty
+        """
+        main = FileSpreadAccess.XLSX_NAMESPACE
+        rows = list()
+        for _event, element in ElementTree.iterparse(file):
+            if element.tag != main + "row":
+                continue
+            row_number = int(element.get("r", len(rows) + 1))
+            row = list()
+            for cell in element.iter(main + "c"):
+                cell_type = cell.get("t", "n")
+                value_element = cell.find(main + "v")
+                value = value_element.text if value_element is not None and value_element.text else ""
+                if cell_type == "s" and value:
+                    value = shared_strings[int(value)]
+                elif cell_type == "inlineStr":
+                    value = "".join(text.text or "" for text in cell.iter(main + "t"))
+                elif cell_type == "b" and value:
+                    value = "TRUE" if value == "1" else "FALSE"
+                elif cell_type == "n" and value:
+                    value = FileSpreadAccess.__number_text(value)
+                FileSpreadAccess.__set_cell(row, FileSpreadAccess.__column_index(cell.get("r"), len(row)),
+                                            value.strip())
+            element.clear()
+            if row:
+                rows.extend([] for _i in range(row_number - 1 - len(rows)))
+                rows.append(row)
+        return rows
+
+
+    @staticmethod
+    def __ods_cell_text(cell) -> str:
+        """ :return the text of an OpenDocument cell. Paragraphs are separated by line breaks """
+        text_namespace = FileSpreadAccess.ODS_TEXT_NAMESPACE
+        paragraphs = list()
+        for paragraph in cell.iter(text_namespace + "p"):
+            parts = list()
+
+            def collect(element) -> None:
+                """ collects the text of the element and its children, including the encoded spaces """
+                if element.tag == text_namespace + "s":
+                    parts.append(" " * int(element.get(text_namespace + "c", "1")))
+                elif element.tag == text_namespace + "tab":
+                    parts.append("\t")
+                elif element.tag == text_namespace + "line-break":
+                    parts.append("\n")
+                elif element.text:
+                    parts.append(element.text)
+                for child in element:
+                    collect(child)
+                    if child.tail:
+                        parts.append(child.tail)
+
+            collect(paragraph)
+            paragraphs.append("".join(parts))
+        return "\n".join(paragraphs)
+
+
+    @staticmethod
+    def __read_ods(path: str) -> collections.OrderedDict:
+        """ Reads an OpenDocument spreadsheet with the sheets in the order of the document. Repeated rows and cells
+        (e.g. the empty rows up to the end of a sheet) are only expanded if they are followed by values
+
+        :param path the path to the spreadsheet
+        :return the sheet name to the rows of every sheet
+        """
+        table_namespace = FileSpreadAccess.ODS_TABLE_NAMESPACE
+        office_namespace = FileSpreadAccess.ODS_OFFICE_NAMESPACE
+        workbook = collections.OrderedDict()
+        with zipfile.ZipFile(path) as archive:
+            with archive.open("content.xml") as file:
+                rows = None
+                # the number of empty rows that are only added, if a row with values follows
+                empty_rows = 0
+                for event, element in ElementTree.iterparse(file, events=("start", "end")):
+                    if element.tag == table_namespace + "table":
+                        if event == "start":
+                            rows = list()
+                            empty_rows = 0
+                            workbook[element.get(table_namespace + "name")] = rows
+                        else:
+                            element.clear()
+                    elif element.tag == table_namespace + "table-row" and event == "end":
+                        row = list()
+                        column = 0
+                        for cell in element:
+                            if cell.tag not in (table_namespace + "table-cell", table_namespace + "covered-table-cell"):
+                                continue
+                            repeated = int(cell.get(table_namespace + "number-columns-repeated", "1"))
+                            value_type = cell.get(office_namespace + "value-type")
+                            if value_type in ("float", "percentage", "currency"):
+                                value = FileSpreadAccess.__number_text(cell.get(office_namespace + "value", ""))
+                            else:
+                                value = FileSpreadAccess.__ods_cell_text(cell).strip()
+                            if value:
+                                for i in range(repeated):
+                                    FileSpreadAccess.__set_cell(row, column + i, value)
+                            column += repeated
+                        repeated_rows = int(element.get(table_namespace + "number-rows-repeated", "1"))
+                        if row:
+                            rows.extend([] for _i in range(empty_rows))
+                            rows.extend(list(row) for _i in range(repeated_rows))
+                            empty_rows = 0
+                        else:
+                            empty_rows += repeated_rows
+                        element.clear()
+        return workbook
+
+
+    def __determine_table_sheet(self, table_name: str, sheet_name: str = DEFAULT_SHEET_NAME) -> list:
+        """ Determines the rows of the sheet by the given table name (see GSpreadAccess). In the first try, the table
+        is a sheet (tab) of the core workbook. Otherwise the table is a separate workbook with the given sheet. The
+        default sheet name refers to the first sheet of the workbook, in case there is no sheet with this name
+
+        :param table_name the name of the table to open
+        :param sheet_name optional possibility to access the sheet by name in a different workbook
+        :return the rows of the sheet
+        """
+        core_workbook = self.__workbook(self.__core_workbook_name)
+        if table_name in core_workbook:
+            return core_workbook[table_name]
+        workbook = self.__workbook(table_name)
+        if workbook is not None:
+            if sheet_name in workbook:
+                return workbook[sheet_name]
+            if sheet_name == FileSpreadAccess.DEFAULT_SHEET_NAME and workbook:
+                return next(iter(workbook.values()))
+        raise ValueError(
+            "Zu dem Tabellenname '{}' bzw. dem Sheet '{}' konnte weder ein Excel-Sheet noch eine Excel-Datei "
+            .format(table_name, sheet_name) +
+            "gefunden werden. Der Tabellenname muss identisch sein!")
+
+
+    def __crawl_story_definition(self) -> list:
+        """ Reads the story definition of the first sheet of the core workbook (context name, story tables, pre texts
+        and follow up texts)
+
+        :return a list with the (table name, pre text, follow up text) of every story table
+        """
+        if self.__story_definition is not None:
+            return self.__story_definition
+        core_workbook = self.__workbook(self.__core_workbook_name)
+        values = next(iter(core_workbook.values())) if core_workbook else list()
+        self.__context_name = values[0][0] if values and values[0] else ""
+        story_definition = list()
+        for row_values in values[FileSpreadAccess.START_ROW - 1:]:
+            row_values = list(row_values) + [""] * (FileSpreadAccess.COLUMN_STATIC_FOLLOW_UP_TEXT - len(row_values))
+            table_name = row_values[FileSpreadAccess.COLUMN_STORY_TABLES - 1]
+            if not table_name:
+                break
+            story_definition.append((table_name,
+                                     row_values[FileSpreadAccess.COLUMN_STATIC_PRE_TEXT - 1],
+                                     row_values[FileSpreadAccess.COLUMN_STATIC_FOLLOW_UP_TEXT - 1]))
+        self.__story_texts = CaseInsensitiveDict(
+            (table_name, (pre_text, follow_up_text)) for table_name, pre_text, follow_up_text in story_definition)
+        self.__story_definition = story_definition
+        return self.__story_definition
+
+
+    def crawl_main_sheet(self) -> list:
+        """ :return a list with all table names of the story. The tables of the story are loaded """
+        story_table_names = self.story_table_names()
+        for table_name in story_table_names:
+            self.get_table(table_name)
+        return story_table_names
+
+
+    def story_table_names(self) -> list:
+        """ :return a list with all table names of the story. The tables will not be loaded """
+        return [table_name for table_name, _pre_text, _follow_up_text in self.__crawl_story_definition()]
+
+
+    def crawl_sheet_column_in_range(self, table_name: str, sheet_name: str, column_pattern: str, row_pos: int) -> list:
+        """ This method reads in a specified read range from the given row position and returns the values. Empty lines
+        will be read too.
+
+        :param table_name the name of the table to crawl
+        :param sheet_name optional possibility to access the sheet by name in a different workbook
+        :param column_pattern the range pattern that is used to access multiple cells in a columns. (e.g. A{}:A{})
+        :param row_pos the position of the row where we start to crawl
+        :return a list with values.
+        """
+        rows = self.__determine_table_sheet(table_name, sheet_name)
+        column = FileSpreadAccess.__column_index(column_pattern.split(":")[0].replace("{}", ""), 0)
+        column_data = list()
+        for row_index in range(row_pos - 1, row_pos + self.read_range):
+            row = rows[row_index] if row_index < len(rows) else list()
+            column_data.append(row[column] if column < len(row) else "")
+        return column_data
+
+
+    def crawl_table_rows(self, table_name: str, sheet_name: str) -> list:
+        """ This method reads all rows of a table (chance and text column) until the first empty row.
+
+        :param table_name the name of the table to crawl
+        :param sheet_name optional possibility to access the sheet by name in a different workbook
+        :return a list with a (chance, text) tuple for every row of the table
+        """
+        rows = list()
+        for values in self.__determine_table_sheet(table_name, sheet_name):
+            chance = values[0] if len(values) > 0 else ""
+            text = values[1] if len(values) > 1 else ""
+            # found the end in the sheet
+            if not chance and not text:
+                break
+            rows.append((chance, text))
+        return rows
+
+
+    def get_table(self, table_name: str, sheet_name: str = DEFAULT_SHEET_NAME):
+        """ This method verifies if a table was already loaded. If not, the table will be created from the rows of its
+        workbook, cached and returned afterwards
+
+        :param table_name the name of the table
+        :param sheet_name optional possibility to access the sheet by name in a different workbook
+        :return the table
+        """
+        table = self.__table_cache.get(table_name)
+        if table is not None:
+            return table
+        self.__crawl_story_definition()
+        pre_text, follow_up_text = self.__story_texts.get(table_name, ("", ""))
+        table = Table.from_sheet(self, table_name, sheet_name, pre_text, follow_up_text)
+        if len(table.table_rows) == 0:
+            raise ValueError(
+                "In der Tabelle '{}' zu dem Sheet '{}'".format(table_name, sheet_name) +
+                " konnten keine Zeilen identifiziert werden.")
+        self.__table_cache[table_name] = table
+        return table
+
+
+    def story_context(self) -> str:
+        """ :return the context / name of the story """
+        self.__crawl_story_definition()
+        return self.__context_name
+
+
+    @property
+    def read_range(self) -> int:
+        """ :return the range of rows to be read """
+        return 10
+
+
+    @property
+    def chance_range_column_pattern(self) -> str:
+        """:return the range pattern for the chance column in data tables """
+        return "A{}:A{}"
+
+
+    @property
+    def text_range_column_pattern(self) -> str:
+        """:return the range pattern for the text column in data tables """
+        return "B{}:B{}"
@@ -1,12 +1,17 @@
 import gspread
 import logging
 from gspread import Worksheet, WorksheetNotFound, SpreadsheetNotFound
+from gspread.exceptions import APIError
 from oauth2client.service_account import ServiceAccountCredentials
-from requests.structures import CaseInsensitiveDict
 
-from core.RpgCrawler import RpgCrawler
+from core.CaseInsensitiveDict import CaseInsensitiveDict
+from core.LoggerId import LOGGER_ID
+from core.Metrics import Metrics
 from sheet.AbstractSpreadAccess import AbstractSpreadAccess
+from sheet.LruCache import LruCache
+from sheet.RequestScheduler import RequestScheduler
 from sheet.Table import Table
+from sheet.TableDiskCache import TableDiskCache
 
 
 class GSpreadAccess(AbstractSpreadAccess):
@@ -16,27 +21,58 @@ class GSpreadAccess(AbstractSpreadAccess):
     START_ROW = int(5)
     DEFAULT_SHEET_NAME = "Sheet1"
     CACHE_TABLE_ACCESS_PATTERN = "{}#{}"
+    DISK_CACHE_KEY_PATTERN = "{}#{}#{}"
+    # the chance and the text column of a data table
+    TABLE_RANGE = "A:B"
+    # the story tables, the static pre texts and the static follow up texts of the main sheet
+    STORY_RANGE = "A:C"
 
 
     def __init__(self, core_excel_sheet_name: str, permission_file: str,
-                 scope: str = 'https://spreadsheets.google.com/feeds') -> None:
+                 scope: str = 'https://spreadsheets.google.com/feeds', client=None,
+                 disk_cache: TableDiskCache = None, table_cache: LruCache = None,
+                 worksheet_cache: LruCache = None, scheduler: RequestScheduler = None) -> None:
         """ Constructor
         Uses the credentials to create access to the given core sheet that contains all contexts / stories
 
         :param core_excel_sheet_name the name to the core sheet
         :param permission_file the path to the permission file that allows to access the google excel documents#
         :param scope the scope for the service account credentials
+        :param client optional, an already authorized gspread (compatible) client. If specified, the permission file
+            will not be used
+        :param disk_cache optional persistent cache for the rows of the tables. A cached table will only be read
+            again, if the revision of its spread sheet changed
+        :param table_cache optional cache for the loaded tables (e.g. with a budget of bytes). The tables of the story
+            are pinned in the cache. If not specified, all tables will be kept
+        :param worksheet_cache optional cache for the opened worksheets. If not specified, all worksheets will be kept
+        :param scheduler optional scheduler of the requests to the google api (quota, retries and merged reads). If
+            not specified, the requests are sent directly
         """
-        credentials = ServiceAccountCredentials.from_json_keyfile_name(permission_file, scope)
-        self.__table_cache = CaseInsensitiveDict()
-        self.__worksheet_cache = CaseInsensitiveDict()
-        self.__client = gspread.authorize(credentials)
-        self.__core_spread_sheet = self.__client.open(core_excel_sheet_name)
+        self.__logger = logging.getLogger(LOGGER_ID)
+        self.__table_cache = table_cache if table_cache is not None else LruCache(size_of=Table.estimate_size)
+        self.__worksheet_cache = worksheet_cache if worksheet_cache is not None else LruCache()
+        if client is None:
+            credentials = ServiceAccountCredentials.from_json_keyfile_name(permission_file, scope)
+            client = gspread.authorize(credentials)
+        self.__client = client
+        self.__scheduler = scheduler
+        self.__core_spread_sheet = self.__request(core_excel_sheet_name, self.__client.open, core_excel_sheet_name)
         # the story / context sheet that defines what tables will be used
-        self.__context_sheet = self.__core_spread_sheet.sheet1
+        self.__context_sheet = self.__request(core_excel_sheet_name, lambda: self.__core_spread_sheet.sheet1)
         self.__core_excel_sheet_name = core_excel_sheet_name
+        self.__disk_cache = disk_cache
+        # the name of a spread sheet to its revision at the time it was opened (only determined with a disk cache)
+        self.__revisions = CaseInsensitiveDict()
+        if disk_cache is not None:
+            self.__revisions[core_excel_sheet_name] = self.__revision_of(core_excel_sheet_name,
+                                                                         self.__core_spread_sheet)
         self.__context_name = ""
-        self.__logger = logging.getLogger(RpgCrawler.ID)
+        # the (table name, pre text, follow up text) of every story table. Read once with the context name
+        self.__story_definition = None
+        # the story table name to its (pre text, follow up text)
+        self.__story_texts = CaseInsensitiveDict()
+        if Metrics.enabled:
+            Metrics.register_collector(self.__cache_metrics)
 
 
     def crawl_main_sheet(self) -> list:
@@ -47,66 +83,78 @@ class GSpreadAccess(AbstractSpreadAccess):
 
         :return a list with all table names in the column
         """
-        column_data = self.__context_sheet.col_values(
-            GSpreadAccess.COLUMN_STORY_TABLES)  # TODO optimize: only read few cells ...
-        crawled_main_sheets = list()
-        row = GSpreadAccess.START_ROW
-        for table_name in column_data[4:]:
-            if not table_name:
-                break
-            crawled_main_sheets.append(table_name)
-            self.__crawl_main_sheet_data(table_name=table_name, row=row)
-            row += 1
+        crawled_main_sheets = self.story_table_names()
+        for table_name in crawled_main_sheets:
+            self.get_table(table_name)
         return crawled_main_sheets
 
 
-    def __crawl_main_sheet_data(self, table_name: str = "", row: int = None) -> None:
-        """ This method crawls the main tables of the current sheet to the given table name, if the table is not known
-        yet. The main tables of the story contain the referenced table name inside the current excel sheet, a pre-text
-        and a follow-up text.
+    def story_table_names(self) -> list:
+        """ :return a list with all table names of the story. The tables will not be crawled """
+        return [table_name for table_name, _pre_text, _follow_up_text in self.__crawl_story_definition()]
 
-        :param table_name the name of the table within the current excel sheet
-        :param row the optional row.
-        """
-        # the table is already known
-        if table_name in self.__table_cache:
-            return
-        # creates a table with rows from the excel sheet
-        pre_text = ""
-        follow_up_text = ""
-
-        # if a row is specified, we might have pre and follow up texts to the current story context
-        if row is not None:
-            pre_text = self.__context_sheet.cell(row, GSpreadAccess.COLUMN_STATIC_PRE_TEXT).value
-            follow_up_text = self.__context_sheet.cell(row, GSpreadAccess.COLUMN_STATIC_FOLLOW_UP_TEXT).value
-
-        table = Table.from_sheet(self, table_name, GSpreadAccess.DEFAULT_SHEET_NAME, pre_text, follow_up_text)
-        # in case of an empty sheet
-        if len(table.table_rows) is 0:
-            raise ValueError(
-                "In der referenzierten Storytabelle '{}' konnten keine Zeilen identifiziert werden.".format(table_name))
-        self.__table_cache[table_name] = table
 
+    def __crawl_story_definition(self) -> list:
+        """ This method reads the whole story definition of the main sheet (context name, story tables, pre texts and
+        follow up texts) with a single request. The definition is cached, i.e. the main sheet is read only once.
 
-    def __crawl_table_data(self, table_name: str, sheet_name: str = DEFAULT_SHEET_NAME) -> None:
-        """ This method crawls the table to the given table name, if the table is not known yet.
-        The table contains two columns (chance / text) and multiple rows.
+        :return a list with the (table name, pre text, follow up text) of every story table
+        """
+        if self.__story_definition is not None:
+            return self.__story_definition
+        values = self.__read(self.__context_sheet, GSpreadAccess.STORY_RANGE)
+        self.__context_name = values[0][0] if values and values[0] else ""
+        story_definition = list()
+        for row_values in values[GSpreadAccess.START_ROW - 1:]:
+            # the api omits empty cells at the end of a row
+            row_values = list(row_values) + [""] * (GSpreadAccess.COLUMN_STATIC_FOLLOW_UP_TEXT - len(row_values))
+            table_name = row_values[GSpreadAccess.COLUMN_STORY_TABLES - 1]
+            if not table_name:
+                break
+            story_definition.append((table_name,
+                                     row_values[GSpreadAccess.COLUMN_STATIC_PRE_TEXT - 1],
+                                     row_values[GSpreadAccess.COLUMN_STATIC_FOLLOW_UP_TEXT - 1]))
+        self.__story_texts = CaseInsensitiveDict(
+            (table_name, (pre_text, follow_up_text)) for table_name, pre_text, follow_up_text in story_definition)
+        # the tables of the story are required by every iteration and will never be evicted
+        for table_name, _pre_text, _follow_up_text in story_definition:
+            self.__table_cache.pin(table_name)
+        self.__story_definition = story_definition
+        return self.__story_definition
+
+
+    def __crawl_table_data(self, table_name: str, sheet_name: str = DEFAULT_SHEET_NAME) -> Table:
+        """ This method crawls the table to the given table name and caches it.
+        The table contains two columns (chance / text) and multiple rows. The tables of the story (main tables) get
+        the pre-text and the follow-up text of the main sheet.
 
         :param table_name the name of the table. In some contexts the name of the table can be the excel file name
         :param sheet_name optional possibility to access the sheet by name in a different excel file
+        :return the crawled table
         """
-        if table_name in self.__table_cache:
-            return
-
-        table = Table.from_sheet(self, table_name, sheet_name)
+        self.__crawl_story_definition()
+        is_story_table = table_name in self.__story_texts
+        if is_story_table:
+            pre_text, follow_up_text = self.__story_texts[table_name]
+            table = Table.from_sheet(self, table_name, GSpreadAccess.DEFAULT_SHEET_NAME, pre_text, follow_up_text)
+        else:
+            table = Table.from_sheet(self, table_name, sheet_name)
         # in case of an empty sheet
-        if len(table.table_rows) is 0:
+        if len(table.table_rows) == 0:
+            if is_story_table:
+                raise ValueError(
+                    "In der referenzierten Storytabelle '{}' konnten keine Zeilen identifiziert werden.".format(
+                        table_name))
             raise ValueError(
                 "In der Tabelle '{}' zu dem Sheet '{}'".format(table_name, sheet_name) +
                 " konnten keine Zeilen identifiziert werden.")
 
+        # the rows are compiled before the table is cached, i.e. the estimated size contains the generators
+        for row in table.table_rows:
+            row.prepare()
         self.__logger.debug("Cache die Tabelle mit dem Namen {}".format(table_name))
         self.__table_cache[table_name] = table
+        return table
 
 
     def crawl_sheet_column_in_range(self, table_name: str, sheet_name: str, column_pattern: str, row_pos: int) -> list:
@@ -123,12 +171,119 @@ class GSpreadAccess(AbstractSpreadAccess):
         excel_sheet = self.__determine_table_sheet(table_name, sheet_name)
         column_data = list()
         # it is quicker to access the sheet in a range (compared to the cells) -> but it is still slow...
-        all_column_data = excel_sheet.range(column_pattern.format(row_pos, row_pos + self.read_range))
+        all_column_data = self.__request(table_name, excel_sheet.range,
+                                         column_pattern.format(row_pos, row_pos + self.read_range))
         for idx, tmp in enumerate(all_column_data):
             column_data.append(tmp.value)
         return column_data
 
 
+    def crawl_table_rows(self, table_name: str, sheet_name: str) -> list:
+        """ This method crawls all rows of a table (chance and text column) with a single request.
+
+        :param table_name the name of the table to crawl
+        :param sheet_name optional possibility to access the sheet by name in a different excel file
+        :return a list with a (chance, text) tuple for every row of the table until the first empty row
+        """
+        cache_key = GSpreadAccess.DISK_CACHE_KEY_PATTERN.format(self.__core_excel_sheet_name, table_name, sheet_name)
+        if self.__disk_cache is not None:
+            entry = self.__disk_cache.load(cache_key)
+            if entry is not None:
+                spread_sheet_name, revision, rows = entry
+                # an unknown revision can not be compared, i.e. the table is read again
+                if revision is not None and revision == self.__current_revision(spread_sheet_name):
+                    self.__logger.debug("Lade die Tabelle mit dem Namen {} aus dem Cache".format(table_name))
+                    return rows
+
+        excel_sheet = self.__determine_table_sheet(table_name, sheet_name)
+        rows = list()
+        for values in self.__read(excel_sheet, GSpreadAccess.TABLE_RANGE):
+            # the api omits empty cells at the end of a row
+            chance = values[0] if len(values) > 0 else ""
+            text = values[1] if len(values) > 1 else ""
+            # found the end in the sheet
+            if not chance and not text:
+                break
+            rows.append((chance, text))
+
+        if self.__disk_cache is not None:
+            spread_sheet = excel_sheet.spreadsheet
+            revision = self.__current_revision(spread_sheet.title, spread_sheet)
+            if revision is not None:
+                self.__disk_cache.store(cache_key, spread_sheet.title, revision, rows)
+        return rows
+
+
+    def __request(self, worksheet_name: str, function, *args):
+        """ Sends a request to the google api, by the scheduler if there is one
+
+        :param worksheet_name the name of the requested worksheet or spread sheet (counted by the metrics)
+        :param function the function that sends the request (e.g. client.open)
+        :param args the arguments of the function
+        :return the result of the function
+        """
+        # the scheduler counts the requests it sends (including merged reads and retries)
+        if self.__scheduler is None:
+            Metrics.increment("api_requests_total", worksheet=worksheet_name)
+            return function(*args)
+        return self.__scheduler.execute(function, *args, worksheet=worksheet_name)
+
+
+    def __read(self, worksheet, cell_range: str) -> list:
+        """ Reads the values of a range of the worksheet, by the scheduler if there is one
+
+        :param worksheet the worksheet to read
+        :param cell_range the range in A1 notation (e.g. A:B)
+        :return the rows of values within the range
+        """
+        if self.__scheduler is None:
+            Metrics.increment("api_requests_total", worksheet=worksheet.title)
+            values = worksheet.get(cell_range)
+        else:
+            values = self.__scheduler.read(worksheet, cell_range)
+        if Metrics.enabled:
+            Metrics.increment("fetched_rows_total", len(values), worksheet=worksheet.title)
+            Metrics.increment("fetched_bytes_total", sum(len(str(value).encode("utf-8"))
+                                                         for row_values in values for value in row_values),
+                              worksheet=worksheet.title)
+        return values
+
+
+    def __revision_of(self, spread_sheet_name: str, spread_sheet) -> str:
+        """ Reads the revision (time of the last update) of the spread sheet from the drive meta data
+
+        :param spread_sheet_name the name of the spread sheet
+        :param spread_sheet the opened spread sheet
+        :return the revision of the spread sheet or None if it is unknown
+        """
+        get_last_update_time = getattr(spread_sheet, "get_lastUpdateTime", None)
+        if not callable(get_last_update_time):
+            return None
+        try:
+            return self.__request(spread_sheet_name, get_last_update_time)
+        except APIError as e:
+            # e.g. the credentials are not permitted to read the drive meta data
+            self.__logger.debug("Die Revision von {} ist unbekannt: {}".format(spread_sheet_name, e))
+            return None
+
+
+    def __current_revision(self, spread_sheet_name: str, spread_sheet=None) -> str:
+        """ Determines the revision of the given spread sheet. The revision of every spread sheet is read once
+
+        :param spread_sheet_name the name of the spread sheet
+        :param spread_sheet optional, the already opened spread sheet. If not specified, the spread sheet is opened
+        :return the revision of the spread sheet or None if it is unknown
+        """
+        if spread_sheet_name not in self.__revisions:
+            try:
+                if spread_sheet is None:
+                    spread_sheet = self.__request(spread_sheet_name, self.__client.open, spread_sheet_name)
+                self.__revisions[spread_sheet_name] = self.__revision_of(spread_sheet_name, spread_sheet)
+            except SpreadsheetNotFound:
+                self.__revisions[spread_sheet_name] = None
+        return self.__revisions[spread_sheet_name]
+
+
     def __determine_table_sheet(self, table_name: str, sheet_name: str = DEFAULT_SHEET_NAME) -> Worksheet:
         """ This method determines the the sheet by the given table name.
         In the first try, the method will try to open a spread sheet within the core excel sheet as a tab.
@@ -141,30 +296,29 @@ class GSpreadAccess(AbstractSpreadAccess):
         :return the work sheet / spread sheet
         """
         # is it cached?
-        direct_cache_name = GSpreadAccess.CACHE_TABLE_ACCESS_PATTERN.format(self.__core_excel_sheet_name, table_name)
-        if direct_cache_name in self.__worksheet_cache:
-            return self.__worksheet_cache[direct_cache_name]
-        excel_cache_name = GSpreadAccess.CACHE_TABLE_ACCESS_PATTERN.format(table_name, sheet_name)
-        if excel_cache_name in self.__worksheet_cache:
-            return self.__worksheet_cache[excel_cache_name]
+        cache_name = GSpreadAccess.CACHE_TABLE_ACCESS_PATTERN.format(table_name, sheet_name)
+        sheet = self.__worksheet_cache.get(cache_name)
+        if sheet is not None:
+            return sheet
 
         # not cached yet. Load it
         try:
             # first try - verify if the table name is inside of the core sheet
-            sheet = self.__core_spread_sheet.worksheet(table_name)
-            # cache
-            self.__worksheet_cache[direct_cache_name] = sheet
+            sheet = self.__request(table_name, self.__core_spread_sheet.worksheet, table_name)
         except WorksheetNotFound:
             # second try - try to open a a different excel file to the sheet name
             try:
-                sheet = self.__client.open(table_name).worksheet(sheet_name)
-                # cache
-                self.__worksheet_cache[excel_cache_name] = sheet
+                spread_sheet = self.__request(table_name, self.__client.open, table_name)
+                if self.__disk_cache is not None:
+                    self.__current_revision(spread_sheet.title, spread_sheet)
+                sheet = self.__request(table_name, spread_sheet.worksheet, sheet_name)
             except SpreadsheetNotFound:
                 raise ValueError(
                     "Zu dem Tabellenname '{}' bzw. dem Sheet '{}' konnte weder ein Excel-Sheet noch eine Excel-Datei "
                     .format(table_name, sheet_name) +
                     "gefunden werden. Der Tabellenname muss identisch sein!")
+        # cache
+        self.__worksheet_cache[cache_name] = sheet
         return sheet
 
 
@@ -172,8 +326,7 @@ class GSpreadAccess(AbstractSpreadAccess):
         """ Determines the story context of the sheet in the first column / first row
 
         :return the context / name of the story """
-        if not self.__context_name:
-            self.__context_name = self.__context_sheet.col_values(1)[0]
+        self.__crawl_story_definition()
         return self.__context_name
 
 
@@ -185,14 +338,35 @@ class GSpreadAccess(AbstractSpreadAccess):
         :param sheet_name optional possibility to access the sheet by name in a different excel file
         :return the table
         """
-        if table_name not in self.table_access:
-            self.__crawl_table_data(table_name, sheet_name)
-        return self.table_access[table_name]
+        table = self.__table_cache.get(table_name)
+        if table is None:
+            table = self.__crawl_table_data(table_name, sheet_name)
+        return table
+
+
+    def table_changed(self, table_name: str) -> None:
+        """ Updates the size of the changed table in the table cache (see AbstractSpreadAccess.table_changed) """
+        self.__table_cache.resize(table_name)
+
+
+    def cache_statistics(self) -> dict:
+        """ :return the statistics (entries, bytes, hits, misses, evictions) of the table and the worksheet cache """
+        return {"tables": self.__table_cache.statistics(), "worksheets": self.__worksheet_cache.statistics()}
+
+
+    def __cache_metrics(self) -> list:
+        """ :return the hits, misses and entries of the table and the worksheet cache as (name, labels, value) """
+        metrics = list()
+        for cache_name, statistics in self.cache_statistics().items():
+            labels = {"spread_sheet": self.__core_excel_sheet_name, "cache": cache_name}
+            for key in ("hits", "misses", "evictions", "entries"):
+                metrics.append(("cache_{}".format(key), labels, statistics[key]))
+        return metrics
 
 
     @property
-    def table_access(self) -> CaseInsensitiveDict():
-        """:return all known table names to their tables"""
+    def table_access(self) -> LruCache:
+        """:return all cached table names to their tables"""
         return self.__table_cache
 
 
@@ -0,0 +1,178 @@
+import collections
+import threading
+
+
+class LruCache(object):
+    """ A case insensitive cache with an optional budget of entries and / or bytes. If the budget is exceeded, the
+    least recently used entries that are not pinned will be evicted. The cache counts its hits, misses and evictions.
+    The cache can be used by multiple threads.
+    """
+
+    def __init__(self, max_entries: int = None, max_bytes: int = None, size_of=None) -> None:
+        """ Constructor
+
+        :param max_entries optional maximum number of entries
+        :param max_bytes optional maximum number of bytes of all entries
+        :param size_of optional function that determines the number of bytes of a value. Required for a byte budget
+        """
+        if max_bytes is not None and size_of is None:
+            raise ValueError("Für ein Budget in Bytes muss die Größe der Einträge bestimmt werden können.")
+        self.__max_entries = max_entries
+        self.__max_bytes = max_bytes
+        self.__size_of = size_of
+        # the lower case key to the (key, value, size) of the entry in the order of the last access
+        self.__entries = collections.OrderedDict()
+        self.__pinned = set()
+        self.__bytes = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__lock = threading.RLock()
+
+
+    def __contains__(self, key: str) -> bool:
+        """ :return true, if there is an entry to the key. Neither counted nor an access of the entry """
+        return key.lower() in self.__entries
+
+
+    def __len__(self) -> int:
+        """ :return the number of entries """
+        return len(self.__entries)
+
+
+    def __getitem__(self, key: str):
+        """ :return the value to the key. Raises a KeyError, if there is no entry """
+        value = self.get(key, self)
+        if value is self:
+            raise KeyError(key)
+        return value
+
+
+    def __setitem__(self, key: str, value) -> None:
+        """ Adds or replaces the entry to the key and evicts entries, if the budget is exceeded """
+        size = self.__size_of(value) if self.__size_of is not None else 0
+        with self.__lock:
+            self.__remove(key.lower())
+            self.__entries[key.lower()] = (key, value, size)
+            self.__bytes += size
+            self.__evict()
+
+
+    def resize(self, key: str) -> None:
+        """ Determines the size of the entry to the key again and evicts entries, if the budget is exceeded. Required,
+        if the value grew (or shrank) after it was added, e.g. a table whose rows were analyzed or optimized
+
+        :param key the key of the entry. Nothing happens, if there is no entry
+        """
+        lower_key = key.lower()
+        with self.__lock:
+            entry = self.__entries.get(lower_key)
+            if entry is None or self.__size_of is None:
+                return
+            size = self.__size_of(entry[1])
+            self.__entries[lower_key] = (entry[0], entry[1], size)
+            self.__bytes += size - entry[2]
+            self.__evict()
+
+
+    def get(self, key: str, default=None):
+        """ Determines the value to the key and marks the entry as most recently used
+
+        :param key the key of the entry
+        :param default the value if there is no entry
+        :return the value of the entry or the default value
+        """
+        lower_key = key.lower()
+        with self.__lock:
+            entry = self.__entries.get(lower_key)
+            if entry is None:
+                self.__misses += 1
+                return default
+            self.__hits += 1
+            self.__entries.move_to_end(lower_key)
+            return entry[1]
+
+
+    def pin(self, key: str) -> None:
+        """ Protects the entry to the key (now or when it will be added) against the eviction """
+        with self.__lock:
+            self.__pinned.add(key.lower())
+
+
+    def unpin(self, key: str) -> None:
+        """ Allows the eviction of the entry to the key again """
+        with self.__lock:
+            self.__pinned.discard(key.lower())
+            self.__evict()
+
+
+    def clear(self) -> None:
+        """ Removes all entries. The statistics and the pinned keys are kept """
+        with self.__lock:
+            self.__entries.clear()
+            self.__bytes = 0
+
+
+    def keys(self) -> list:
+        """ :return the keys of all entries """
+        return [key for key, _value, _size in list(self.__entries.values())]
+
+
+    def values(self) -> list:
+        """ :return the values of all entries """
+        return [value for _key, value, _size in list(self.__entries.values())]
+
+
+    def __remove(self, lower_key: str) -> None:
+        """ Removes the entry to the lower case key, if it exists """
+        entry = self.__entries.pop(lower_key, None)
+        if entry is not None:
+            self.__bytes -= entry[2]
+
+
+    def __is_over_budget(self) -> bool:
+        """ :return true, if the entries exceed the budget """
+        return (self.__max_entries is not None and len(self.__entries) > self.__max_entries) or \
+               (self.__max_bytes is not None and self.__bytes > self.__max_bytes)
+
+
+    def __evict(self) -> None:
+        """ Evicts the least recently used entries that are not pinned until the budget is kept """
+        if not self.__is_over_budget():
+            return
+        for lower_key in list(self.__entries):
+            if not self.__is_over_budget():
+                break
+            if lower_key not in self.__pinned:
+                self.__remove(lower_key)
+                self.__evictions += 1
+
+
+    @property
+    def size_in_bytes(self) -> int:
+        """ :return the number of bytes of all entries """
+        return self.__bytes
+
+
+    @property
+    def hits(self) -> int:
+        """ :return the number of accesses that found an entry """
+        return self.__hits
+
+
+    @property
+    def misses(self) -> int:
+        """ :return the number of accesses that did not find an entry """
+        return self.__misses
+
+
+    @property
+    def evictions(self) -> int:
+        """ :return the number of evicted entries """
+        return self.__evictions
+
+
+    def statistics(self) -> dict:
+        """ :return the number of entries, bytes, hits, misses and evictions of the cache """
+        return {"entries": len(self.__entries), "bytes": self.__bytes, "hits": self.__hits, "misses": self.__misses,
+                "evictions": self.__evictions}
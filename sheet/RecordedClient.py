@@ -0,0 +1,277 @@
+import json
+import re
+
+from gspread.cell import Cell
+from gspread.exceptions import SpreadsheetNotFound, WorksheetNotFound
+
+
+class RecordedClient(object):
+    """ A stand-in for the gspread client that serves recorded responses instead of accessing the google spread
+    sheets. Every call that would result in a request to the google api is counted, so the number of round trips of
+    a loading strategy can be verified without network access.
+    The recorded responses are defined as spread sheet name -> worksheet title -> rows (list of cell values).
+    """
+
+    def __init__(self, spread_sheets: dict) -> None:
+        """ Constructor
+
+        :param spread_sheets the recorded spread sheets (spread sheet name -> worksheet title -> rows). The first
+            worksheet of a spread sheet is its sheet1
+        """
+        self.__spread_sheets = {name: RecordedSpreadsheet(self, name, worksheets)
+                                for name, worksheets in spread_sheets.items()}
+        self.__requests = list()
+
+
+    @staticmethod
+    def from_file(recording_file: str):
+        """ Creates the client from a json file with the recorded spread sheets
+
+        :param recording_file the path to the json file (spread sheet name -> worksheet title -> rows)
+        :return the client
+        """
+        with open(recording_file, encoding="utf-8") as file:
+            return RecordedClient(json.load(file))
+
+
+    def record_request(self, spread_sheet_name: str, worksheet_title: str, operation: str, cell_range: str) -> None:
+        """ Records a request that would have been sent to the google api
+
+        :param spread_sheet_name the name of the accessed spread sheet
+        :param worksheet_title the title of the accessed worksheet (empty for spread sheet requests)
+        :param operation the name of the operation (e.g. get)
+        :param cell_range the accessed range (empty for meta data requests)
+        """
+        self.__requests.append((spread_sheet_name, worksheet_title, operation, cell_range))
+
+
+    def open(self, title: str):
+        """ Opens the spread sheet with the given name
+
+        :param title the name of the spread sheet
+        :return the spread sheet
+        """
+        self.record_request(title, "", "open", "")
+        if title not in self.__spread_sheets:
+            raise SpreadsheetNotFound(title)
+        return self.__spread_sheets[title]
+
+
+    def update_worksheet(self, spread_sheet_name: str, worksheet_title: str, rows: list) -> None:
+        """ Replaces the rows of a worksheet and increases the revision of its spread sheet, like an edit of a user
+
+        :param spread_sheet_name the name of the spread sheet
+        :param worksheet_title the title of the worksheet
+        :param rows the new rows of the worksheet
+        """
+        self.__spread_sheets[spread_sheet_name].update_worksheet(worksheet_title, rows)
+
+
+    def reset(self) -> None:
+        """ Forgets all recorded requests """
+        self.__requests.clear()
+
+
+    @property
+    def requests(self) -> list:
+        """ :return all recorded requests as (spread sheet name, worksheet title, operation, range) """
+        return list(self.__requests)
+
+
+    @property
+    def request_count(self) -> int:
+        """ :return the number of requests that would have been sent to the google api """
+        return len(self.__requests)
+
+
+class RecordedSpreadsheet(object):
+    def __init__(self, client: RecordedClient, title: str, worksheets: dict) -> None:
+        """ Constructor
+
+        :param client the client that records the requests
+        :param title the name of the spread sheet
+        :param worksheets the worksheet title -> rows
+        """
+        self.__client = client
+        self.__title = title
+        self.__worksheets = [RecordedWorksheet(client, self, worksheet_title, rows)
+                             for worksheet_title, rows in worksheets.items()]
+        self.__revision = 1
+
+
+    def update_worksheet(self, title: str, rows: list) -> None:
+        """ Replaces the rows of the worksheet and increases the revision of the spread sheet """
+        for i, worksheet in enumerate(self.__worksheets):
+            if worksheet.title == title:
+                self.__worksheets[i] = RecordedWorksheet(self.__client, self, title, rows)
+        self.__revision += 1
+
+
+    def worksheet(self, title: str):
+        """ :return the worksheet with the given title """
+        self.__client.record_request(self.__title, title, "worksheet", "")
+        for worksheet in self.__worksheets:
+            if worksheet.title == title:
+                return worksheet
+        raise WorksheetNotFound(title)
+
+
+    def worksheets(self) -> list:
+        """ :return all worksheets of the spread sheet """
+        self.__client.record_request(self.__title, "", "worksheets", "")
+        return list(self.__worksheets)
+
+
+    @property
+    def sheet1(self):
+        """ :return the first worksheet of the spread sheet """
+        self.__client.record_request(self.__title, "", "sheet1", "")
+        return self.__worksheets[0]
+
+
+    @property
+    def title(self) -> str:
+        """ :return the name of the spread sheet """
+        return self.__title
+
+
+    def get_lastUpdateTime(self) -> str:
+        """ :return the revision of the spread sheet (read from the drive meta data) """
+        self.__client.record_request(self.__title, "", "get_lastUpdateTime", "")
+        return str(self.__revision)
+
+
+class RecordedWorksheet(object):
+    RANGE_PATTERN = re.compile(r"^([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?$", re.IGNORECASE)
+
+
+    def __init__(self, client: RecordedClient, spreadsheet: RecordedSpreadsheet, title: str, rows: list) -> None:
+        """ Constructor
+
+        :param client the client that records the requests
+        :param spreadsheet the spread sheet of this worksheet
+        :param title the title of the worksheet
+        :param rows the rows of the worksheet (list of cell values)
+        """
+        self.__client = client
+        self.__spreadsheet = spreadsheet
+        self.__title = title
+        self.__rows = [["" if value is None else str(value) for value in row] for row in rows]
+
+
+    def __record(self, operation: str, cell_range: str = "") -> None:
+        """ Records a request to this worksheet """
+        self.__client.record_request(self.__spreadsheet.title, self.__title, operation, cell_range)
+
+
+    def __value(self, row: int, col: int) -> str:
+        """ :return the value of the cell (1 based) or an empty string for cells outside of the recorded rows """
+        if row > len(self.__rows) or col > len(self.__rows[row - 1]):
+            return ""
+        return self.__rows[row - 1][col - 1]
+
+
+    @staticmethod
+    def __column_index(column: str) -> int:
+        """ :return the 1 based index of a column label (e.g. A -> 1, AB -> 28) """
+        index = 0
+        for char in column.upper():
+            index = index * 26 + ord(char) - ord("A") + 1
+        return index
+
+
+    def __parse_range(self, cell_range: str) -> tuple:
+        """ Parses a range in A1 notation (e.g. A1:B20, A:B, A5)
+
+        :return the first row, first column, last row and last column (1 based, inclusive)
+        """
+        match = RecordedWorksheet.RANGE_PATTERN.match(cell_range.strip())
+        if not match:
+            raise ValueError("Der Bereich '{}' ist ungültig.".format(cell_range))
+        first_col, first_row, last_col, last_row = match.groups()
+        if last_col is None and last_row is None:
+            last_col, last_row = first_col, first_row
+        return (int(first_row) if first_row else 1,
+                RecordedWorksheet.__column_index(first_col) if first_col else 1,
+                int(last_row) if last_row else self.row_count,
+                RecordedWorksheet.__column_index(last_col) if last_col else self.col_count)
+
+
+    def __values(self, cell_range: str) -> list:
+        """ :return the rows of values within the range. Like the google api, trailing empty cells and rows are
+            omitted """
+        first_row, first_col, last_row, last_col = self.__parse_range(cell_range)
+        values = list()
+        for row in range(first_row, last_row + 1):
+            row_values = [self.__value(row, col) for col in range(first_col, last_col + 1)]
+            while row_values and not row_values[-1]:
+                row_values.pop()
+            values.append(row_values)
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+
+    def get(self, cell_range: str) -> list:
+        """ :return the rows of values within the range (one request) """
+        self.__record("get", cell_range)
+        return self.__values(cell_range)
+
+
+    def batch_get(self, cell_ranges: list) -> list:
+        """ :return the rows of values for every range (one request) """
+        self.__record("batch_get", ",".join(cell_ranges))
+        return [self.__values(cell_range) for cell_range in cell_ranges]
+
+
+    def range(self, cell_range: str) -> list:
+        """ :return all cells within the range, including the empty cells (one request) """
+        self.__record("range", cell_range)
+        first_row, first_col, last_row, last_col = self.__parse_range(cell_range)
+        return [Cell(row, col, self.__value(row, col))
+                for row in range(first_row, last_row + 1) for col in range(first_col, last_col + 1)]
+
+
+    def col_values(self, col: int) -> list:
+        """ :return all values of the column (one request) """
+        self.__record("col_values", str(col))
+        values = [self.__value(row, col) for row in range(1, len(self.__rows) + 1)]
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+
+    def cell(self, row: int, col: int) -> Cell:
+        """ :return the cell (one request) """
+        self.__record("cell", "R{}C{}".format(row, col))
+        return Cell(row, col, self.__value(row, col))
+
+
+    def get_all_values(self) -> list:
+        """ :return all rows of the worksheet (one request) """
+        self.__record("get_all_values")
+        return [list(row) for row in self.__rows]
+
+
+    @property
+    def title(self) -> str:
+        """ :return the title of the worksheet """
+        return self.__title
+
+
+    @property
+    def spreadsheet(self) -> RecordedSpreadsheet:
+        """ :return the spread sheet of the worksheet """
+        return self.__spreadsheet
+
+
+    @property
+    def row_count(self) -> int:
+        """ :return the number of rows of the worksheet """
+        return max(len(self.__rows), 1)
+
+
+    @property
+    def col_count(self) -> int:
+        """ :return the number of columns of the worksheet """
+        return max([len(row) for row in self.__rows] + [1])
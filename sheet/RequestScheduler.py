@@ -0,0 +1,181 @@
+import logging
+import random
+import threading
+import time
+
+from core.LoggerId import LOGGER_ID
+from core.Metrics import Metrics
+
+
+class PendingRead(object):
+    """ The range reads of a worksheet that are merged into one request """
+
+    def __init__(self, worksheet) -> None:
+        """ Constructor
+
+        :param worksheet the worksheet that is read
+        """
+        self.worksheet = worksheet
+        self.ranges = list()
+        # true, as soon as the request was started, i.e. no further ranges can be added
+        self.closed = False
+        self.results = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class RequestScheduler(object):
+    """ Schedules the requests to the google api (e.g. of GSpreadAccess):
+    - a token bucket limits the requests to the quota of the api. The rate is chosen so that no quota window
+      exceeds the quota, including the burst
+    - requests that fail by the quota (429) or a server error (5xx) are retried with an exponential backoff and
+      jitter
+    - range reads of the same worksheet that wait for a token are merged into one batched request
+    """
+    # the read requests per minute and user of the google sheets api
+    DEFAULT_QUOTA = int(60)
+    DEFAULT_QUOTA_WINDOW = 60.0
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    # the rounding error of the refilled tokens, i.e. a token is available a little bit before it is complete
+    TOKEN_EPSILON = 1e-9
+
+
+    def __init__(self, quota: int = DEFAULT_QUOTA, quota_window: float = DEFAULT_QUOTA_WINDOW, burst: int = 1,
+                 max_retries: int = 6, base_delay: float = 1.0, max_delay: float = 64.0, seed: int = None,
+                 clock=time.monotonic, sleep=time.sleep) -> None:
+        """ Constructor
+
+        :param quota the maximum number of requests within the quota window
+        :param quota_window the duration of the quota window in seconds
+        :param burst the number of requests that can be sent at once (the capacity of the token bucket)
+        :param max_retries the maximum number of retries of a failed request
+        :param base_delay the delay before the first retry in seconds. Doubled for every further retry
+        :param max_delay the maximum delay before a retry in seconds
+        :param seed optional seed of the jitter
+        :param clock the clock of the token bucket (e.g. replaced in tests)
+        :param sleep the function that waits (e.g. replaced in tests)
+        """
+        if not 0 < burst <= quota:
+            raise ValueError("Die Anzahl der gleichzeitigen Anfragen muss zwischen 1 und der Quota liegen.")
+        self.__capacity = float(burst)
+        # the burst and the refilled tokens of a window keep the quota. A burst of the whole quota (e.g. a quota of 1)
+        # is refilled with one token per window
+        self.__rate = max(quota - burst, 1) / quota_window
+        self.__tokens = float(burst)
+        self.__max_retries = max_retries
+        self.__base_delay = base_delay
+        self.__max_delay = max_delay
+        self.__random = random.Random(seed)
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__last_refill = clock()
+        # the worksheet (id) to its pending range reads
+        self.__pending_reads = dict()
+        self.__request_count = 0
+        self.__retry_count = 0
+        self.__lock = threading.Lock()
+        self.__logger = logging.getLogger(LOGGER_ID)
+        # imported with the first scheduler, i.e. gspread is not loaded until the google api is used
+        from gspread.exceptions import APIError
+        self.__api_error = APIError
+
+
+    def __acquire(self) -> None:
+        """ Waits for a token of the bucket """
+        while True:
+            with self.__lock:
+                now = self.__clock()
+                self.__tokens = min(self.__capacity, self.__tokens + (now - self.__last_refill) * self.__rate)
+                self.__last_refill = now
+                if self.__tokens >= 1.0 - RequestScheduler.TOKEN_EPSILON:
+                    self.__tokens = max(0.0, self.__tokens - 1.0)
+                    self.__request_count += 1
+                    return
+                wait = (1.0 - self.__tokens) / self.__rate
+            self.__sleep(wait)
+
+
+    def execute(self, function, *args, worksheet: str = ""):
+        """ Executes a request within the quota and retries it, if it fails by the quota or a server error
+
+        :param function the function that sends the request (e.g. worksheet.get)
+        :param args the arguments of the function
+        :param worksheet the name of the requested worksheet or spread sheet. Every sent request (including every
+            retry) is counted by the metrics for it
+        :return the result of the function
+        """
+        attempt = 0
+        while True:
+            self.__acquire()
+            Metrics.increment("api_requests_total", worksheet=worksheet)
+            try:
+                return function(*args)
+            except self.__api_error as error:
+                if error.code not in RequestScheduler.RETRY_STATUS_CODES or attempt >= self.__max_retries:
+                    raise
+                # exponential backoff with full jitter
+                with self.__lock:
+                    delay = self.__random.uniform(0, min(self.__max_delay, self.__base_delay * (2 ** attempt)))
+                    self.__retry_count += 1
+                Metrics.increment("api_retries_total", status=error.code)
+                self.__logger.debug("Wiederhole die Anfrage nach {:.2f} Sekunden ({})".format(delay, error))
+                self.__sleep(delay)
+                attempt += 1
+
+
+    def read(self, worksheet, cell_range: str) -> list:
+        """ Reads the values of a range of the worksheet. Reads of the same worksheet that are pending at the same
+        time are merged into one batched request
+
+        :param worksheet the worksheet to read
+        :param cell_range the range in A1 notation (e.g. A:B)
+        :return the rows of values within the range
+        """
+        with self.__lock:
+            pending_read = self.__pending_reads.get(id(worksheet))
+            is_leader = pending_read is None or pending_read.closed
+            if is_leader:
+                pending_read = PendingRead(worksheet)
+                self.__pending_reads[id(worksheet)] = pending_read
+            index = len(pending_read.ranges)
+            pending_read.ranges.append(cell_range)
+        if is_leader:
+            try:
+                pending_read.results = self.execute(self.__read_batch, pending_read, worksheet=worksheet.title)
+            except Exception as error:
+                pending_read.error = error
+            finally:
+                pending_read.done.set()
+        else:
+            pending_read.done.wait()
+        if pending_read.error is not None:
+            raise pending_read.error
+        return pending_read.results[index]
+
+
+    def __read_batch(self, pending_read: PendingRead) -> list:
+        """ Sends the merged range reads. No further reads are added, as soon as the request is sent
+
+        :return the rows of values of every range
+        """
+        with self.__lock:
+            if not pending_read.closed:
+                pending_read.closed = True
+                if self.__pending_reads.get(id(pending_read.worksheet)) is pending_read:
+                    del self.__pending_reads[id(pending_read.worksheet)]
+        if len(pending_read.ranges) == 1:
+            return [pending_read.worksheet.get(pending_read.ranges[0])]
+        Metrics.increment("api_merged_reads_total", len(pending_read.ranges) - 1)
+        return pending_read.worksheet.batch_get(pending_read.ranges)
+
+
+    @property
+    def request_count(self) -> int:
+        """ :return the number of sent requests, including the retries """
+        return self.__request_count
+
+
+    @property
+    def retry_count(self) -> int:
+        """ :return the number of retried requests """
+        return self.__retry_count
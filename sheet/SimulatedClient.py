@@ -0,0 +1,127 @@
+import json
+import random
+import threading
+import time
+
+from gspread.exceptions import APIError
+
+from sheet.RecordedClient import RecordedClient
+
+
+class SimulatedResponse(object):
+    """ The http response of a failed request to the google api, as expected by gspread.exceptions.APIError """
+
+    def __init__(self, status_code: int, message: str) -> None:
+        """ Constructor
+
+        :param status_code the http status of the response (e.g. 429)
+        :param message the error message of the response
+        """
+        self.status_code = status_code
+        self.text = json.dumps({"error": {"code": status_code, "message": message, "status": message}})
+
+
+    def json(self) -> dict:
+        """ :return the body of the response """
+        return json.loads(self.text)
+
+
+class SimulatedClient(RecordedClient):
+    """ A stand-in for the gspread client that serves recorded spread sheets (see RecordedClient) like the google api
+    under load: every request is delayed by a latency with jitter, the requests within a window are limited by a
+    quota (e.g. 100 requests per 100 seconds) and failures (429 / 5xx) are injected randomly. Every request is
+    counted, also the rejected and failed ones.
+    """
+    QUOTA_EXCEEDED = int(429)
+    SERVER_ERRORS = (500, 503)
+    DEFAULT_QUOTA_WINDOW = 100.0
+
+
+    def __init__(self, spread_sheets: dict, latency: float = 0.0, jitter: float = 0.0, quota: int = None,
+                 quota_window: float = DEFAULT_QUOTA_WINDOW, error_rate: float = 0.0, seed: int = None,
+                 clock=time.monotonic, sleep=time.sleep) -> None:
+        """ Constructor
+
+        :param spread_sheets the recorded spread sheets (spread sheet name -> worksheet title -> rows)
+        :param latency the latency of every request in seconds
+        :param jitter the maximum random deviation of the latency in seconds (+/-)
+        :param quota optional maximum number of requests within the quota window. Further requests fail with 429
+        :param quota_window the duration of the quota window in seconds
+        :param error_rate the probability of a request to fail with 429 or a server error (500 / 503)
+        :param seed optional seed of the jitter and the injected errors
+        :param clock the clock of the quota window (e.g. replaced in tests)
+        :param sleep the function that waits for the latency (e.g. replaced in tests)
+        """
+        super().__init__(spread_sheets)
+        self.__latency = latency
+        self.__jitter = jitter
+        self.__quota = quota
+        self.__quota_window = quota_window
+        self.__error_rate = error_rate
+        self.__random = random.Random(seed)
+        self.__clock = clock
+        self.__sleep = sleep
+        # the times of the accepted requests within the current quota window
+        self.__request_times = list()
+        self.__rejected_count = 0
+        self.__failed_count = 0
+        self.__simulated_latency = 0.0
+        self.__lock = threading.Lock()
+
+
+    @staticmethod
+    def from_file(recording_file: str, **kwargs):
+        """ Creates the client from a json file with the recorded spread sheets
+
+        :param recording_file the path to the json file (spread sheet name -> worksheet title -> rows)
+        :param kwargs the simulated behaviour (see the constructor)
+        :return the client
+        """
+        with open(recording_file, encoding="utf-8") as file:
+            return SimulatedClient(json.load(file), **kwargs)
+
+
+    def record_request(self, spread_sheet_name: str, worksheet_title: str, operation: str, cell_range: str) -> None:
+        """ Records the request and simulates its latency, the quota and the injected errors. Raises an APIError if
+        the request fails
+        """
+        super().record_request(spread_sheet_name, worksheet_title, operation, cell_range)
+        with self.__lock:
+            latency = max(0.0, self.__latency + self.__random.uniform(-self.__jitter, self.__jitter))
+            self.__simulated_latency += latency
+            failure = None
+            if self.__quota is not None:
+                now = self.__clock()
+                self.__request_times = [request_time for request_time in self.__request_times
+                                        if request_time > now - self.__quota_window]
+                if len(self.__request_times) >= self.__quota:
+                    self.__rejected_count += 1
+                    failure = (SimulatedClient.QUOTA_EXCEEDED, "RESOURCE_EXHAUSTED")
+                else:
+                    self.__request_times.append(now)
+            if failure is None and self.__error_rate > 0 and self.__random.random() < self.__error_rate:
+                self.__failed_count += 1
+                status_code = self.__random.choice((SimulatedClient.QUOTA_EXCEEDED,) + SimulatedClient.SERVER_ERRORS)
+                failure = (status_code, "SIMULATED_ERROR")
+        if latency > 0:
+            self.__sleep(latency)
+        if failure is not None:
+            raise APIError(SimulatedResponse(*failure))
+
+
+    @property
+    def rejected_count(self) -> int:
+        """ :return the number of requests that were rejected by the quota """
+        return self.__rejected_count
+
+
+    @property
+    def failed_count(self) -> int:
+        """ :return the number of requests that failed by an injected error """
+        return self.__failed_count
+
+
+    @property
+    def simulated_latency(self) -> float:
+        """ :return the sum of the latencies of all requests in seconds """
+        return self.__simulated_latency
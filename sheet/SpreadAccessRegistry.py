@@ -0,0 +1,71 @@
+import importlib
+import threading
+
+
+class SpreadAccessRegistry(object):
+    """ The backends of the spread access by name (e.g. google -> GSpreadAccess). The module of a backend is imported
+    when the backend is used the first time, i.e. a run with a story bundle does not load the google libraries
+    """
+    GOOGLE = "google"
+    BUNDLE = "bundle"
+    FILES = "files"
+    # the name of every backend to its (module, class)
+    __backends = {
+        GOOGLE: ("sheet.GSpreadAccess", "GSpreadAccess"),
+        BUNDLE: ("sheet.BundleSpreadAccess", "BundleSpreadAccess"),
+        FILES: ("sheet.FileSpreadAccess", "FileSpreadAccess"),
+    }
+    __lock = threading.Lock()
+
+
+    @staticmethod
+    def register(name: str, module_name: str, class_name: str) -> None:
+        """ Registers a backend. An already registered backend with the same name is replaced
+
+        :param name the name of the backend (e.g. files)
+        :param module_name the module of the backend (e.g. sheet.FileSpreadAccess)
+        :param class_name the class of the backend within the module, an implementation of AbstractSpreadAccess
+        """
+        with SpreadAccessRegistry.__lock:
+            SpreadAccessRegistry.__backends[name] = (module_name, class_name)
+
+
+    @staticmethod
+    def unregister(name: str) -> None:
+        """ Removes the backend with the given name, if it is registered """
+        with SpreadAccessRegistry.__lock:
+            SpreadAccessRegistry.__backends.pop(name, None)
+
+
+    @staticmethod
+    def names() -> list:
+        """ :return the names of all registered backends """
+        with SpreadAccessRegistry.__lock:
+            return sorted(SpreadAccessRegistry.__backends)
+
+
+    @staticmethod
+    def load(name: str):
+        """ Imports the module of the backend, if it is not imported yet
+
+        :param name the name of the backend
+        :return the class of the backend
+        """
+        with SpreadAccessRegistry.__lock:
+            if name not in SpreadAccessRegistry.__backends:
+                raise ValueError("Die Datenquelle '{}' ist unbekannt. Bekannt sind: {}".format(
+                    name, ", ".join(sorted(SpreadAccessRegistry.__backends))))
+            module_name, class_name = SpreadAccessRegistry.__backends[name]
+        return getattr(importlib.import_module(module_name), class_name)
+
+
+    @staticmethod
+    def create(name: str, *args, **kwargs):
+        """ Creates the spread access of the backend
+
+        :param name the name of the backend
+        :param args the arguments of the constructor of the backend
+        :param kwargs the keyword arguments of the constructor of the backend
+        :return the spread access
+        """
+        return SpreadAccessRegistry.load(name)(*args, **kwargs)
@@ -1,12 +1,24 @@
+import array
+import bisect
 import logging
 import random
-from core.RpgCrawler import RpgCrawler
+import sys
+import time
+from core.LoggerId import LOGGER_ID
+from core.Metrics import Metrics
+from generator.TableReference import TableReference
 from sheet import AbstractSpreadAccess
 from sheet.TableRow import TableRowEntry
 
+LOGGER = logging.getLogger(LOGGER_ID)
+
 
 class Table(object):
-    def __init__(self, table_name: str, pre_text: str = "", follow_up_text: str = ""):
+    __slots__ = ("__table_name", "__rows", "__max_chance", "__cumulative_chances", "__pre_text", "__follow_up_text",
+                 "__sheet_name")
+
+
+    def __init__(self, table_name: str, pre_text: str = "", follow_up_text: str = "", sheet_name: str = ""):
         """ Constructor for a table row entry
 
         :param table_name the name of the table. The name will be also used as identifier of the table and represents
@@ -15,13 +27,17 @@ class Table(object):
             table row text
         :param follow_up_text an optional and static text that will be printed after randomly selected and generated
             table row text
+        :param sheet_name optional, the sheet of the table in a different excel file. Empty for the default sheet
         """
         self.__table_name = table_name
         self.__rows = list()
         self.__max_chance = 0
+        # the accumulated chances of the rows (64 bit integers). Built when the table is frozen and used to pick a
+        # row by chance
+        self.__cumulative_chances = None
         self.__pre_text = pre_text
         self.__follow_up_text = follow_up_text
-        self.__logger = logging.getLogger(RpgCrawler.ID)
+        self.__sheet_name = sheet_name
 
 
     def __str__(self) -> str:
@@ -40,36 +56,137 @@ class Table(object):
          """
         if not row:
             return
+        if self.is_frozen:
+            raise AttributeError(
+                "Die Tabelle '{}' ist bereits abgeschlossen. Es können keine Zeilen hinzugefügt werden.".format(
+                    self.__table_name))
         self.__max_chance += row.get_chance
         self.__rows.append(row)
 
 
-    def get_row_by_chance(self) -> TableRowEntry:
-        """ Calculates the chance and iterates through the list of all rows and determines the row by chance
+    def replace_rows(self, rows: list) -> None:
+        """ Replaces all rows of the table (e.g. by an optimized version of the rows) and freezes the table again
 
-        :return the row to process """
+        :param rows the new rows of the table
+        """
+        self.__rows = list()
+        self.__max_chance = 0
+        self.__cumulative_chances = None
+        for row in rows:
+            self.add_table_row(row)
+        self.freeze()
 
-        #  a value between 1 and __max_chance
-        chance = random.randint(1, self.__max_chance + 1)
-        row = None
-        pos = 0
-        self.__logger.debug(
-            "Ermittle in der Tabelle '{}' mit der zufälligen Chance '{}' (von 1 bis {}) eine Zeile.".format(
-                self.table_name, chance, self.__max_chance))
-        while chance > 0 and pos < len(self.__rows):
-            row = self.__rows[pos]
-            chance -= row.get_chance
-            pos += 1
-        self.__logger.debug("--> '{}' ".format(row))
+
+    def freeze(self) -> None:
+        """ Freezes the table after all rows are added. Accumulates the chances of the rows, so that a row can be
+        determined by chance with a binary search instead of iterating all rows.
+        """
+        if self.is_frozen:
+            return
+        cumulative_chances = array.array("q")
+        cumulative_chance = 0
+        for row in self.__rows:
+            cumulative_chance += row.get_chance
+            cumulative_chances.append(cumulative_chance)
+        self.__cumulative_chances = cumulative_chances
+
+
+    def get_row_by_chance(self, rng=None) -> TableRowEntry:
+        """ Calculates the chance and determines the row by chance with a binary search over the accumulated chances
+        of the rows. The table will be frozen, if that did not happen yet.
+
+        :param rng optional random stream (RandomStream) of the iteration. The chance is determined by the stream of
+            this table within the iteration. If not specified, the global random generator will be used
+        :return the row to process """
+        if not self.is_frozen:
+            self.freeze()
+        # a value between 0 and __max_chance - 1. Every row covers the values from the accumulated chance of the
+        # previous rows up to (excluding) its own accumulated chance
+        if rng is not None:
+            chance = rng.for_table(self.__table_name, self.__sheet_name).randrange(self.__max_chance)
+        else:
+            chance = random.randrange(self.__max_chance)
+        row = self.__rows[bisect.bisect_right(self.__cumulative_chances, chance)]
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug(
+                "Ermittle in der Tabelle '{}' mit der zufälligen Chance '{}' (von 1 bis {}) die Zeile '{}'.".format(
+                    self.table_name, chance + 1, self.__max_chance, row))
         return row
 
 
+    def generate(self, rng=None) -> str:
+        """ Determines a row by chance and generates its text. The row and its generators (e.g. the dice) use the
+        stream of this table, i.e. the result of the table does not depend on the other tables of the iteration
+
+        :param rng optional random stream (RandomStream) of the iteration. If not specified, the global random
+            generator will be used
+        :return the generated text of the row
+        """
+        if rng is None:
+            return self.get_row_by_chance().generate()
+        stream = rng.for_table(self.__table_name, self.__sheet_name)
+        return self.get_row_by_chance(stream).generate(stream)
+
+
+    def sample_rows(self, n: int, rng=None):
+        """ Determines n rows by chance in one vectorized operation. The table will be frozen, if that did not happen
+        yet.
+
+        :param n the number of rows to determine
+        :param rng optional numpy random generator (numpy.random.Generator) that is used for the chances
+        :return a numpy array with the positions of the n determined rows within the table rows
+        """
+        import numpy
+        if not self.is_frozen:
+            self.freeze()
+        if rng is None:
+            rng = numpy.random.default_rng()
+        chances = rng.integers(0, self.__max_chance, size=n)
+        # the numpy array shares the memory of the accumulated chances
+        cumulative_array = numpy.frombuffer(self.__cumulative_chances, dtype=numpy.int64)
+        return numpy.searchsorted(cumulative_array, chances, side="right")
+
+
+    def referenced_tables(self) -> list:
+        """ Determines the tables that are referenced by the rows of this table (e.g. [Tabelle: Edelsteine#Sheet1])
+
+        :return a list with the (table name, sheet name) of every reference
+        """
+        references = list()
+        for row in self.__rows:
+            for generator in row.generators:
+                if isinstance(generator, TableReference):
+                    references.append((generator.table_name, generator.sheet_name))
+        return references
+
+
+    def estimate_size(self) -> int:
+        """ :return the estimated number of bytes of the table including all its rows """
+        size = sys.getsizeof(self) + sys.getsizeof(self.__rows) + sys.getsizeof(self.__pre_text) + \
+            sys.getsizeof(self.__follow_up_text) + sys.getsizeof(self.__sheet_name)
+        if self.__cumulative_chances is not None:
+            size += sys.getsizeof(self.__cumulative_chances)
+        return size + sum(row.estimate_size() for row in self.__rows)
+
+
+    @property
+    def is_frozen(self) -> bool:
+        """ :return true, if all rows are added and the chances of the rows are accumulated """
+        return self.__cumulative_chances is not None
+
+
     @property
     def table_name(self) -> str:
         """ :return the name of the table. The name will be also used as identifier """
         return self.__table_name
 
 
+    @property
+    def sheet_name(self) -> str:
+        """ :return the sheet of the table in a different excel file or an empty text for the default sheet """
+        return self.__sheet_name
+
+
     @property
     def pre_text(self) -> str:
         """ :return an optional and static text that will be printed before randomly selected and generated
@@ -108,28 +225,19 @@ class Table(object):
             table row text
         :return the created table with all the rows
         """
+        start = time.perf_counter() if Metrics.enabled else None
         # create the table with all the rows
-        table = Table(table_name, pre_text, follow_up_text)
-        i = 1
-        is_reading = True
-        while is_reading:
-            # it is quicker to access the sheet in a range (compared to the cells) -> but it is still slow...
-            chances = sheet_access.crawl_sheet_column_in_range(table_name, sheet_name,
-                                                               sheet_access.chance_range_column_pattern, i)
-            texts = sheet_access.crawl_sheet_column_in_range(table_name, sheet_name,
-                                                             sheet_access.text_range_column_pattern, i)
-            for j, chance in enumerate(chances):
-                text = texts[j]
-                # found the end in the sheet
-                if not text and not chance:
-                    is_reading = False
-                    break
-                # illegal configuration (either a chance or the text is missing in the configuration)
-                if not chance or not text:
-                    raise AttributeError(
-                        "Die Tabelle '{}' enthält in der Zeile '{}' eine fehlerhafte ".format(table_name, i) +
-                        "Konfiguration (Chance = '{}', Text = '{}'). ".format(table_name, i, chance, text) +
-                        "Beide Spalten (Chance und Text) müssen gefüllt sein!")
-                table.add_table_row(TableRowEntry(sheet_access, int(chance), text))
-            i += sheet_access.read_range + 1
+        table = Table(table_name, pre_text, follow_up_text,
+                      sheet_name if sheet_name != sheet_access.DEFAULT_SHEET_NAME else "")
+        for i, (chance, text) in enumerate(sheet_access.crawl_table_rows(table_name, sheet_name), 1):
+            # illegal configuration (either a chance or the text is missing in the configuration)
+            if not chance or not text:
+                raise AttributeError(
+                    "Die Tabelle '{}' enthält in der Zeile '{}' eine fehlerhafte ".format(table_name, i) +
+                    "Konfiguration (Chance = '{}', Text = '{}'). ".format(chance, text) +
+                    "Beide Spalten (Chance und Text) müssen gefüllt sein!")
+            table.add_table_row(TableRowEntry(sheet_access, int(chance), text))
+        table.freeze()
+        if start is not None:
+            Metrics.observe("table_load_seconds", time.perf_counter() - start, table=table_name)
         return table
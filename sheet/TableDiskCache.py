@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+
+class TableDiskCache(object):
+    """ A persistent cache for the rows of the tables. Every table is stored as json file in the cache directory
+    together with the spread sheet that contains the table and the revision of the spread sheet at the time the table
+    was read. The user of the cache compares the stored revision with the current revision of the spread sheet. In
+    addition, an entry expires after an optional time to live.
+    """
+
+    def __init__(self, directory: str, ttl: float = None) -> None:
+        """ Constructor
+
+        :param directory the directory of the cache. It will be created if it does not exist
+        :param ttl optional time to live of an entry in seconds. If not specified, an entry only expires when the
+            revision of its spread sheet changes
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.__directory = directory
+        self.__ttl = ttl
+
+
+    def __path(self, key: str) -> str:
+        """ :return the path of the file to the given key """
+        return os.path.join(self.__directory, hashlib.sha1(key.lower().encode("utf-8")).hexdigest() + ".json")
+
+
+    def load(self, key: str):
+        """ Loads the entry to the given key
+
+        :param key the key of the table
+        :return the (spread sheet name, revision, rows) of the entry or None if there is no entry or it is expired
+        """
+        try:
+            with open(self.__path(key), encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if entry.get("key", "").lower() != key.lower():
+            return None
+        if self.__ttl is not None and time.time() - entry["stored"] > self.__ttl:
+            return None
+        return entry["spreadsheet"], entry["revision"], [tuple(row) for row in entry["rows"]]
+
+
+    def store(self, key: str, spreadsheet_name: str, revision, rows: list) -> None:
+        """ Stores the rows of a table. The file is replaced atomically, i.e. concurrent readers see either the old
+        or the new entry
+
+        :param key the key of the table
+        :param spreadsheet_name the name of the spread sheet that contains the table
+        :param revision the revision of the spread sheet at the time the table was read
+        :param rows the (chance, text) rows of the table
+        """
+        entry = {"key": key, "spreadsheet": spreadsheet_name, "revision": revision, "stored": time.time(),
+                 "rows": [list(row) for row in rows]}
+        handle, temporary_path = tempfile.mkstemp(dir=self.__directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as file:
+                json.dump(entry, file, ensure_ascii=False)
+            os.replace(temporary_path, self.__path(key))
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+
+    def invalidate(self, key: str) -> None:
+        """ Removes the entry to the given key """
+        try:
+            os.remove(self.__path(key))
+        except FileNotFoundError:
+            pass
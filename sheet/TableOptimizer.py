@@ -0,0 +1,139 @@
+import logging
+import math
+
+from core.LoggerId import LOGGER_ID
+from generator.TableReference import TableReference
+from sheet.AbstractSpreadAccess import AbstractSpreadAccess
+from sheet.TableRow import TableRowEntry
+
+
+class TableOptimizer(object):
+    """ Optimizes the loaded tables of a story after they are loaded. The optimizer walks the table graph from the
+    story tables and
+    - rejects tables that reference each other in a cycle (e.g. A -> B -> A), which would recurse endlessly
+    - pre-renders the rows without generators
+    - flattens rows that only reference a constant table (a table without generators, e.g. [Tabelle: Edelsteine]) into
+      the rows of the referenced table with integer weights, i.e. one draw instead of two with the same probabilities
+    """
+    # the maximum sum of the chances of a flattened table (the chances are accumulated as 64 bit integers and stored
+    # as unsigned 64 bit integers in a story bundle)
+    MAX_TOTAL_CHANCE = int(1 << 62)
+
+
+    def __init__(self, spread_access: AbstractSpreadAccess) -> None:
+        """ Constructor
+
+        :param spread_access the access to the spreads of the story
+        """
+        self.__spread_access = spread_access
+        # the lower case table name to the optimized table
+        self.__optimized = dict()
+        self.__constant_rows = 0
+        self.__flattened_references = 0
+        self.__logger = logging.getLogger(LOGGER_ID)
+
+
+    def optimize(self) -> dict:
+        """ Optimizes all tables that are reachable from the story tables. Raises a ValueError, if tables reference
+        each other in a cycle
+
+        :return the number of optimized tables, pre-rendered constant rows and flattened references
+        """
+        for table_name in self.__spread_access.story_table_names():
+            self.__optimize(self.__spread_access.get_table(table_name), list())
+        return {"tables": len(self.__optimized), "constant_rows": self.__constant_rows,
+                "flattened_references": self.__flattened_references}
+
+
+    def __optimize(self, table, path: list) -> None:
+        """ Optimizes the referenced tables first and the table afterwards
+
+        :param table the table to optimize
+        :param path the names of the tables that reference this table (the current chain of references)
+        """
+        key = table.table_name.lower()
+        if key in self.__optimized:
+            return
+        if key in [name.lower() for name in path]:
+            chain = path[[name.lower() for name in path].index(key):] + [table.table_name]
+            raise ValueError("Die Tabellen referenzieren sich im Kreis: {}".format(" -> ".join(chain)))
+        path.append(table.table_name)
+        for row in table.table_rows:
+            for generator in row.generators:
+                if isinstance(generator, TableReference):
+                    self.__optimize(generator.referenced_table(), path)
+        path.pop()
+        self.__flatten(table)
+        for row in table.table_rows:
+            row.prepare()
+            if row.is_constant:
+                self.__constant_rows += 1
+        # e.g. the cached size of the table
+        self.__spread_access.table_changed(table.table_name)
+        self.__optimized[key] = table
+
+
+    @staticmethod
+    def __flattened_reference(row: TableRowEntry):
+        """ :return the referenced table, if the row only references a constant table. None otherwise """
+        template = row.compile_template()
+        if len(template) != 3 or template[0] or template[2] or not isinstance(template[1], TableReference):
+            return None
+        referenced_table = template[1].referenced_table()
+        if sum(referenced_row.get_chance for referenced_row in referenced_table.table_rows) <= 0:
+            return None
+        if all(referenced_row.is_constant for referenced_row in referenced_table.table_rows):
+            return referenced_table
+        return None
+
+
+    def __flatten(self, table) -> None:
+        """ Replaces every row that only references a constant table by the rows of the referenced table. The chances
+        of all rows are multiplied, so that every flattened row keeps its exact probability
+
+        :param table the table to flatten
+        """
+        references = [TableOptimizer.__flattened_reference(row) for row in table.table_rows]
+        if not any(references):
+            return
+        # the least common multiple of the sums of the chances of the referenced tables
+        multiple = 1
+        for referenced_table in references:
+            if referenced_table is not None:
+                total = sum(row.get_chance for row in referenced_table.table_rows)
+                multiple = multiple * total // math.gcd(multiple, total)
+        # the chance of every text of the flattened rows, in the order of the rows. The chance of a constant text
+        # that occurs multiple times is summed up
+        chances = list()
+        positions = dict()
+        for row, referenced_table in zip(table.table_rows, references):
+            if referenced_table is None:
+                if row.is_constant and row.get_text in positions:
+                    chances[positions[row.get_text]][1] += row.get_chance * multiple
+                    continue
+                if row.is_constant:
+                    positions[row.get_text] = len(chances)
+                chances.append([row, row.get_chance * multiple])
+                continue
+            factor = row.get_chance * multiple // sum(
+                referenced_row.get_chance for referenced_row in referenced_table.table_rows)
+            for referenced_row in referenced_table.table_rows:
+                if referenced_row.get_text in positions:
+                    chances[positions[referenced_row.get_text]][1] += referenced_row.get_chance * factor
+                else:
+                    positions[referenced_row.get_text] = len(chances)
+                    chances.append([referenced_row, referenced_row.get_chance * factor])
+        divisor = 0
+        for _row, chance in chances:
+            divisor = math.gcd(divisor, chance)
+        if divisor == 0:
+            return
+        if sum(chance for _row, chance in chances) // divisor > TableOptimizer.MAX_TOTAL_CHANCE:
+            self.__logger.debug("Die Tabelle '{}' wird nicht zusammengefasst, die Chancen sind zu groß".format(
+                table.table_name))
+            return
+        # the generators refer to the text of the row, i.e. they are shared by the flattened row
+        table.replace_rows([TableRowEntry(self.__spread_access, chance // divisor, row.get_text, list(row.generators))
+                            for row, chance in chances])
+        self.__flattened_references += len([reference for reference in references if reference is not None])
+        self.__logger.debug("Die Tabelle '{}' wurde zusammengefasst".format(table.table_name))
@@ -1,21 +1,39 @@
+import logging
 import re
+import sys
 
+from core.LoggerId import LOGGER_ID
+from core.Tracer import Tracer
 from generator.DiceThrow import DiceThrow
 from generator.TableReference import TableReference
 from sheet import AbstractSpreadAccess
 
+LOGGER = logging.getLogger(LOGGER_ID)
+
 
 class TableRowEntry(object):
-    def __init__(self, spread_access: AbstractSpreadAccess, chance: int, text: str):
+    GENERATOR_PATTERN = re.compile("(?<=\\[)[^\\]]*")
+    DICE_THROW_PATTERN = re.compile(DiceThrow.PATTERN, re.IGNORECASE)
+    TABLE_REFERENCE_PATTERN = re.compile(TableReference.PATTERN, re.IGNORECASE)
+    # a table can contain many thousand rows, i.e. the rows are kept without an instance dictionary
+    __slots__ = ("__spread_access", "__chance", "__text", "__generators", "__template")
+
+
+    def __init__(self, spread_access: AbstractSpreadAccess, chance: int, text: str, generators: list = None):
         """ Constructor for a table row entry
 
         :param spread_access the access to the spreads
         :param chance -- a number that represents the probability of all entries within this table to get picked
-        :param text -- the text of this row
+        :param text -- the text of this row. The text is interned, i.e. rows with the same text share the text
+        :param generators -- optional, already analyzed generators of the text (e.g. from a story bundle). If not
+            specified, the text will be analyzed when the row is generated the first time
         """
+        self.__spread_access = spread_access
         self.__chance = chance
-        self.__text = text
-        self.__generators = TableRowEntry.analyze_generators(spread_access, text)
+        self.__text = sys.intern(text) if text else text
+        self.__generators = generators
+        # the compiled text: static texts at the even and generators at the odd positions. Compiled lazily
+        self.__template = None
 
 
     @staticmethod
@@ -32,20 +50,23 @@ class TableRowEntry(object):
         """
         if not text:
             return list()
-        generator_pattern = re.compile("(?<=\[)[^\]]*")
-
         result = list()
-        for matcher in generator_pattern.finditer(text):
+        for matcher in TableRowEntry.GENERATOR_PATTERN.finditer(text):
             generator_match = matcher.group()
 
             start_index = matcher.start() - 1
             end_index = matcher.end()
 
             # matches the dice throw pattern
-            if re.match(DiceThrow.PATTERN, generator_match, re.IGNORECASE):
-                # -1 to include the [ of the string
-                result.append(DiceThrow(start_index, end_index, generator_match))
-            elif re.match(TableReference.PATTERN, generator_match, re.IGNORECASE):
+            if TableRowEntry.DICE_THROW_PATTERN.match(generator_match):
+                # the pattern only checks the characters, e.g. [1W6-] or [1W0] are no valid dice expressions and
+                # stay plain text
+                try:
+                    # -1 to include the [ of the string
+                    result.append(DiceThrow(start_index, end_index, generator_match))
+                except ValueError as e:
+                    LOGGER.debug("Der Text [{}] wird nicht gewürfelt: {}".format(generator_match, e))
+            elif TableRowEntry.TABLE_REFERENCE_PATTERN.match(generator_match):
                 result.append(TableReference(spread_access, start_index, end_index, generator_match))
         return result
 
@@ -60,19 +81,76 @@ class TableRowEntry(object):
         return self.__str__()
 
 
-    def generate(self) -> str:
+    def compile_template(self) -> list:
+        """ Compiles the text of the row into a template. The template contains the static texts at the even positions
+        and the generators at the odd positions, e.g. "Du findest [2W6] Gold" -> ["Du findest ", DiceThrow, " Gold"]
+
+        :return the template of the row
+        """
+        template = list()
+        position = 0
+        for generator in self.generators:
+            template.append(self.__text[position:generator.get_start_index])
+            template.append(generator)
+            # +1 to skip the ] of the generator
+            position = generator.get_end_index + 1
+        template.append(self.__text[position:])
+        return template
+
+
+    def prepare(self) -> None:
+        """ Compiles the template of the row ahead of the first generation, e.g. after the table was loaded """
+        if self.__template is None:
+            self.__template = self.compile_template()
+
+
+    def generate(self, rng=None) -> str:
         """ This method generates the text of teh current table row. In case generators (e.g. dice generator)
         are defines the text will be changed accordingly to the generated value.
 
+        :param rng optional random stream (RandomStream) of the iteration. If not specified, the global random
+            generator will be used
         :return the generated value
         """
-        offset = 0
-        result = self.__text
-        for generator in self.__generators:
-            tmp = generator.process()
-            result = result[0:generator.get_start_index + offset] + tmp + result[generator.get_end_index + offset + 1:]
-            offset += generator.replace_offset_of(tmp)
-        return result
+        template = self.__template
+        if template is None:
+            template = self.__template = self.compile_template()
+        if Tracer.enabled:
+            return self.__generate_traced(template, rng)
+        # a row without generators
+        if len(template) == 1:
+            return self.__text
+        parts = list(template)
+        for i in range(1, len(parts), 2):
+            parts[i] = parts[i].process(rng)
+        return "".join(parts)
+
+
+    def __generate_traced(self, template: list, rng=None) -> str:
+        """ Generates the text like generate, but traces the row and every generator as span (see Tracer)
+
+        :param template the compiled template of the row
+        :param rng optional random stream (RandomStream) of the iteration
+        :return the generated value
+        """
+        with Tracer.span(self.__text):
+            parts = list(template)
+            for i in range(1, len(parts), 2):
+                with Tracer.span("[{}]".format(parts[i].get_text)):
+                    parts[i] = parts[i].process(rng)
+            return "".join(parts)
+
+
+    def estimate_size(self) -> int:
+        """ :return the estimated number of bytes of the row, its text and its generators (if already analyzed). The
+            interned text is counted for every row, i.e. the estimation is an upper bound """
+        size = sys.getsizeof(self) + sys.getsizeof(self.__text)
+        if self.__generators is not None:
+            size += sys.getsizeof(self.__generators) + sum(sys.getsizeof(generator) + sys.getsizeof(
+                generator.get_text) for generator in self.__generators)
+        if self.__template is not None:
+            size += sys.getsizeof(self.__template)
+        return size
 
 
     @property
@@ -85,3 +163,18 @@ class TableRowEntry(object):
     def get_text(self) -> str:
         """ :return the text of this row """
         return self.__text
+
+
+    @property
+    def is_constant(self) -> bool:
+        """ :return true, if the row has no generators, i.e. the generated text is always the text of the row """
+        return not self.generators
+
+
+    @property
+    def generators(self) -> list:
+        """ :return the generators of this row in the order they occur in the text. The text will be analyzed on the
+            first access """
+        if self.__generators is None:
+            self.__generators = TableRowEntry.analyze_generators(self.__spread_access, self.__text)
+        return self.__generators
@@ -0,0 +1,43 @@
+from core.CaseInsensitiveDict import CaseInsensitiveDict
+from sheet.AbstractSpreadAccess import AbstractSpreadAccess
+from sheet.Table import Table
+
+
+class DictSpreadAccess(AbstractSpreadAccess):
+    """ A spread access that serves the tables from a dictionary (table name -> list of (chance, text)) """
+
+    def __init__(self, context: str, story_tables: list, tables: dict) -> None:
+        self.__context = context
+        self.__story_tables = story_tables
+        self.__tables = CaseInsensitiveDict(tables)
+        self.__table_cache = CaseInsensitiveDict()
+        self.loaded = list()
+
+    def crawl_main_sheet(self) -> list:
+        return list(self.__story_tables)
+
+    def crawl_sheet_column_in_range(self, table_name: str, sheet_name: str, column_pattern: str, row_pos: int) -> list:
+        rows = self.__tables[table_name]
+        column = 0 if column_pattern == self.chance_range_column_pattern else 1
+        return [str(rows[i][column]) if i < len(rows) else "" for i in range(row_pos - 1, row_pos + self.read_range)]
+
+    def get_table(self, table_name: str, sheet_name: str = "Sheet1"):
+        if table_name not in self.__table_cache:
+            self.loaded.append(table_name)
+            self.__table_cache[table_name] = Table.from_sheet(self, table_name, sheet_name, "vor " + table_name)
+        return self.__table_cache[table_name]
+
+    def story_context(self) -> str:
+        return self.__context
+
+    @property
+    def read_range(self) -> int:
+        return 3
+
+    @property
+    def chance_range_column_pattern(self) -> str:
+        return "A{}:A{}"
+
+    @property
+    def text_range_column_pattern(self) -> str:
+        return "B{}:B{}"
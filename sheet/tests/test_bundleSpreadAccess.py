@@ -0,0 +1,68 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from generator.DiceThrow import DiceThrow
+from generator.TableReference import TableReference
+from sheet.BundleSpreadAccess import BundleSpreadAccess
+from sheet.tests.DictSpreadAccess import DictSpreadAccess
+
+
+class TestBundleSpreadAccess(TestCase):
+    def setUp(self):
+        self.source = DictSpreadAccess("Drachenhort", ["Münzen", "Edelsteine"], {
+            "Münzen": [(3, "[2W6] Gold"), (1, "[1W4] Silber und [Tabelle: Edelsteine]")],
+            "Edelsteine": [(1, "Rubin"), (2, "[Tabelle: Fluch#Flüche] Opal")],
+            "Fluch": [(1, "verflucht")],
+            "Unbenutzt": [(1, "nie erreicht")],
+        })
+        handle, self.bundle_file = tempfile.mkstemp(suffix=".rpgb")
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.bundle_file)
+
+    def test_export_contains_reachable_tables(self):
+        self.assertEqual(3, BundleSpreadAccess.export(self.source, self.bundle_file))
+        self.assertNotIn("Unbenutzt", self.source.loaded)
+
+    def test_serves_story_from_bundle(self):
+        BundleSpreadAccess.export(self.source, self.bundle_file)
+        bundle = BundleSpreadAccess(self.bundle_file)
+        try:
+            self.assertEqual("Drachenhort", bundle.story_context())
+            self.assertEqual(["Münzen", "Edelsteine"], bundle.crawl_main_sheet())
+            coins = bundle.get_table("münzen")
+            self.assertEqual("Münzen", coins.table_name)
+            self.assertEqual("vor Münzen", coins.pre_text)
+            self.assertEqual([3, 1], [row.get_chance for row in coins.table_rows])
+            self.assertEqual("[1W4] Silber und [Tabelle: Edelsteine]", coins.table_rows[1].get_text)
+            generators = coins.table_rows[1].generators
+            self.assertIsInstance(generators[0], DiceThrow)
+            self.assertIsInstance(generators[1], TableReference)
+            self.assertEqual((17, 37), (generators[1].get_start_index, generators[1].get_end_index))
+            gems = bundle.get_table("Edelsteine")
+            self.assertEqual("Fluch", gems.table_rows[1].generators[0].table_name)
+            self.assertEqual("Flüche", gems.table_rows[1].generators[0].sheet_name)
+            self.assertEqual("verflucht Opal", gems.table_rows[1].generate())
+            self.assertEqual(("", "Flüche"), (coins.sheet_name, bundle.get_table("Fluch").sheet_name))
+        finally:
+            bundle.close()
+
+    def test_crawl_sheet_column_in_range(self):
+        BundleSpreadAccess.export(self.source, self.bundle_file)
+        bundle = BundleSpreadAccess(self.bundle_file)
+        try:
+            self.assertEqual(["3", "1", ""] + [""] * 8, bundle.crawl_sheet_column_in_range(
+                "Münzen", "Sheet1", bundle.chance_range_column_pattern, 1))
+        finally:
+            bundle.close()
+
+    def test_unknown_table(self):
+        BundleSpreadAccess.export(self.source, self.bundle_file)
+        bundle = BundleSpreadAccess(self.bundle_file)
+        try:
+            with self.assertRaises(ValueError):
+                bundle.get_table("Unbenutzt")
+        finally:
+            bundle.close()
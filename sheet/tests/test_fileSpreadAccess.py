@@ -0,0 +1,156 @@
+import os
+import tempfile
+import zipfile
+from unittest import TestCase
+from xml.sax.saxutils import escape
+
+from core.RpgCrawler import RpgCrawler
+from sheet.FileSpreadAccess import FileSpreadAccess
+from sheet.tests.test_gSpreadAccess import CollectingIO
+
+STORY_ROWS = [["Drachenhort"], [], [], ["Tabelle", "Vortext", "Nachtext"], ["Münzen", "Im Beutel:", "Ende"],
+              ["Edelsteine"]]
+
+
+def write_xlsx(path: str, sheets: list) -> None:
+    """ Writes a minimal Excel workbook. Numbers are written as numeric cells, texts as shared or inline strings """
+    shared_strings = list()
+    with zipfile.ZipFile(path, "w") as archive:
+        relationships = list()
+        workbook_sheets = list()
+        for i, (sheet_name, rows) in enumerate(sheets, 1):
+            relationships.append("<Relationship Id=\"rId{0}\" Type=\"worksheet\" Target=\"worksheets/sheet{0}.xml\"/>"
+                                 .format(i))
+            workbook_sheets.append("<sheet name=\"{}\" sheetId=\"{}\" r:id=\"rId{}\"/>".format(
+                escape(sheet_name), i, i))
+            xml_rows = list()
+            for row_number, row in enumerate(rows, 1):
+                cells = list()
+                for column, value in enumerate(row):
+                    reference = "{}{}".format(chr(ord("A") + column), row_number)
+                    if not value:
+                        continue
+                    if value.isdigit():
+                        cells.append("<c r=\"{}\"><v>{}.0</v></c>".format(reference, value))
+                    elif column == 0:
+                        cells.append("<c r=\"{}\" t=\"inlineStr\"><is><t>{}</t></is></c>".format(
+                            reference, escape(value)))
+                    else:
+                        shared_strings.append(value)
+                        cells.append("<c r=\"{}\" t=\"s\"><v>{}</v></c>".format(reference, len(shared_strings) - 1))
+                if cells:
+                    xml_rows.append("<row r=\"{}\">{}</row>".format(row_number, "".join(cells)))
+            archive.writestr("xl/worksheets/sheet{}.xml".format(i),
+                             "<worksheet xmlns=\"http://schemas.openxmlformats.org/spreadsheetml/2006/main\">"
+                             "<sheetData>{}</sheetData></worksheet>".format("".join(xml_rows)))
+        archive.writestr("xl/_rels/workbook.xml.rels",
+                         "<Relationships xmlns=\"http://schemas.openxmlformats.org/package/2006/relationships\">"
+                         "{}</Relationships>".format("".join(relationships)))
+        archive.writestr("xl/workbook.xml",
+                         "<workbook xmlns=\"http://schemas.openxmlformats.org/spreadsheetml/2006/main\" "
+                         "xmlns:r=\"http://schemas.openxmlformats.org/officeDocument/2006/relationships\">"
+                         "<sheets>{}</sheets></workbook>".format("".join(workbook_sheets)))
+        archive.writestr("xl/sharedStrings.xml",
+                         "<sst xmlns=\"http://schemas.openxmlformats.org/spreadsheetml/2006/main\">{}</sst>".format(
+                             "".join("<si><r><t>{}</t></r></si>".format(escape(text)) for text in shared_strings)))
+
+
+def write_ods(path: str, sheets: list) -> None:
+    """ Writes a minimal OpenDocument spreadsheet. Empty rows and cells are repeated like in LibreOffice """
+    tables = list()
+    for sheet_name, rows in sheets:
+        xml_rows = list()
+        for row in rows:
+            if not row:
+                xml_rows.append("<table:table-row table:number-rows-repeated=\"1\"><table:table-cell "
+                                "table:number-columns-repeated=\"1024\"/></table:table-row>")
+                continue
+            cells = list()
+            for value in row:
+                if value.isdigit():
+                    cells.append("<table:table-cell office:value-type=\"float\" office:value=\"{0}\">"
+                                 "<text:p>{0}</text:p></table:table-cell>".format(value))
+                elif value:
+                    first, _space, rest = value.partition(" ")
+                    cells.append("<table:table-cell office:value-type=\"string\"><text:p>{}{}</text:p>"
+                                 "</table:table-cell>".format(
+                                     escape(first), "<text:s/>" + escape(rest) if _space else ""))
+                else:
+                    cells.append("<table:table-cell/>")
+            xml_rows.append("<table:table-row>{}<table:table-cell table:number-columns-repeated=\"1020\"/>"
+                            "</table:table-row>".format("".join(cells)))
+        xml_rows.append("<table:table-row table:number-rows-repeated=\"1048000\"><table:table-cell/></table:table-row>")
+        tables.append("<table:table table:name=\"{}\">{}</table:table>".format(escape(sheet_name), "".join(xml_rows)))
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("content.xml",
+                         "<office:document-content xmlns:office=\"urn:oasis:names:tc:opendocument:xmlns:office:1.0\" "
+                         "xmlns:table=\"urn:oasis:names:tc:opendocument:xmlns:table:1.0\" "
+                         "xmlns:text=\"urn:oasis:names:tc:opendocument:xmlns:text:1.0\"><office:body>"
+                         "<office:spreadsheet>{}</office:spreadsheet></office:body></office:document-content>".format(
+                             "".join(tables)))
+
+
+class TestFileSpreadAccess(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def crawl(self, access: FileSpreadAccess) -> list:
+        io = CollectingIO()
+        RpgCrawler(access, io, seed=1).crawl()
+        return io.lines
+
+    def test_xlsx_with_tabs_and_separate_workbooks(self):
+        write_xlsx(self.path("Kern.xlsx"), [
+            ("Story", STORY_ROWS),
+            ("Münzen", [["3", "[2W6] Gold & Silber"], ["1", "nichts"], [], ["9", "nach der Leerzeile"]]),
+        ])
+        write_xlsx(self.path("Edelsteine.xlsx"), [("Tabelle1", [["1", "Opal [Tabelle: Flüche#Alt]"]])])
+        write_ods(self.path("Flüche.ods"), [("Neu", [["1", "von Kobolden"]]), ("Alt", [["1", "von alten Drachen"]])])
+        access = FileSpreadAccess(self.directory.name, "Kern")
+        self.assertEqual("Drachenhort", access.story_context())
+        self.assertEqual(["Münzen", "Edelsteine"], access.story_table_names())
+        coins = access.get_table("Münzen")
+        self.assertEqual([(3, "[2W6] Gold & Silber"), (1, "nichts")],
+                         [(row.get_chance, row.get_text) for row in coins.table_rows])
+        self.assertEqual(("Im Beutel:", "Ende"), (coins.pre_text, coins.follow_up_text))
+        self.assertEqual(["3", "1", "", "9"] + [""] * 7, access.crawl_sheet_column_in_range(
+            "Münzen", "Sheet1", access.chance_range_column_pattern, 1))
+        self.assertEqual(3, len(access.prefetch()))
+        self.assertEqual("Opal von alten Drachen", access.get_table("Edelsteine").table_rows[0].generate())
+        with self.assertRaises(ValueError):
+            access.get_table("Unbekannt")
+
+    def test_ods_core_workbook(self):
+        write_ods(self.path("Kern.ods"), [
+            ("Story", STORY_ROWS),
+            ("Münzen", [["2", "[1W4] Kupfer"]]),
+            ("Edelsteine", [["1", "Rubin"], [], ["1", "Smaragd"]]),
+        ])
+        access = FileSpreadAccess(self.directory.name, "Kern")
+        lines = self.crawl(access)
+        self.assertEqual(["Drachenhort", "Rubin"], [lines[0], lines[2]])
+        self.assertRegex(lines[1], "^[1-4] Kupfer$")
+        self.assertEqual(["Rubin"], [row.get_text for row in access.get_table("Edelsteine").table_rows])
+
+    def test_csv_workbooks(self):
+        os.mkdir(self.path("Kern"))
+        with open(self.path("Kern/Sheet1.csv"), "w", encoding="utf-8") as file:
+            file.write("\n".join(",".join(row) for row in STORY_ROWS))
+        with open(self.path("Kern/Münzen.csv"), "w", encoding="utf-8") as file:
+            file.write("1,\"[1W6] Gold, glänzend\"\n")
+        with open(self.path("Edelsteine.csv"), "w", encoding="utf-8-sig") as file:
+            file.write("1,Opal\n")
+        access = FileSpreadAccess(self.directory.name, "Kern")
+        self.assertEqual(["Münzen", "Edelsteine"], access.crawl_main_sheet())
+        self.assertEqual("[1W6] Gold, glänzend", access.get_table("Münzen").table_rows[0].get_text)
+        self.assertEqual("Opal", access.get_table("Edelsteine").table_rows[0].get_text)
+
+    def test_missing_core_workbook(self):
+        with self.assertRaises(ValueError):
+            FileSpreadAccess(self.directory.name, "Kern")
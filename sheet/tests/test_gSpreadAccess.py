@@ -0,0 +1,186 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from core.RpgCrawler import RpgCrawler
+from interaction.AbstractIO import AbstractIO
+from sheet.GSpreadAccess import GSpreadAccess
+from sheet.LruCache import LruCache
+from sheet.RecordedClient import RecordedClient, RecordedSpreadsheet
+from sheet.Table import Table
+from sheet.TableDiskCache import TableDiskCache
+from sheet.TableOptimizer import TableOptimizer
+
+
+def create_client(coin_rows: int = 500) -> RecordedClient:
+    """ :return a client with a core sheet (story of two tables) and a separate excel file for the gems """
+    return RecordedClient({
+        "Kern": {
+            "Story": [["Drachenhort"], [], [], ["Tabelle", "Vortext", "Nachtext"],
+                      ["Münzen", "Im Beutel:", "Ende"], ["Edelsteine"]],
+            "Münzen": [[str(i % 3 + 1), "[{}W6] Gold".format(i % 5 + 1)] for i in range(coin_rows)],
+            "Fluch": [["1", "verflucht [Tabelle: Flüche#Alt]"], ["3", "gesegnet"]],
+        },
+        "Edelsteine": {
+            "Sheet1": [["1", "Rubin"], ["2", "Opal [Tabelle: Fluch]"], [], ["9", "nach der Leerzeile"]],
+        },
+        "Flüche": {
+            "Neu": [["1", "von Kobolden"]],
+            "Alt": [["1", "von Drachen"]],
+        },
+    })
+
+
+class CollectingIO(AbstractIO):
+    """ Collects the story contexts and the generated rows of the story tables """
+
+    def __init__(self) -> None:
+        self.lines = list()
+
+    def print_story_context(self, context: str) -> None:
+        self.lines.append(context)
+
+    def print_story_line(self, table, rng=None) -> None:
+        self.lines.append(table.generate(rng))
+
+    def iterations(self) -> int:
+        return 0
+
+
+class TestGSpreadAccess(TestCase):
+    def test_table_is_loaded_with_one_data_request(self):
+        client = create_client()
+        access = GSpreadAccess("Kern", None, client=client)
+        client.reset()
+        table = access.get_table("Münzen")
+        self.assertEqual(500, len(table.table_rows))
+        self.assertEqual("[1W6] Gold", table.table_rows[0].get_text)
+        self.assertEqual(499 % 3 + 1, table.table_rows[499].get_chance)
+        data_requests = [request for request in client.requests if request[1] == "Münzen"]
+        self.assertEqual([("Kern", "Münzen", "worksheet", ""), ("Kern", "Münzen", "get", "A:B")], data_requests)
+
+    def test_table_of_separate_excel_file_ends_at_first_empty_row(self):
+        client = create_client()
+        access = GSpreadAccess("Kern", None, client=client)
+        table = access.get_table("Edelsteine")
+        self.assertEqual(["Rubin", "Opal [Tabelle: Fluch]"], [row.get_text for row in table.table_rows])
+        self.assertEqual(3, len([request for request in client.requests if request[0] == "Edelsteine"]))
+
+    def test_cached_table_is_not_loaded_again(self):
+        client = create_client()
+        access = GSpreadAccess("Kern", None, client=client)
+        access.get_table("Münzen")
+        client.reset()
+        access.get_table("münzen")
+        self.assertEqual(0, client.request_count)
+
+    def test_unknown_table(self):
+        access = GSpreadAccess("Kern", None, client=create_client())
+        with self.assertRaises(ValueError):
+            access.get_table("Unbekannt")
+
+    def test_empty_tables(self):
+        client = create_client(coin_rows=0)
+        client.update_worksheet("Flüche", "Alt", [])
+        access = GSpreadAccess("Kern", None, client=client)
+        with self.assertRaisesRegex(ValueError, "Storytabelle 'Münzen'"):
+            access.get_table("Münzen")
+        with self.assertRaisesRegex(ValueError, "Tabelle 'Flüche' zu dem Sheet 'Alt'"):
+            access.get_table("Flüche", "Alt")
+
+    def test_story_definition_is_read_with_one_request(self):
+        client = create_client()
+        access = GSpreadAccess("Kern", None, client=client)
+        client.reset()
+        self.assertEqual(["Münzen", "Edelsteine"], access.crawl_main_sheet())
+        self.assertEqual("Drachenhort", access.story_context())
+        self.assertEqual(("Im Beutel:", "Ende"), (access.get_table("Münzen").pre_text,
+                                                  access.get_table("Münzen").follow_up_text))
+        self.assertEqual(("", ""), (access.get_table("Edelsteine").pre_text,
+                                    access.get_table("Edelsteine").follow_up_text))
+        story_requests = [request for request in client.requests if request[1] == "Story"]
+        self.assertEqual([("Kern", "Story", "get", "A:C")], story_requests)
+
+    def test_crawl_iterations_after_the_first_do_not_access_the_main_sheet(self):
+        client = create_client()
+        io = CollectingIO()
+        crawler = RpgCrawler(GSpreadAccess("Kern", None, client=client), io)
+        crawler.crawl()
+        client.reset()
+        for _i in range(1000):
+            crawler.crawl()
+        self.assertEqual([], [request for request in client.requests
+                              if request[0] == "Kern" and request[1] in ("Story", "")])
+        self.assertEqual(3 * 1001, len(io.lines))
+
+    def test_prefetch_loads_all_referenced_tables(self):
+        client = create_client()
+        access = GSpreadAccess("Kern", None, client=client)
+        tables = access.prefetch(max_workers=3)
+        self.assertEqual(["Münzen", "Edelsteine", "Fluch", "Flüche"], [table.table_name for table, _sheet in tables])
+        self.assertEqual("Alt", tables[3][1])
+        self.assertEqual("von Drachen", access.get_table("Flüche").table_rows[0].get_text)
+        self.assertEqual(("", "Alt"), (access.get_table("Münzen").sheet_name, access.get_table("Flüche").sheet_name))
+        client.reset()
+        crawler = RpgCrawler(access, CollectingIO())
+        for _i in range(100):
+            crawler.crawl()
+        self.assertEqual(0, client.request_count)
+
+    def test_disk_cache_only_reads_changed_spread_sheets(self):
+        with tempfile.TemporaryDirectory() as directory:
+            GSpreadAccess("Kern", None, client=create_client(), disk_cache=TableDiskCache(directory)).prefetch()
+
+            client = create_client()
+            access = GSpreadAccess("Kern", None, client=client, disk_cache=TableDiskCache(directory))
+            client.update_worksheet("Flüche", "Alt", [["1", "von Riesen"]])
+            client.reset()
+            access.prefetch()
+            self.assertEqual("von Riesen", access.get_table("Flüche").table_rows[0].get_text)
+            self.assertEqual("[1W6] Gold", access.get_table("Münzen").table_rows[0].get_text)
+            # only the story definition, the revision of the separate excel files and the changed table are read
+            data_requests = [request for request in client.requests if request[2] in ("get", "range")]
+            self.assertEqual([("Kern", "Story", "get", "A:C"), ("Flüche", "Alt", "get", "A:B")], data_requests)
+
+    def test_disk_cache_is_not_used_without_revision(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                patch.object(RecordedSpreadsheet, "get_lastUpdateTime", return_value=None):
+            GSpreadAccess("Kern", None, client=create_client(), disk_cache=TableDiskCache(directory)).prefetch()
+            self.assertEqual([], os.listdir(directory))
+            # an unknown revision is never equal to another unknown revision
+            GSpreadAccess("Kern", None, client=create_client(), disk_cache=TableDiskCache(directory)).prefetch()
+            client = create_client()
+            access = GSpreadAccess("Kern", None, client=client, disk_cache=TableDiskCache(directory))
+            client.update_worksheet("Flüche", "Alt", [["1", "von Riesen"]])
+            access.prefetch()
+            self.assertEqual("von Riesen", access.get_table("Flüche").table_rows[0].get_text)
+            self.assertIn(("Kern", "Münzen", "get", "A:B"), client.requests)
+
+    def test_disk_cache_entries_expire(self):
+        with tempfile.TemporaryDirectory() as directory:
+            GSpreadAccess("Kern", None, client=create_client(), disk_cache=TableDiskCache(directory)).prefetch()
+            client = create_client()
+            access = GSpreadAccess("Kern", None, client=client, disk_cache=TableDiskCache(directory, ttl=-1))
+            client.reset()
+            access.get_table("Münzen")
+            self.assertIn(("Kern", "Münzen", "get", "A:B"), client.requests)
+
+    def test_evicted_table_is_loaded_again_but_story_tables_are_kept(self):
+        client = create_client()
+        access = GSpreadAccess("Kern", None, client=client, table_cache=LruCache(max_entries=2))
+        access.prefetch()
+        self.assertEqual(["Münzen", "Edelsteine"], sorted(access.table_access.keys(), reverse=True))
+        client.reset()
+        self.assertEqual("verflucht [Tabelle: Flüche#Alt]", access.get_table("Fluch").table_rows[0].get_text)
+        self.assertIn(("Kern", "Fluch", "get", "A:B"), client.requests)
+        statistics = access.cache_statistics()["tables"]
+        self.assertEqual(2, statistics["entries"])
+        self.assertEqual(3, statistics["evictions"])
+
+    def test_cached_size_of_prepared_and_optimized_tables(self):
+        table_cache = LruCache(size_of=Table.estimate_size)
+        access = GSpreadAccess("Kern", None, client=create_client(coin_rows=5), table_cache=table_cache)
+        access.prefetch()
+        TableOptimizer(access).optimize()
+        self.assertEqual(sum(table.estimate_size() for table in table_cache.values()), table_cache.size_in_bytes)
@@ -0,0 +1,63 @@
+from unittest import TestCase
+
+from sheet.LruCache import LruCache
+
+
+class TestLruCache(TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LruCache(max_entries=2)
+        cache["Münzen"] = 1
+        cache["Edelsteine"] = 2
+        self.assertEqual(1, cache.get("münzen"))
+        cache["Flüche"] = 3
+        self.assertNotIn("Edelsteine", cache)
+        self.assertEqual(["Münzen", "Flüche"], cache.keys())
+        self.assertEqual(1, cache.evictions)
+
+    def test_byte_budget(self):
+        cache = LruCache(max_bytes=10, size_of=len)
+        cache["a"] = "xxxx"
+        cache["b"] = "yyyy"
+        cache["c"] = "zzzz"
+        self.assertEqual(["b", "c"], cache.keys())
+        self.assertEqual(8, cache.size_in_bytes)
+        cache["b"] = "y"
+        self.assertEqual(5, cache.size_in_bytes)
+
+    def test_resized_entry(self):
+        cache = LruCache(max_bytes=10, size_of=len)
+        cache["a"] = ["x"] * 4
+        cache["b"] = ["y"] * 4
+        cache["a"].extend(["x"] * 2)
+        cache.resize("A")
+        self.assertEqual(10, cache.size_in_bytes)
+        cache["b"].append("y")
+        cache.resize("b")
+        self.assertEqual(["b"], cache.keys())
+        self.assertEqual(5, cache.size_in_bytes)
+        cache.resize("c")
+        self.assertEqual(1, cache.evictions)
+
+    def test_pinned_entries_are_not_evicted(self):
+        cache = LruCache(max_entries=1)
+        cache.pin("Story")
+        cache["Story"] = 1
+        cache["Münzen"] = 2
+        cache["Edelsteine"] = 3
+        self.assertEqual(["Story"], cache.keys())
+        cache.unpin("story")
+        cache["Flüche"] = 4
+        self.assertEqual(["Flüche"], cache.keys())
+
+    def test_statistics(self):
+        cache = LruCache()
+        cache["a"] = 1
+        cache.get("A")
+        cache.get("b")
+        with self.assertRaises(KeyError):
+            _value = cache["c"]
+        self.assertEqual({"entries": 1, "bytes": 0, "hits": 1, "misses": 2, "evictions": 0}, cache.statistics())
+
+    def test_byte_budget_requires_size(self):
+        with self.assertRaises(ValueError):
+            LruCache(max_bytes=1)
@@ -0,0 +1,118 @@
+import threading
+import time
+from unittest import TestCase
+
+from gspread.exceptions import APIError
+
+from core.Metrics import Metrics
+from sheet.GSpreadAccess import GSpreadAccess
+from sheet.RecordedClient import RecordedClient
+from sheet.RequestScheduler import RequestScheduler
+from sheet.SimulatedClient import SimulatedClient, SimulatedResponse
+
+
+def create_spread_sheets(table_count: int) -> dict:
+    """ :return a core sheet with a story of the given number of tables """
+    worksheets = {"Story": [["Hort"], [], [], ["Tabelle"]] + [["T{}".format(i)] for i in range(table_count)]}
+    for i in range(table_count):
+        worksheets["T{}".format(i)] = [["1", "Eintrag {}".format(i)]]
+    return {"Kern": worksheets}
+
+
+class FakeClock(object):
+    """ A clock that advances by the waited time instead of waiting """
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.lock = threading.Lock()
+
+    def time(self) -> float:
+        with self.lock:
+            return self.now
+
+    def sleep(self, seconds: float) -> None:
+        with self.lock:
+            self.now += seconds
+
+
+class TestRequestScheduler(TestCase):
+    def test_load_at_the_quota_without_rejections(self):
+        clock = FakeClock()
+        client = SimulatedClient(create_spread_sheets(12), quota=6, quota_window=10.0, clock=clock.time)
+        scheduler = RequestScheduler(6, 10.0, clock=clock.time, sleep=clock.sleep)
+        access = GSpreadAccess("Kern", None, client=client, scheduler=scheduler)
+        self.assertEqual(12, len(access.prefetch(4)))
+        self.assertEqual(0, client.rejected_count)
+        self.assertEqual(client.request_count, scheduler.request_count)
+        # 1 request at once and 5 requests per 10 seconds afterwards
+        self.assertAlmostEqual((client.request_count - 1) * 2.0, clock.now, delta=2.0)
+
+    def test_quota_of_one_request(self):
+        clock = FakeClock()
+        client = SimulatedClient(create_spread_sheets(2), quota=1, quota_window=10.0, clock=clock.time)
+        scheduler = RequestScheduler(1, 10.0, clock=clock.time, sleep=clock.sleep)
+        access = GSpreadAccess("Kern", None, client=client, scheduler=scheduler)
+        self.assertEqual(2, len(access.prefetch(2)))
+        self.assertEqual(0, client.rejected_count)
+        self.assertAlmostEqual((client.request_count - 1) * 10.0, clock.now, delta=1.0)
+        with self.assertRaises(ValueError):
+            RequestScheduler(1, 10.0, burst=2)
+
+    def test_failed_requests_are_retried(self):
+        clock = FakeClock()
+        client = SimulatedClient(create_spread_sheets(10), error_rate=0.3, seed=4)
+        scheduler = RequestScheduler(1000, 1.0, max_retries=20, seed=1, clock=clock.time, sleep=clock.sleep)
+        access = GSpreadAccess("Kern", None, client=client, scheduler=scheduler)
+        self.assertEqual(10, len(access.prefetch(3)))
+        self.assertGreater(client.failed_count, 0)
+        self.assertEqual(client.failed_count, scheduler.retry_count)
+
+    def test_other_errors_are_not_retried(self):
+        calls = list()
+
+        def not_found():
+            calls.append(1)
+            raise APIError(SimulatedResponse(404, "NOT_FOUND"))
+
+        scheduler = RequestScheduler(10, 1.0, sleep=lambda seconds: None)
+        with self.assertRaises(APIError):
+            scheduler.execute(not_found)
+        self.assertEqual(1, len(calls))
+
+    def test_pending_reads_of_a_worksheet_are_merged(self):
+        client = RecordedClient({"Kern": {"Story": [["a", "b", "c", "d"]] * 3}})
+        worksheet = client.open("Kern").worksheet("Story")
+        gate = threading.Event()
+        now = [0.0]
+
+        def sleep(seconds: float) -> None:
+            gate.wait()
+            now[0] += seconds
+
+        scheduler = RequestScheduler(2, 1.0, clock=lambda: now[0], sleep=sleep)
+        # uses the only token, i.e. the next read waits for a token
+        scheduler.execute(lambda: None)
+        client.reset()
+        results = dict()
+
+        def read(cell_range: str) -> None:
+            results[cell_range] = scheduler.read(worksheet, cell_range)
+
+        threads = [threading.Thread(target=read, args=(cell_range,)) for cell_range in ("A1:B2", "C3:D3")]
+        Metrics.reset()
+        Metrics.enable()
+        try:
+            for thread in threads:
+                thread.start()
+                time.sleep(0.1)
+            gate.set()
+            for thread in threads:
+                thread.join()
+            # the merged reads are sent as one request
+            self.assertEqual(1, Metrics.counter("api_requests_total", worksheet="Story"))
+            self.assertEqual(1, Metrics.counter("api_merged_reads_total"))
+        finally:
+            Metrics.enable(False)
+            Metrics.reset()
+        self.assertEqual({"A1:B2": [["a", "b"], ["a", "b"]], "C3:D3": [["c", "d"]]}, results)
+        self.assertEqual([("Kern", "Story", "batch_get", "A1:B2,C3:D3")], client.requests)
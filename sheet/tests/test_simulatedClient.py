@@ -0,0 +1,44 @@
+from unittest import TestCase
+
+from gspread.exceptions import APIError
+
+from sheet.GSpreadAccess import GSpreadAccess
+from sheet.SimulatedClient import SimulatedClient
+
+SPREAD_SHEETS = {"Kern": {"Story": [["Hort"], [], [], ["Tabelle"], ["Münzen"]], "Münzen": [["1", "[2W6] Gold"]]}}
+
+
+class TestSimulatedClient(TestCase):
+    def test_latency_and_jitter(self):
+        sleeps = list()
+        client = SimulatedClient(SPREAD_SHEETS, latency=0.2, jitter=0.1, seed=1, sleep=sleeps.append)
+        access = GSpreadAccess("Kern", None, client=client)
+        self.assertEqual("[2W6] Gold", access.get_table("Münzen").table_rows[0].get_text)
+        self.assertEqual(client.request_count, len(sleeps))
+        self.assertTrue(all(0.1 <= latency <= 0.3 for latency in sleeps))
+        self.assertAlmostEqual(sum(sleeps), client.simulated_latency)
+
+    def test_quota(self):
+        now = [0.0]
+        client = SimulatedClient(SPREAD_SHEETS, quota=2, quota_window=100.0, clock=lambda: now[0])
+        spread_sheet = client.open("Kern")
+        spread_sheet.worksheet("Story")
+        with self.assertRaises(APIError) as context:
+            spread_sheet.worksheet("Münzen")
+        self.assertEqual(429, context.exception.code)
+        now[0] = 100.5
+        spread_sheet.worksheet("Münzen")
+        self.assertEqual((4, 1), (client.request_count, client.rejected_count))
+
+    def test_injected_errors(self):
+        client = SimulatedClient(SPREAD_SHEETS, error_rate=0.5, seed=3)
+        codes = list()
+        for _i in range(200):
+            try:
+                client.open("Kern")
+            except APIError as error:
+                codes.append(error.code)
+        self.assertEqual(len(codes), client.failed_count)
+        self.assertTrue(60 < len(codes) < 140)
+        self.assertEqual({429, 500, 503}, set(codes))
+        self.assertEqual(200, client.request_count)
@@ -0,0 +1,21 @@
+from unittest import TestCase
+
+from sheet.FileSpreadAccess import FileSpreadAccess
+from sheet.SpreadAccessRegistry import SpreadAccessRegistry
+
+
+class TestSpreadAccessRegistry(TestCase):
+    def test_load_backends(self):
+        self.assertEqual(["bundle", "files", "google"], SpreadAccessRegistry.names())
+        self.assertIs(FileSpreadAccess, SpreadAccessRegistry.load(SpreadAccessRegistry.FILES))
+        with self.assertRaises(ValueError):
+            SpreadAccessRegistry.load("unbekannt")
+
+    def test_register_backend(self):
+        SpreadAccessRegistry.register("dict", "sheet.tests.DictSpreadAccess", "DictSpreadAccess")
+        try:
+            spread_access = SpreadAccessRegistry.create("dict", "Hort", ["Gold"], {"Gold": [(1, "[1W6] Gold")]})
+            self.assertEqual(["Gold"], spread_access.story_table_names())
+        finally:
+            SpreadAccessRegistry.unregister("dict")
+        self.assertNotIn("dict", SpreadAccessRegistry.names())
@@ -0,0 +1,58 @@
+from collections import Counter
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy
+
+from sheet.Table import Table
+from sheet.TableRow import TableRowEntry
+
+
+def create_table(chances: list) -> Table:
+    """ :return a frozen table with a row to every chance. The text of a row is its position """
+    table = Table("Beute")
+    for i, chance in enumerate(chances):
+        table.add_table_row(TableRowEntry(None, chance, str(i)))
+    table.freeze()
+    return table
+
+
+class TestTable(TestCase):
+    def test_get_row_by_chance_matches_the_chances_exactly(self):
+        chances = [3, 1, 0, 7, 2]
+        table = create_table(chances)
+        # every possible random value is drawn exactly once
+        with patch("random.randrange", side_effect=range(sum(chances))):
+            drawn = Counter(int(table.get_row_by_chance().get_text) for _i in range(sum(chances)))
+        self.assertEqual({i: chance for i, chance in enumerate(chances) if chance}, dict(drawn))
+
+    def test_get_row_by_chance_freezes_the_table(self):
+        table = Table("Beute")
+        table.add_table_row(TableRowEntry(None, 2, "einzig"))
+        self.assertFalse(table.is_frozen)
+        self.assertEqual("einzig", table.get_row_by_chance().get_text)
+        self.assertTrue(table.is_frozen)
+
+    def test_frozen_table_rejects_rows(self):
+        table = create_table([1])
+        with self.assertRaises(AttributeError):
+            table.add_table_row(TableRowEntry(None, 1, "zu spät"))
+
+    def test_sample_rows(self):
+        chances = [1, 0, 3]
+        table = create_table(chances)
+        positions = table.sample_rows(400000, numpy.random.default_rng(11))
+        counts = numpy.bincount(positions, minlength=len(chances))
+        self.assertEqual(0, counts[1])
+        self.assertAlmostEqual(0.25, counts[0] / len(positions), delta=0.005)
+        self.assertAlmostEqual(0.75, counts[2] / len(positions), delta=0.005)
+
+    def test_compact_rows(self):
+        table = Table("Beute")
+        for text in ("[2W6] Gold", "".join(["[2W6]", " Gold"])):
+            table.add_table_row(TableRowEntry(None, 1, text))
+        table.freeze()
+        first, second = table.table_rows
+        self.assertIs(first.get_text, second.get_text)
+        for instance in (table, first, first.generators[0]):
+            self.assertFalse(hasattr(instance, "__dict__"))
@@ -0,0 +1,62 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from analysis.OutcomeDistribution import OutcomeDistribution
+from sheet.BundleSpreadAccess import BundleSpreadAccess
+from sheet.TableOptimizer import TableOptimizer
+from sheet.tests.DictSpreadAccess import DictSpreadAccess
+
+
+class TestTableOptimizer(TestCase):
+    def create_spread_access(self, tables: dict) -> DictSpreadAccess:
+        return DictSpreadAccess("Drachenhort", ["Beute"], tables)
+
+    def test_flattened_table_keeps_the_probabilities(self):
+        spread_access = self.create_spread_access({
+            "Beute": [(2, "[Tabelle: Edelsteine]"), (1, "[1W6] Gold"), (1, "Rubin"), (1, "[Tabelle: Waffen]")],
+            "Edelsteine": [(1, "Rubin"), (2, "Opal")],
+            "Waffen": [(1, "Dolch"), (1, "[Tabelle: Edelsteine] Schwert")],
+        })
+        before = OutcomeDistribution.of_table(spread_access.get_table("Beute")).probabilities
+        statistics = TableOptimizer(spread_access).optimize()
+        table = spread_access.get_table("Beute")
+        self.assertEqual([(5, "Rubin"), (4, "Opal"), (3, "[1W6] Gold"), (3, "[Tabelle: Waffen]")],
+                         [(row.get_chance, row.get_text) for row in table.table_rows])
+        after = OutcomeDistribution.of_table(table).probabilities
+        self.assertEqual(set(before), set(after))
+        for text, probability in before.items():
+            self.assertAlmostEqual(probability, after[text])
+        self.assertEqual({"tables": 3, "constant_rows": 5, "flattened_references": 1}, statistics)
+
+    def test_cycle_is_rejected_with_the_chain(self):
+        spread_access = self.create_spread_access({
+            "Beute": [(1, "[Tabelle: A]")],
+            "A": [(1, "[Tabelle: B]"), (1, "Ende")],
+            "B": [(1, "x [Tabelle: A]")],
+        })
+        with self.assertRaises(ValueError) as context:
+            TableOptimizer(spread_access).optimize()
+        self.assertIn("A -> B -> A", str(context.exception))
+
+    def test_optimized_story_with_large_chances_is_exported(self):
+        # the least common multiple of the referenced tables exceeds a 32 bit chance
+        spread_access = self.create_spread_access({
+            "Beute": [(1, "[Tabelle: A]"), (1, "[Tabelle: B]"), (1, "[Tabelle: C]")],
+            "A": [(1, "Rubin"), (65520, "Opal")],
+            "B": [(1, "Dolch"), (65518, "Schwert")],
+            "C": [(1, "Kupfer"), (65496, "Gold")],
+        })
+        TableOptimizer(spread_access).optimize()
+        chances = [row.get_chance for row in spread_access.get_table("Beute").table_rows]
+        self.assertGreater(max(chances), (1 << 32) - 1)
+        handle, bundle_file = tempfile.mkstemp(suffix=".rpgb")
+        os.close(handle)
+        try:
+            # the flattened story only reaches the story table
+            self.assertEqual(1, BundleSpreadAccess.export(spread_access, bundle_file))
+            bundle = BundleSpreadAccess(bundle_file)
+            self.assertEqual(chances, [row.get_chance for row in bundle.get_table("Beute").table_rows])
+            bundle.close()
+        finally:
+            os.remove(bundle_file)
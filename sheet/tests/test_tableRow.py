@@ -0,0 +1,35 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from generator.DiceThrow import DiceThrow
+from sheet.TableRow import TableRowEntry
+
+
+class TestTableRowEntry(TestCase):
+    def test_compile_template(self):
+        row = TableRowEntry(None, 1, "[1W1] Gold, [2W1] Silber und [unbekannt] [3w1]")
+        template = row.compile_template()
+        self.assertEqual(["", " Gold, ", " Silber und [unbekannt] ", ""], template[0::2])
+        self.assertTrue(all(isinstance(generator, DiceThrow) for generator in template[1::2]))
+
+    def test_generate(self):
+        row = TableRowEntry(None, 1, "[1W1] Gold, [12W1] Silber und [unbekannt] [3w1]")
+        self.assertEqual("1 Gold, 12 Silber und [unbekannt] 3", row.generate())
+        self.assertEqual("1 Gold, 12 Silber und [unbekannt] 3", row.generate())
+
+    def test_generate_without_generators(self):
+        row = TableRowEntry(None, 1, "Ein rostiger Nagel")
+        self.assertEqual("Ein rostiger Nagel", row.generate())
+
+    def test_invalid_dice_expressions_stay_text(self):
+        row = TableRowEntry(None, 1, "[1W6-] Gold, [1W0] Silber und [2W1] Kupfer")
+        self.assertEqual(["2W1"], [generator.get_text for generator in row.generators])
+        self.assertEqual("[1W6-] Gold, [1W0] Silber und 2 Kupfer", row.generate())
+
+    def test_text_is_analyzed_lazily(self):
+        with patch.object(TableRowEntry, "analyze_generators", wraps=TableRowEntry.analyze_generators) as analyze:
+            row = TableRowEntry(None, 1, "[2W1] Kupfer")
+            self.assertEqual(0, analyze.call_count)
+            self.assertEqual("2 Kupfer", row.generate())
+            row.generate()
+            self.assertEqual(1, analyze.call_count)